@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import httpx
 import sys
 import os
@@ -9,16 +10,42 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 from shared.logging_utils import CorrelationLogger, get_correlation_id_from_headers, generate_correlation_id
 
+from .upstream import UpstreamClients, INTEGRATION, BACKEND, AGENT
+from .proxy import StreamingProxy, ProxyRoute
+
 # Initialize centralized logger
 logger = CorrelationLogger(
     service_name="API-GATEWAY",
     log_file="logs/centralized.log"
 )
 
+# Service URLs
+AUTH_SERVICE_URL = "http://localhost:8001"
+INTEGRATION_SERVICE_URL = "http://localhost:8002"  # Integration service on port 8002
+BACKEND_SERVICE_URL = "http://localhost:8001"  # Backend service fallback
+AGENT_SERVICE_URL = "http://localhost:8006"
+
+# Pooled keep-alive clients, one per upstream service
+upstream_clients = UpstreamClients({
+    INTEGRATION: INTEGRATION_SERVICE_URL,
+    BACKEND: BACKEND_SERVICE_URL,
+    AGENT: AGENT_SERVICE_URL,
+})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open upstream connection pools on startup and close them on shutdown"""
+    await upstream_clients.start()
+    yield
+    await upstream_clients.close()
+
+
 app = FastAPI(
     title="Social Media Management - API Gateway",
     description="The central entry point for all client requests.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -69,237 +96,77 @@ async def add_correlation_id_middleware(request: Request, call_next):
 async def root():
     return {"message": "API Gateway is running"}
 
-# Service URLs
-AUTH_SERVICE_URL = "http://localhost:8001"
-INTEGRATION_SERVICE_URL = "http://localhost:8002"  # Integration service on port 8002
-BACKEND_SERVICE_URL = "http://localhost:8001"  # Backend service fallback
-AGENT_SERVICE_URL = "http://localhost:8006"
-
 # ============================================
-# LinkedIn Integration Routes
+# Proxied Routes
 # ============================================
+# Routes forwarded verbatim (streamed, unparsed) to their upstream service.
+# OAuth callbacks and content refinement stay hand-written below because they
+# map errors to redirects or reshape the request body.
+
+PROXY_ROUTES = [
+    # LinkedIn
+    ProxyRoute("POST", "/api/integrations/linkedin/auth", INTEGRATION, timeout=60.0),
+    ProxyRoute("GET", "/api/integrations/linkedin/status", INTEGRATION),
+    ProxyRoute("POST", "/api/integrations/linkedin/post", INTEGRATION, timeout=60.0),
+    ProxyRoute("DELETE", "/api/integrations/linkedin/disconnect", INTEGRATION),
+    # Facebook
+    ProxyRoute("POST", "/api/integrations/facebook/auth", INTEGRATION),
+    ProxyRoute("GET", "/api/integrations/facebook/status", INTEGRATION),
+    ProxyRoute("POST", "/api/integrations/facebook/post", INTEGRATION),
+    ProxyRoute("POST", "/api/integrations/facebook/post-with-image", INTEGRATION, timeout=60.0),
+    # Twitter
+    ProxyRoute("POST", "/api/integrations/twitter/auth", INTEGRATION, timeout=60.0),
+    ProxyRoute("GET", "/api/integrations/twitter/status", INTEGRATION),
+    ProxyRoute("POST", "/api/integrations/twitter/post", INTEGRATION),
+    ProxyRoute("DELETE", "/api/integrations/twitter/disconnect", INTEGRATION),
+    # Preview
+    ProxyRoute("POST", "/api/integrations/preview", BACKEND, timeout=30.0),
+]
+
+StreamingProxy(upstream_clients, logger).register(app, PROXY_ROUTES)
 
-@app.post("/api/integrations/linkedin/auth")
-async def route_linkedin_auth(request: Request):
-    """Route LinkedIn OAuth initiation to integration service"""
-    # Get correlation ID from request state (set by middleware)
-    correlation_id = getattr(request.state, 'correlation_id', 'unknown')
-    user_id = request.headers.get('x-user-id', 'unknown')
-    
-    print("\n" + "="*100)
-    print("🟢 [API-GATEWAY] LinkedIn Auth Request Received from Frontend")
-    print("="*100)
-    print(f"🆔 [API-GATEWAY] Correlation ID: {correlation_id}")
-    print(f"👤 [API-GATEWAY] User ID: {user_id}")
-    print(f"📍 [API-GATEWAY] Endpoint: POST /api/integrations/linkedin/auth")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            headers_to_forward = {k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            
-            # Ensure correlation ID is forwarded
-            if 'x-correlation-id' not in headers_to_forward:
-                headers_to_forward['x-correlation-id'] = correlation_id
-            
-            print(f"📤 [API-GATEWAY] Forwarding to Integration Service:")
-            print(f"   ├─ Target: {INTEGRATION_SERVICE_URL}/api/integrations/linkedin/auth")
-            print(f"   ├─ Headers Count: {len(headers_to_forward)}")
-            print(f"   └─ Key Headers: X-User-ID={headers_to_forward.get('x-user-id')}, X-Correlation-ID={correlation_id}")
-            
-            logger.info(
-                f"Forwarding request to Integration Service",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"target_url": f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/auth"}
-            )
-            
-            response = await client.post(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/auth",
-                headers=headers_to_forward,
-                timeout=60.0
-            )
-            
-            print(f"📥 [API-GATEWAY] Response from Integration Service:")
-            print(f"   ├─ Status Code: {response.status_code}")
-            print(f"   └─ Status: {'SUCCESS' if response.status_code == 200 else 'ERROR'}")
-            
-            logger.success(
-                f"Received response from Integration Service",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"status_code": response.status_code}
-            )
-            
-            response.raise_for_status()
-            
-            response_data = response.json()
-            print(f"✅ [API-GATEWAY] Returning auth_url to frontend")
-            print(f"   └─ Auth URL Length: {len(response_data.get('auth_url', ''))} characters")
-            
-            print("="*100 + "\n")
-            
-            # Create response with correlation ID header
-            json_response = JSONResponse(content=response_data, status_code=response.status_code)
-            json_response.headers["X-Correlation-ID"] = correlation_id
-            return json_response
-            
-        except httpx.RequestError as exc:
-            print(f"❌ [API-GATEWAY] Request Error:")
-            print(f"   ├─ Type: {type(exc).__name__}")
-            print(f"   └─ Message: {str(exc)}")
-            
-            logger.error(
-                f"Request error connecting to Integration Service: {str(exc)}",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"error_type": type(exc).__name__}
-            )
-            
-            print("="*100 + "\n")
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-            
-        except httpx.HTTPStatusError as exc:
-            print(f"❌ [API-GATEWAY] HTTP Status Error:")
-            print(f"   ├─ Status Code: {exc.response.status_code}")
-            print(f"   └─ Response: {exc.response.text[:200]}")
-            
-            logger.error(
-                f"HTTP error from Integration Service",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"status_code": exc.response.status_code, "response": exc.response.text[:200]}
-            )
-            
-            print("="*100 + "\n")
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
 
+# ============================================
+# LinkedIn Integration Routes
+# ============================================
 
 @app.get("/api/integrations/linkedin/callback")
 async def route_linkedin_callback(code: str, state: str = None):
     """Route LinkedIn OAuth callback to integration service"""
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            params = {"code": code}
-            if state:
-                params["state"] = state
-            
-            print(f"🔄 [API-GATEWAY] LinkedIn callback → forwarding to Integration Service (timeout=60s)")
-            
-            response = await client.get(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/callback",
-                params=params,
-                follow_redirects=False
-            )
-            
-            # If it's a redirect, return it
-            if response.status_code in (301, 302, 303, 307, 308):
-                return RedirectResponse(url=response.headers.get('location', 'http://localhost:3000/oauth-callback.html?status=error&platform=linkedin&message=no_redirect_location'))
-            
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            print(f"❌ [API-GATEWAY] LinkedIn callback FAILED: {type(exc).__name__}: {str(exc)}")
-            # On error, redirect to oauth-callback.html so popup can postMessage and close
-            return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=linkedin&message=gateway_request_error")
-        except httpx.HTTPStatusError as exc:
-            print(f"❌ [API-GATEWAY] LinkedIn callback HTTP error: {exc.response.status_code}")
-            return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=linkedin&message=gateway_http_error")
-
-
-@app.get("/api/integrations/linkedin/status")
-async def route_linkedin_status(request: Request):
-    """Route LinkedIn status check to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/status",
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
-@app.post("/api/integrations/linkedin/post")
-async def route_linkedin_post(request: Request):
-    """Route LinkedIn post to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            body = await request.json()
-            response = await client.post(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/post",
-                json=body,
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')},
-                timeout=60.0
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
-@app.delete("/api/integrations/linkedin/disconnect")
-async def route_linkedin_disconnect(request: Request):
-    """Route LinkedIn disconnect to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.delete(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/disconnect",
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
+    client = upstream_clients.get(INTEGRATION)
+    try:
+        params = {"code": code}
+        if state:
+            params["state"] = state
+        
+        print(f"🔄 [API-GATEWAY] LinkedIn callback → forwarding to Integration Service (timeout=60s)")
+        
+        response = await client.get(
+            f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/callback",
+            params=params,
+            follow_redirects=False,
+            timeout=60.0
+        )
+        
+        # If it's a redirect, return it
+        if response.status_code in (301, 302, 303, 307, 308):
+            return RedirectResponse(url=response.headers.get('location', 'http://localhost:3000/oauth-callback.html?status=error&platform=linkedin&message=no_redirect_location'))
+        
+        response.raise_for_status()
+        return JSONResponse(content=response.json(), status_code=response.status_code)
+    except httpx.RequestError as exc:
+        print(f"❌ [API-GATEWAY] LinkedIn callback FAILED: {type(exc).__name__}: {str(exc)}")
+        # On error, redirect to oauth-callback.html so popup can postMessage and close
+        return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=linkedin&message=gateway_request_error")
+    except httpx.HTTPStatusError as exc:
+        print(f"❌ [API-GATEWAY] LinkedIn callback HTTP error: {exc.response.status_code}")
+        return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=linkedin&message=gateway_http_error")
 
 
 # ============================================
 # Facebook Integration Routes
 # ============================================
 
-@app.post("/api/integrations/facebook/post-with-image")
-async def route_facebook_post_with_image(request: Request):
-    """Route Facebook post-with-image to integration service"""
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            body = await request.json()
-            response = await client.post(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/facebook/post-with-image",
-                json=body,
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')},
-                timeout=60.0
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-@app.post("/api/integrations/facebook/auth")
-async def route_facebook_auth(request: Request):
-    """Route Facebook OAuth initiation to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/facebook/auth",
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
 @app.get("/api/integrations/facebook/callback")
 async def route_facebook_callback(code: str, state: str = None):
     """Route Facebook OAuth callback to integration service"""
@@ -309,94 +176,41 @@ async def route_facebook_callback(code: str, state: str = None):
     print("="*100)
 
     # Increased timeout to 60s for OAuth token exchange
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            params = {"code": code}
-            if state:
-                params["state"] = state
-            
-            response = await client.get(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/facebook/callback",
-                params=params,
-                follow_redirects=False
-            )
-            
-            print(f"📥 [API-GATEWAY] Response from Integration Service: {response.status_code}")
-
-            if response.status_code in (301, 302, 303, 307, 308):
-                location = response.headers.get('location', 'http://localhost:3000/oauth-callback.html?status=error&platform=facebook&message=no_redirect_location')
-                print(f"✅ [API-GATEWAY] Redirecting to: {location}")
-                return RedirectResponse(url=location)
-            
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-
-        except httpx.RequestError as exc:
-            print(f"❌ [API-GATEWAY] Request Error: {exc}")
-            return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=facebook&message=gateway_timeout")
-        except httpx.HTTPStatusError as exc:
-            print(f"❌ [API-GATEWAY] HTTP Error: {exc.response.status_code}")
-            return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=facebook&message=gateway_error")
-
-
-@app.get("/api/integrations/facebook/status")
-async def route_facebook_status(request: Request):
-    """Route Facebook status check to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/facebook/status",
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
-@app.post("/api/integrations/facebook/post")
-async def route_facebook_post(request: Request):
-    """Route Facebook post to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            body = await request.json()
-            response = await client.post(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/facebook/post",
-                json=body,
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
+    client = upstream_clients.get(INTEGRATION)
+    try:
+        params = {"code": code}
+        if state:
+            params["state"] = state
+        
+        response = await client.get(
+            f"{INTEGRATION_SERVICE_URL}/api/integrations/facebook/callback",
+            params=params,
+            follow_redirects=False,
+            timeout=60.0
+        )
+        
+        print(f"📥 [API-GATEWAY] Response from Integration Service: {response.status_code}")
+
+        if response.status_code in (301, 302, 303, 307, 308):
+            location = response.headers.get('location', 'http://localhost:3000/oauth-callback.html?status=error&platform=facebook&message=no_redirect_location')
+            print(f"✅ [API-GATEWAY] Redirecting to: {location}")
+            return RedirectResponse(url=location)
+        
+        response.raise_for_status()
+        return JSONResponse(content=response.json(), status_code=response.status_code)
+
+    except httpx.RequestError as exc:
+        print(f"❌ [API-GATEWAY] Request Error: {exc}")
+        return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=facebook&message=gateway_timeout")
+    except httpx.HTTPStatusError as exc:
+        print(f"❌ [API-GATEWAY] HTTP Error: {exc.response.status_code}")
+        return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=facebook&message=gateway_error")
 
 
 # ============================================
 # Twitter Integration Routes
 # ============================================
 
-@app.post("/api/integrations/twitter/auth")
-async def route_twitter_auth(request: Request):
-    """Route Twitter OAuth initiation to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/twitter/auth",
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')},
-                timeout=60.0
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
 @app.get("/api/integrations/twitter/callback")
 async def route_twitter_callback(code: str, state: str = None):
     """Route Twitter OAuth callback to integration service"""
@@ -405,153 +219,33 @@ async def route_twitter_callback(code: str, state: str = None):
     print("="*100)
 
     # Increased timeout to 60s for OAuth token exchange
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            params = {"code": code}
-            if state:
-                params["state"] = state
-            
-            response = await client.get(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/twitter/callback",
-                params=params,
-                follow_redirects=False
-            )
-            
-            if response.status_code in (301, 302, 303, 307, 308):
-                location = response.headers.get('location', 'http://localhost:3000/oauth-callback.html?status=error&platform=twitter&message=no_redirect_location')
-                print(f"✅ [API-GATEWAY] Redirecting to: {location}")
-                return RedirectResponse(url=location)
-            
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-
-        except httpx.RequestError as exc:
-            print(f"❌ [API-GATEWAY] Request Error: {exc}")
-            return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=twitter&message=gateway_timeout")
-        except httpx.HTTPStatusError as exc:
-            print(f"❌ [API-GATEWAY] HTTP Error: {exc.response.status_code}")
-            return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=twitter&message=gateway_error")
-
-
-@app.get("/api/integrations/twitter/status")
-async def route_twitter_status(request: Request):
-    """Route Twitter status check to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/twitter/status",
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
-@app.post("/api/integrations/twitter/post")
-async def route_twitter_post(request: Request):
-    """Route Twitter post to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            body = await request.json()
-            response = await client.post(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/twitter/post",
-                json=body,
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
-@app.delete("/api/integrations/twitter/disconnect")
-async def route_twitter_disconnect(request: Request):
-    """Route Twitter disconnect to integration service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.delete(
-                f"{INTEGRATION_SERVICE_URL}/api/integrations/twitter/disconnect",
-                headers={k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            )
-            response.raise_for_status()
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Error connecting to integration service: {exc}")
-        except httpx.HTTPStatusError as exc:
-            return JSONResponse(content=exc.response.json() if exc.response.text else {"detail": "Service error"}, status_code=exc.response.status_code)
-
-
-# ============================================
-# Preview Post Route
-# ============================================
-
-@app.post("/api/integrations/preview")
-async def route_preview_post(request: Request):
-    """Route post preview to backend service"""
-    correlation_id = getattr(request.state, 'correlation_id', 'unknown')
-    user_id = request.headers.get('x-user-id', 'unknown')
-    
-    logger.info(
-        "API Gateway: Routing preview request to Backend Service",
-        correlation_id=correlation_id,
-        user_id=user_id
-    )
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            body = await request.json()
-            headers_to_forward = {k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            
-            # Ensure correlation ID is forwarded
-            if 'x-correlation-id' not in headers_to_forward:
-                headers_to_forward['x-correlation-id'] = correlation_id
-            
-            response = await client.post(
-                f"{BACKEND_SERVICE_URL}/api/integrations/preview",
-                json=body,
-                headers=headers_to_forward,
-                timeout=30.0
-            )
-            
-            response.raise_for_status()
-            
-            response_data = response.json()
-            
-            logger.success(
-                "API Gateway: Preview generated successfully",
-                correlation_id=correlation_id,
-                user_id=user_id
-            )
-            
-            # Create response with correlation ID header
-            json_response = JSONResponse(content=response_data, status_code=response.status_code)
-            json_response.headers["X-Correlation-ID"] = correlation_id
-            return json_response
-            
-        except httpx.RequestError as exc:
-            logger.error(
-                f"Request error connecting to Backend Service: {str(exc)}",
-                correlation_id=correlation_id,
-                user_id=user_id
-            )
-            raise HTTPException(status_code=503, detail=f"Error connecting to backend service: {exc}")
-            
-        except httpx.HTTPStatusError as exc:
-            logger.error(
-                f"HTTP error from Backend Service",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"status_code": exc.response.status_code}
-            )
-            return JSONResponse(
-                content=exc.response.json() if exc.response.text else {"detail": "Service error"}, 
-                status_code=exc.response.status_code
-            )
+    client = upstream_clients.get(INTEGRATION)
+    try:
+        params = {"code": code}
+        if state:
+            params["state"] = state
+        
+        response = await client.get(
+            f"{INTEGRATION_SERVICE_URL}/api/integrations/twitter/callback",
+            params=params,
+            follow_redirects=False,
+            timeout=60.0
+        )
+        
+        if response.status_code in (301, 302, 303, 307, 308):
+            location = response.headers.get('location', 'http://localhost:3000/oauth-callback.html?status=error&platform=twitter&message=no_redirect_location')
+            print(f"✅ [API-GATEWAY] Redirecting to: {location}")
+            return RedirectResponse(url=location)
+        
+        response.raise_for_status()
+        return JSONResponse(content=response.json(), status_code=response.status_code)
+
+    except httpx.RequestError as exc:
+        print(f"❌ [API-GATEWAY] Request Error: {exc}")
+        return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=twitter&message=gateway_timeout")
+    except httpx.HTTPStatusError as exc:
+        print(f"❌ [API-GATEWAY] HTTP Error: {exc.response.status_code}")
+        return RedirectResponse(url="http://localhost:3000/oauth-callback.html?status=error&platform=twitter&message=gateway_error")
 
 
 # ============================================
@@ -571,112 +265,112 @@ async def route_content_refine(request: Request):
     print(f"👤 [API-GATEWAY] User ID: {user_id}")
     print(f"📍 [API-GATEWAY] Endpoint: POST /api/integrations/content/refine")
     
-    async with httpx.AsyncClient() as client:
-        try:
-            body = await request.json()
-            
-            # Prepare request for Agent Service
-            agent_request = {
-                "user_id": user_id,
-                "original_content": body.get('original_content'),
-                "refinement_instructions": body.get('refinement_instructions'),
+    client = upstream_clients.get(AGENT)
+    try:
+        body = await request.json()
+        
+        # Prepare request for Agent Service
+        agent_request = {
+            "user_id": user_id,
+            "original_content": body.get('original_content'),
+            "refinement_instructions": body.get('refinement_instructions'),
+            "tone": body.get('tone'),
+            "platform": body.get('platform'),
+            "generate_alternatives": body.get('generate_alternatives', False)
+        }
+        
+        headers_to_forward = {k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
+        
+        # Ensure correlation ID is forwarded
+        if 'x-correlation-id' not in headers_to_forward:
+            headers_to_forward['x-correlation-id'] = correlation_id
+        
+        print(f"📤 [API-GATEWAY] Forwarding to Agent Service (AI Content Refinement):")
+        print(f"   ├─ Target: {AGENT_SERVICE_URL}/agent/content/refine")
+        print(f"   ├─ Original Content Length: {len(body.get('original_content', ''))} chars")
+        print(f"   ├─ Tone: {body.get('tone', 'default')}")
+        print(f"   └─ Platform: {body.get('platform', 'none')}")
+        
+        logger.info(
+            f"Forwarding content refinement request to Agent Service",
+            correlation_id=correlation_id,
+            user_id=user_id,
+            additional_data={
+                "target_url": f"{AGENT_SERVICE_URL}/agent/content/refine",
+                "content_length": len(body.get('original_content', '')),
                 "tone": body.get('tone'),
-                "platform": body.get('platform'),
-                "generate_alternatives": body.get('generate_alternatives', False)
+                "platform": body.get('platform')
             }
-            
-            headers_to_forward = {k: v for k, v in request.headers.items() if k.lower() not in ('host', 'content-length')}
-            
-            # Ensure correlation ID is forwarded
-            if 'x-correlation-id' not in headers_to_forward:
-                headers_to_forward['x-correlation-id'] = correlation_id
-            
-            print(f"📤 [API-GATEWAY] Forwarding to Agent Service (AI Content Refinement):")
-            print(f"   ├─ Target: {AGENT_SERVICE_URL}/agent/content/refine")
-            print(f"   ├─ Original Content Length: {len(body.get('original_content', ''))} chars")
-            print(f"   ├─ Tone: {body.get('tone', 'default')}")
-            print(f"   └─ Platform: {body.get('platform', 'none')}")
-            
-            logger.info(
-                f"Forwarding content refinement request to Agent Service",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={
-                    "target_url": f"{AGENT_SERVICE_URL}/agent/content/refine",
-                    "content_length": len(body.get('original_content', '')),
-                    "tone": body.get('tone'),
-                    "platform": body.get('platform')
-                }
-            )
-            
-            response = await client.post(
-                f"{AGENT_SERVICE_URL}/agent/content/refine",
-                json=agent_request,
-                headers=headers_to_forward,
-                timeout=60.0  # Longer timeout for LLM processing
-            )
-            
-            print(f"📥 [API-GATEWAY] Response from Agent Service:")
-            print(f"   ├─ Status Code: {response.status_code}")
-            print(f"   └─ Status: {'SUCCESS' if response.status_code == 200 else 'ERROR'}")
-            
-            logger.success(
-                f"Received response from Agent Service",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"status_code": response.status_code}
-            )
-            
-            response.raise_for_status()
-            
-            response_data = response.json()
-            
-            if response_data.get('success'):
-                print(f"✅ [API-GATEWAY] Content refinement successful")
-                print(f"   ├─ Refined Length: {len(response_data.get('refined_content', ''))} chars")
-                print(f"   └─ Suggestions: {len(response_data.get('suggestions', []))}")
-            else:
-                print(f"❌ [API-GATEWAY] Content refinement failed: {response_data.get('error')}")
-            
-            print("="*100 + "\n")
-            
-            # Create response with correlation ID header
-            json_response = JSONResponse(content=response_data, status_code=response.status_code)
-            json_response.headers["X-Correlation-ID"] = correlation_id
-            return json_response
-            
-        except httpx.RequestError as exc:
-            print(f"❌ [API-GATEWAY] Request Error:")
-            print(f"   ├─ Type: {type(exc).__name__}")
-            print(f"   └─ Message: {str(exc)}")
-            
-            logger.error(
-                f"Request error connecting to Agent Service: {str(exc)}",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"error_type": type(exc).__name__}
-            )
-            
-            print("="*100 + "\n")
-            raise HTTPException(status_code=503, detail=f"Error connecting to agent service: {exc}")
-            
-        except httpx.HTTPStatusError as exc:
-            print(f"❌ [API-GATEWAY] HTTP Status Error:")
-            print(f"   ├─ Status Code: {exc.response.status_code}")
-            print(f"   └─ Response: {exc.response.text[:200]}")
-            
-            logger.error(
-                f"HTTP error from Agent Service",
-                correlation_id=correlation_id,
-                user_id=user_id,
-                additional_data={"status_code": exc.response.status_code, "response": exc.response.text[:200]}
-            )
-            
-            print("="*100 + "\n")
-            return JSONResponse(
-                content=exc.response.json() if exc.response.text else {"detail": "Service error"}, 
-                status_code=exc.response.status_code
-            )
+        )
+        
+        response = await client.post(
+            f"{AGENT_SERVICE_URL}/agent/content/refine",
+            json=agent_request,
+            headers=headers_to_forward,
+            timeout=60.0  # Longer timeout for LLM processing
+        )
+        
+        print(f"📥 [API-GATEWAY] Response from Agent Service:")
+        print(f"   ├─ Status Code: {response.status_code}")
+        print(f"   └─ Status: {'SUCCESS' if response.status_code == 200 else 'ERROR'}")
+        
+        logger.success(
+            f"Received response from Agent Service",
+            correlation_id=correlation_id,
+            user_id=user_id,
+            additional_data={"status_code": response.status_code}
+        )
+        
+        response.raise_for_status()
+        
+        response_data = response.json()
+        
+        if response_data.get('success'):
+            print(f"✅ [API-GATEWAY] Content refinement successful")
+            print(f"   ├─ Refined Length: {len(response_data.get('refined_content', ''))} chars")
+            print(f"   └─ Suggestions: {len(response_data.get('suggestions', []))}")
+        else:
+            print(f"❌ [API-GATEWAY] Content refinement failed: {response_data.get('error')}")
+        
+        print("="*100 + "\n")
+        
+        # Create response with correlation ID header
+        json_response = JSONResponse(content=response_data, status_code=response.status_code)
+        json_response.headers["X-Correlation-ID"] = correlation_id
+        return json_response
+        
+    except httpx.RequestError as exc:
+        print(f"❌ [API-GATEWAY] Request Error:")
+        print(f"   ├─ Type: {type(exc).__name__}")
+        print(f"   └─ Message: {str(exc)}")
+        
+        logger.error(
+            f"Request error connecting to Agent Service: {str(exc)}",
+            correlation_id=correlation_id,
+            user_id=user_id,
+            additional_data={"error_type": type(exc).__name__}
+        )
+        
+        print("="*100 + "\n")
+        raise HTTPException(status_code=503, detail=f"Error connecting to agent service: {exc}")
+        
+    except httpx.HTTPStatusError as exc:
+        print(f"❌ [API-GATEWAY] HTTP Status Error:")
+        print(f"   ├─ Status Code: {exc.response.status_code}")
+        print(f"   └─ Response: {exc.response.text[:200]}")
+        
+        logger.error(
+            f"HTTP error from Agent Service",
+            correlation_id=correlation_id,
+            user_id=user_id,
+            additional_data={"status_code": exc.response.status_code, "response": exc.response.text[:200]}
+        )
+        
+        print("="*100 + "\n")
+        return JSONResponse(
+            content=exc.response.json() if exc.response.text else {"detail": "Service error"}, 
+            status_code=exc.response.status_code
+        )
 
 
 # ============================================
@@ -0,0 +1,139 @@
+"""
+Streaming reverse-proxy engine for the API Gateway
+Forwards request and response bodies between client and upstream without parsing them
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from .upstream import UpstreamClients
+
+# Hop-by-hop headers (RFC 7230 §6.1) are connection-specific and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+@dataclass(frozen=True)
+class ProxyRoute:
+    """A gateway route that is forwarded verbatim to an upstream service"""
+    method: str
+    path: str
+    upstream: str
+    timeout: Optional[float] = None  # None uses the upstream pool default
+
+
+def build_forward_headers(request: Request) -> dict:
+    """Copy client headers for the upstream call, ensuring the correlation ID travels along"""
+    headers = {
+        k: v for k, v in request.headers.items()
+        if k.lower() != "host" and k.lower() not in HOP_BY_HOP_HEADERS
+    }
+    if "x-correlation-id" not in headers:
+        headers["x-correlation-id"] = getattr(request.state, "correlation_id", "unknown")
+    return headers
+
+
+def build_response_headers(upstream_response: httpx.Response) -> dict:
+    """Copy upstream response headers, dropping hop-by-hop headers"""
+    return {
+        k: v for k, v in upstream_response.headers.items()
+        if k.lower() not in HOP_BY_HOP_HEADERS
+    }
+
+
+class StreamingProxy:
+    """
+    Table-driven reverse proxy.
+
+    Request bodies are streamed to the upstream as they arrive and upstream
+    bodies are streamed back raw (still content-encoded), so large payloads
+    such as base64 image posts are never decoded or re-serialized by the gateway.
+    Upstream error statuses are passed through unchanged; connection failures
+    map to 503 for every route.
+    """
+
+    def __init__(self, clients: UpstreamClients, logger):
+        self.clients = clients
+        self.logger = logger
+
+    async def forward(self, request: Request, route: ProxyRoute):
+        """Forward one request to the route's upstream and stream the response back"""
+        correlation_id = getattr(request.state, "correlation_id", "unknown")
+        user_id = request.headers.get("x-user-id", "unknown")
+        client = self.clients.get(route.upstream)
+
+        # Only stream a body when the client sent one; an empty stream would
+        # otherwise be forwarded as a chunked GET/DELETE
+        has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+        upstream_request = client.build_request(
+            request.method,
+            httpx.URL(request.url.path, query=request.url.query.encode("utf-8")),
+            headers=build_forward_headers(request),
+            content=request.stream() if has_body else None,
+            timeout=route.timeout if route.timeout is not None else client.timeout,
+        )
+
+        self.logger.info(
+            f"Forwarding request to {route.upstream} service",
+            correlation_id=correlation_id,
+            user_id=user_id,
+            additional_data={"target_url": str(upstream_request.url)}
+        )
+
+        try:
+            upstream_response = await client.send(upstream_request, stream=True)
+        except httpx.RequestError as exc:
+            self.logger.error(
+                f"Request error connecting to {route.upstream} service: {str(exc)}",
+                correlation_id=correlation_id,
+                user_id=user_id,
+                additional_data={"error_type": type(exc).__name__}
+            )
+            return JSONResponse(
+                content={"detail": f"Error connecting to {route.upstream} service: {exc}"},
+                status_code=503
+            )
+
+        if upstream_response.is_error:
+            self.logger.error(
+                f"HTTP error from {route.upstream} service",
+                correlation_id=correlation_id,
+                user_id=user_id,
+                additional_data={"status_code": upstream_response.status_code}
+            )
+
+        return StreamingResponse(
+            upstream_response.aiter_raw(),
+            status_code=upstream_response.status_code,
+            headers=build_response_headers(upstream_response),
+            background=BackgroundTask(upstream_response.aclose),
+        )
+
+    def register(self, app: FastAPI, routes: List[ProxyRoute]):
+        """Add one FastAPI endpoint per proxy route"""
+        for route in routes:
+            app.add_api_route(
+                route.path,
+                self._make_endpoint(route),
+                methods=[route.method],
+            )
+
+    def _make_endpoint(self, route: ProxyRoute):
+        async def endpoint(request: Request):
+            return await self.forward(request, route)
+
+        endpoint.__name__ = f"proxy_{route.method.lower()}_{route.path.strip('/').replace('/', '_').replace('-', '_')}"
+        endpoint.__doc__ = f"Proxy {route.method} {route.path} to the {route.upstream} service"
+        return endpoint
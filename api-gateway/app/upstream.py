@@ -0,0 +1,81 @@
+"""
+Upstream HTTP client pool for the API Gateway
+Keeps one long-lived, keep-alive httpx.AsyncClient per downstream service
+"""
+import os
+import importlib.util
+from typing import Dict, Optional
+
+import httpx
+
+# Upstream service names used as pool keys
+INTEGRATION = "integration"
+BACKEND = "backend"
+AGENT = "agent"
+
+
+class UpstreamPoolConfig:
+    """Connection pool configuration for upstream clients"""
+    def __init__(self):
+        self.max_connections: int = int(os.getenv("GATEWAY_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections: int = int(os.getenv("GATEWAY_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.keepalive_expiry: float = float(os.getenv("GATEWAY_KEEPALIVE_EXPIRY", "30"))
+        self.timeout: float = float(os.getenv("GATEWAY_UPSTREAM_TIMEOUT", "5.0"))
+        self.http2: bool = os.getenv("GATEWAY_HTTP2", "false").lower() == "true"
+
+
+class UpstreamClients:
+    """
+    Registry of pooled AsyncClients, one per upstream service.
+
+    Clients are created in `start()` (called from the app lifespan) and
+    closed in `close()`, so every proxied request reuses warm connections
+    instead of paying TCP setup on each call.
+    """
+
+    def __init__(self, service_urls: Dict[str, str], config: Optional[UpstreamPoolConfig] = None):
+        self.service_urls = service_urls
+        self.config = config or UpstreamPoolConfig()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _http2_available(self) -> bool:
+        """HTTP/2 needs the optional `h2` package (httpx[http2])"""
+        if not self.config.http2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            print("⚠️ [API-GATEWAY] GATEWAY_HTTP2=true but 'h2' is not installed - using HTTP/1.1")
+            return False
+        return True
+
+    async def start(self):
+        """Create one pooled client per upstream service"""
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        http2 = self._http2_available()
+
+        for name, base_url in self.service_urls.items():
+            self._clients[name] = httpx.AsyncClient(
+                base_url=base_url,
+                limits=limits,
+                timeout=self.config.timeout,
+                http2=http2,
+            )
+
+        print(f"✅ [API-GATEWAY] Upstream pools ready: {list(self._clients.keys())} "
+              f"(max_connections={self.config.max_connections}, http2={http2})")
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the pooled client for an upstream service"""
+        client = self._clients.get(name)
+        if client is None:
+            raise RuntimeError(f"Upstream client '{name}' is not initialized")
+        return client
+
+    async def close(self):
+        """Close all pooled clients and release their connections"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
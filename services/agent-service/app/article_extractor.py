@@ -0,0 +1,254 @@
+"""
+Article preview extraction for trending topics
+Streams article pages through a pooled httpx.AsyncClient, reads og:image and
+og:description from the <head> alone and stops reading the body once the
+article content has arrived, instead of downloading and parsing whole pages
+"""
+import asyncio
+import logging
+import os
+import re
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .single_flight import SingleFlight
+from .trending_cache import TrendingCache
+
+logger = logging.getLogger(__name__)
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Meta keys in lookup priority order
+IMAGE_META_KEYS = ('og:image', 'twitter:image', 'twitter:image:src')
+DESCRIPTION_META_KEYS = ('og:description', 'description', 'twitter:description')
+BLOCKED_IMAGE_DOMAINS = ('google.com', 'gstatic.com', 'google.co', 'googleapis.com/logo')
+
+# Paragraphs inside these elements are boilerplate, not article text
+EXCLUDED_PARENTS = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'form', 'figure', 'figcaption', 'iframe', 'noscript']
+ARTICLE_CLASS_RE = re.compile(r'(article[-_]?(body|content|text)|story[-_]?(body|content)|post[-_]?(body|content))', re.I)
+CONTENT_CLASS_RE = re.compile(r'^(content|body|entry)', re.I)
+CONTENT_ID_RE = re.compile(r'(article|content|story|body)', re.I)
+BOILERPLATE_RE = re.compile(r'^(By |Written by |Published |Updated |Photo |Image |Credit |Source |©|Subscribe |Sign up |Log in |Advertisement)', re.I)
+
+# Once one of these closes, the main content has been received
+CONTENT_END_MARKERS = (b'</article', b'</main', b'</body')
+
+
+def _html_parser_backend() -> str:
+    """lxml's C parser when installed, else the stdlib parser"""
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+
+def empty_result(source_url: str = "") -> Dict[str, str]:
+    return {"preview": "", "image_url": "", "description": "", "source_url": source_url}
+
+
+class ArticleExtractConfig:
+    """Preview extraction settings"""
+    def __init__(self):
+        self.max_concurrency: int = int(os.getenv("PREVIEW_MAX_CONCURRENCY", "8"))
+        self.timeout: float = float(os.getenv("PREVIEW_TIMEOUT", "10"))
+        # Stop reading a page after this many bytes even if no content end marker was seen
+        self.max_bytes: int = int(os.getenv("PREVIEW_MAX_BYTES", str(384 * 1024)))
+        self.cache_ttl: float = float(os.getenv("PREVIEW_CACHE_TTL", "3600"))
+        self.cache_max_entries: int = int(os.getenv("PREVIEW_CACHE_MAX_ENTRIES", "2000"))
+        self.cache_max_bytes: int = int(os.getenv("PREVIEW_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+
+def parse_head(head_html: str, page_url: str, parser: str) -> Dict[str, str]:
+    """Extract image_url and description from the <meta> tags of a page head"""
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(head_html, parser, parse_only=SoupStrainer('meta'))
+    meta = {}
+    for tag in soup.find_all('meta'):
+        key = (tag.get('property') or tag.get('name') or '').strip().lower()
+        content = tag.get('content')
+        if key and content and key not in meta:
+            meta[key] = content.strip()
+
+    result = {"image_url": "", "description": ""}
+    img_url = next((meta[key] for key in IMAGE_META_KEYS if meta.get(key)), "")
+    if img_url:
+        # Make sure it's a full URL
+        if img_url.startswith('//'):
+            img_url = 'https:' + img_url
+        elif img_url.startswith('/'):
+            parsed = urlparse(page_url)
+            img_url = f"{parsed.scheme}://{parsed.netloc}{img_url}"
+        # Filter out Google News logos and other non-article images
+        if not any(domain in img_url.lower() for domain in BLOCKED_IMAGE_DOMAINS):
+            result["image_url"] = img_url
+        else:
+            logger.debug(f"[Preview] Skipped Google og:image: {img_url[:80]}")
+
+    desc = next((meta[key] for key in DESCRIPTION_META_KEYS if meta.get(key)), "")
+    if len(desc) > 30:
+        result["description"] = desc
+    return result
+
+
+def parse_paragraphs(body_html: str, parser: str, max_paragraphs: int) -> str:
+    """Return up to `max_paragraphs` meaningful paragraphs of the article body"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(body_html, parser)
+    article = (
+        soup.find('article') or
+        soup.find('main') or
+        soup.find('div', class_=ARTICLE_CLASS_RE) or
+        soup.find('div', class_=CONTENT_CLASS_RE) or
+        soup.find('div', {'role': 'article'}) or
+        soup.find('div', id=CONTENT_ID_RE)
+    )
+    search_area = article or soup
+
+    paragraphs = []
+    for p in search_area.find_all('p'):
+        # Checking the few candidate paragraphs is cheaper than decomposing every excluded element
+        if p.find_parent(EXCLUDED_PARENTS):
+            continue
+        text = p.get_text(strip=True)
+        # Skip short text (captions, dates, bylines, cookie notices)
+        if len(text) > 40 and not BOILERPLATE_RE.match(text):
+            paragraphs.append(text)
+            if len(paragraphs) >= max_paragraphs:
+                break
+    return '\n\n'.join(paragraphs)[:1000]
+
+
+class ArticleExtractor:
+    """
+    Async article preview extractor.
+
+    Pages are read as a stream: the head is cut off at </head> for the meta
+    lookup, and reading stops at the first closing </article>, </main> or
+    </body> (or `max_bytes`). Parsing runs in worker threads, at most
+    `max_concurrency` URL resolutions and page reads are in flight, and
+    results are cached by resolved article URL.
+
+    `resolve_url` maps a link to the article URL to read, or to None when it
+    can't be read yet (e.g. a Google News link that is still being decoded).
+    """
+
+    def __init__(self, resolve_url: Callable[[str], Optional[str]], config: Optional[ArticleExtractConfig] = None):
+        self.resolve_url = resolve_url
+        self.config = config or ArticleExtractConfig()
+        self.parser = _html_parser_backend()
+        self.cache = TrendingCache(
+            max_entries=self.config.cache_max_entries,
+            max_bytes=self.config.cache_max_bytes,
+            ttl_seconds=self.config.cache_ttl,
+        )
+        self._inflight = SingleFlight()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.bytes_read = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=BROWSER_HEADERS,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_concurrency,
+                    max_keepalive_connections=self.config.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        return self._client
+
+    async def extract(self, url: str, max_paragraphs: int = 3) -> Dict[str, str]:
+        """
+        Fetch an article URL and extract preview text, og:image, and og:description.
+        Handles Google News redirect URLs.
+        Returns dict with keys: preview, image_url, description, source_url
+        """
+        if not url:
+            return empty_result()
+
+        actual_url = url
+        try:
+            self._get_client()
+            # Resolve Google News redirects to get the actual article URL
+            async with self._semaphore:
+                actual_url = await asyncio.to_thread(self.resolve_url, url)
+            if not actual_url:
+                return empty_result(url)
+            cache_key = f"{max_paragraphs}:{actual_url}"
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+
+            async def run() -> Dict[str, str]:
+                data = await self._extract(actual_url, max_paragraphs)
+                self.cache.set(cache_key, data)
+                return data
+
+            return dict(await self._inflight.do(cache_key, run))
+        except Exception as e:
+            logger.debug(f"[Preview] Could not extract from {url[:60]}: {e}")
+            return empty_result(actual_url)
+
+    async def _extract(self, url: str, max_paragraphs: int) -> Dict[str, str]:
+        head, body = await self._read_page(url)
+        result = empty_result(url)
+        result.update(await asyncio.to_thread(parse_head, head, url, self.parser))
+        if max_paragraphs > 0 and body:
+            result["preview"] = await asyncio.to_thread(parse_paragraphs, body, self.parser, max_paragraphs)
+        if result["image_url"]:
+            logger.debug(f"[Preview] Found og:image: {result['image_url'][:80]}")
+        return result
+
+    async def _read_page(self, url: str):
+        """Stream a page and split it into (head, body) HTML, stopping once the content has arrived"""
+        client = self._get_client()
+        buf = bytearray()
+        head_end = -1
+        async with self._semaphore:
+            async with client.stream("GET", url, timeout=self.config.timeout) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    scan_from = max(0, len(buf) - 16)
+                    buf.extend(chunk)
+                    lowered = bytes(buf[scan_from:]).lower()
+                    if head_end < 0:
+                        pos = lowered.find(b'</head')
+                        if pos >= 0:
+                            head_end = scan_from + pos
+                    if head_end >= 0 and any(marker in lowered for marker in CONTENT_END_MARKERS):
+                        break
+                    if len(buf) >= self.config.max_bytes:
+                        break
+        self.bytes_read += len(buf)
+
+        html = buf.decode('utf-8', errors='ignore')
+        if head_end < 0:
+            # No </head> within the limit - let both parsers see everything read
+            return html, html
+        head_end = len(buf[:head_end].decode('utf-8', errors='ignore'))
+        return html[:head_end], html[head_end:]
+
+    def stats(self) -> dict:
+        return {
+            "parser": self.parser,
+            "bytes_read": self.bytes_read,
+            "cache": self.cache.stats(),
+            "single_flight": self._inflight.stats(),
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
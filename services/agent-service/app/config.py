@@ -49,6 +49,10 @@ class MCPServerConfig:
         self.timeout: int = int(os.getenv("MCP_SERVER_TIMEOUT", "30"))
         self.retry_attempts: int = int(os.getenv("MCP_SERVER_RETRY_ATTEMPTS", "3"))
         self.retry_delay: int = int(os.getenv("MCP_SERVER_RETRY_DELAY", "2"))
+        # Discovered tools are refreshed in the background once older than this
+        self.tools_ttl: float = float(os.getenv("MCP_TOOLS_TTL_SECONDS", "300"))
+        # How long a request needing MCP waits for startup discovery to finish
+        self.discovery_wait: float = float(os.getenv("MCP_DISCOVERY_WAIT_SECONDS", "5"))
         
         # Log the MCP configuration for debugging
         print(f"MCP Server Configuration:")
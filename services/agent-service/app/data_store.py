@@ -0,0 +1,130 @@
+"""
+Async data-access layer for the Agent Service
+All Firestore reads and writes go through AgentDataStore so request handlers never
+block the event loop. A Firestore AsyncClient backend is used in production and an
+in-memory backend stands in for it in tests.
+"""
+import logging
+import os
+import sys
+import uuid
+from typing import Dict, Optional
+
+# Add parent directory to path for shared utilities
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from shared.token_cache import token_cache
+
+logger = logging.getLogger(__name__)
+
+
+class FirestoreBackend:
+    """Document access backed by `firestore.AsyncClient`"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, path: str) -> Optional[dict]:
+        """Return the document at `path` as a dict, or None if it does not exist"""
+        doc = await self.client.document(path).get()
+        return doc.to_dict() if doc.exists else None
+
+    async def set(self, path: str, data: dict, merge: bool = False):
+        """Create or overwrite the document at `path`"""
+        await self.client.document(path).set(data, merge=merge)
+
+    async def add(self, collection_path: str, data: dict) -> str:
+        """Add a document with a generated ID to a collection and return the ID"""
+        _, doc_ref = await self.client.collection(collection_path).add(data)
+        return doc_ref.id
+
+
+class InMemoryBackend:
+    """Dict-backed stand-in for FirestoreBackend, keyed by document path"""
+
+    def __init__(self, documents: Optional[Dict[str, dict]] = None):
+        self.documents: Dict[str, dict] = dict(documents or {})
+
+    async def get(self, path: str) -> Optional[dict]:
+        data = self.documents.get(path)
+        return dict(data) if data is not None else None
+
+    async def set(self, path: str, data: dict, merge: bool = False):
+        if merge and path in self.documents:
+            self.documents[path] = {**self.documents[path], **data}
+        else:
+            self.documents[path] = dict(data)
+
+    async def add(self, collection_path: str, data: dict) -> str:
+        doc_id = uuid.uuid4().hex[:20]
+        self.documents[f"{collection_path}/{doc_id}"] = dict(data)
+        return doc_id
+
+
+class AgentDataStore:
+    """Agent Service queries over a document backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        """Retrieve the `users/{uid}` document"""
+        return await self.backend.get(f"users/{user_id}")
+
+    async def get_integrations(self, user_id: str) -> dict:
+        """Return the user's `integrations` map, served from the shared token cache when fresh"""
+        integrations = token_cache.get(user_id)
+        if integrations is None:
+            user_data = await self.get_user(user_id)
+            if not user_data:
+                return {}
+            integrations = user_data.get('integrations', {})
+            token_cache.set(user_id, integrations)
+        return integrations
+
+    async def get_platform_token(self, user_id: str, platform: str) -> Optional[str]:
+        """Retrieve OAuth access token for a user and platform"""
+        try:
+            integrations = await self.get_integrations(user_id)
+            return integrations.get(platform, {}).get('access_token')
+        except Exception as e:
+            logger.error(f"Error fetching {platform} token: {e}")
+            return None
+
+    async def get_business_context(self, user_id: str) -> Optional[dict]:
+        """Return the business profile dict if user is a business user, else None"""
+        try:
+            data = await self.backend.get(f"users/{user_id}/profile/accountType")
+            if data and data.get('userType') == 'business' and data.get('businessProfile'):
+                logger.info(f"✅ Business context found for user {user_id}: {data['businessProfile'].get('businessName', 'Unknown')}")
+                return data['businessProfile']
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching business context for {user_id}: {e}")
+            return None
+
+    async def get_interests(self, user_id: str) -> list:
+        """Return the user's selected trending interests from onboarding preferences"""
+        data = await self.backend.get(f"users/{user_id}/preferences/onboarding")
+        if not data:
+            return []
+        # Personalization flag OR existing interests (for backward compatibility)
+        if data.get('personalizationEnabled', False) or data.get('selectedInterests'):
+            return data.get('selectedInterests', [])
+        return []
+
+    async def add_scheduled_post(self, user_id: str, post_doc: dict) -> str:
+        """Add a document to `users/{uid}/scheduled_posts` and return its ID"""
+        return await self.backend.add(f"users/{user_id}/scheduled_posts", post_doc)
+
+
+def create_firestore_data_store() -> Optional[AgentDataStore]:
+    """
+    Build an AgentDataStore on the async Firestore client of the default Firebase app.
+    Returns None when Firebase has not been initialized.
+    """
+    try:
+        from firebase_admin import firestore_async
+        return AgentDataStore(FirestoreBackend(firestore_async.client()))
+    except ValueError:
+        logger.warning("Firebase app not initialized - async data store unavailable")
+        return None
@@ -0,0 +1,650 @@
+"""
+Image proxy with a disk-backed LRU cache
+Upstream images (Pollinations, Unsplash, article og:images) are streamed to
+the browser through one pooled client and stored content-addressed on disk,
+so repeat dashboard renders are served locally with ETag revalidation.
+Resized thumbnails are rendered in a process pool and cached alongside.
+Disk work runs in worker threads so the event loop never waits on the filesystem.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Optional
+
+import httpx
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Disk read/write granularity when streaming cached images
+CHUNK_SIZE = 64 * 1024
+
+
+class ImageProxyConfig:
+    """Image proxy and cache settings"""
+    def __init__(self):
+        self.cache_dir: str = os.getenv(
+            "IMAGE_CACHE_DIR",
+            os.path.join(tempfile.gettempdir(), "agent-image-cache")
+        )
+        # Shared by every worker process using cache_dir
+        self.cache_max_bytes: int = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        # Each worker rescans the shared directory at least this often to see the others' writes
+        self.cache_scan_interval: float = float(os.getenv("IMAGE_CACHE_SCAN_INTERVAL", "60"))
+        # Browser cache lifetime for proxied images (they are immutable per URL)
+        self.browser_max_age: int = int(os.getenv("IMAGE_BROWSER_MAX_AGE", "86400"))
+        self.timeout: float = float(os.getenv("IMAGE_PROXY_TIMEOUT", "60"))  # Image generation can be slow
+        self.max_connections: int = int(os.getenv("IMAGE_PROXY_MAX_CONNECTIONS", "32"))
+        # Smaller responses are treated as upstream error pages
+        self.min_image_bytes: int = int(os.getenv("IMAGE_MIN_BYTES", "1000"))
+        self.thumbnail_workers: int = int(os.getenv("IMAGE_THUMBNAIL_WORKERS", "2"))
+        self.thumbnail_max_dimension: int = int(os.getenv("IMAGE_THUMBNAIL_MAX_DIMENSION", "2048"))
+        self.thumbnail_quality: int = int(os.getenv("IMAGE_THUMBNAIL_QUALITY", "80"))
+
+
+class UpstreamImageError(Exception):
+    """Upstream did not return a usable image"""
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ThumbnailRequestError(ValueError):
+    """Invalid thumbnail parameters"""
+
+
+# Output format -> content type, in order of preference for format=auto
+THUMBNAIL_FORMATS = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+
+def supported_thumbnail_formats() -> set:
+    """Formats the installed Pillow can encode; empty when Pillow is not installed"""
+    try:
+        from PIL import features
+    except ImportError:
+        return set()
+    formats = {"jpeg"}
+    for fmt in ("webp", "avif"):
+        if features.check(fmt):
+            formats.add(fmt)
+    return formats
+
+
+def render_thumbnail(src_path: str, width: Optional[int], height: Optional[int], fmt: str, quality: int) -> bytes:
+    """
+    Resize the image at `src_path` and encode it as `fmt`. Runs in a worker process.
+
+    With both dimensions the image is cropped to fill the box (like CSS
+    object-fit: cover); with one, the other follows the aspect ratio.
+    Images are never upscaled.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if width and height:
+            scale = min(1.0, max(width / img.width, height / img.height))
+            box = (min(width, round(img.width * scale)) or 1, min(height, round(img.height * scale)) or 1)
+            img = ImageOps.fit(img, box, method=Image.Resampling.LANCZOS)
+        else:
+            img.thumbnail((width or img.width, height or img.height), Image.Resampling.LANCZOS)
+
+        if fmt == "jpeg" and img.mode != "RGB":
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+
+        out = io.BytesIO()
+        img.save(out, format=fmt.upper(), quality=quality)
+        return out.getvalue()
+
+
+@dataclass
+class CachedImage:
+    path: str
+    content_type: str
+    etag: str
+    size: int
+    digest: str
+
+
+class OpenedImage:
+    """
+    A cached image opened for serving. The open handle keeps the body readable
+    even if the blob is evicted (unlinked) while the response is streaming.
+    """
+
+    def __init__(self, image: CachedImage, file: BinaryIO):
+        self.image = image
+        self._file = file
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                chunk = await asyncio.to_thread(self._file.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        self._file.close()
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock across worker processes (a no-op where fcntl is unavailable)"""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def etag_for(digest: str) -> str:
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches `etag` (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class DiskImageCache:
+    """
+    Content-addressed image store with size-based LRU eviction.
+
+    Bodies live in `blobs/<sha256 of content>`, so identical images fetched
+    through different URLs are stored once; `index/<sha256 of URL>.json`
+    maps a URL to its blob and content type, and `refs/<blob>/` lists the
+    index entries pointing at each blob so they are deleted with it.
+
+    The directory is shared by every worker process. Blob mtimes record
+    recency (lookups touch them), and the size limit applies to the whole
+    directory: when this process's running total goes over `max_bytes`, or
+    every `scan_interval` seconds, it rescans `blobs/` under a file lock and
+    deletes the least recently used blobs down to 90% of `max_bytes`.
+    Pinned blobs (e.g. an original being rendered into a thumbnail) are
+    never evicted by the process that pinned them.
+
+    Methods do blocking file I/O and are safe to call from worker threads.
+    """
+
+    # Evict down to this fraction of max_bytes, so a full cache isn't rescanned on every write
+    LOW_WATER = 0.9
+
+    def __init__(self, root: str, max_bytes: int, scan_interval: float = 60.0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.scan_interval = scan_interval
+        self.blob_dir = os.path.join(root, "blobs")
+        self.index_dir = os.path.join(root, "index")
+        self.refs_dir = os.path.join(root, "refs")
+        self.tmp_dir = os.path.join(root, "tmp")
+        for path in (self.blob_dir, self.index_dir, self.refs_dir, self.tmp_dir):
+            os.makedirs(path, exist_ok=True)
+        self._lock_path = os.path.join(root, "evict.lock")
+        self._lock = threading.Lock()
+        # digest -> size, least recently used first
+        self._blobs: "OrderedDict[str, int]" = OrderedDict()
+        self._pins: Counter = Counter()
+        self._scanned_at = 0.0
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.scans = 0
+        self._load()
+
+    def _load(self):
+        # Drop index entries left without a blob and add refs for entries written before refs existed
+        for name in os.listdir(self.index_dir):
+            meta = self._read_index(os.path.join(self.index_dir, name))
+            digest = (meta or {}).get("digest", "")
+            if digest and os.path.exists(self._blob_path(digest)):
+                self._add_ref(digest, name)
+            else:
+                self._remove_index(name, digest or None)
+        with self._lock:
+            self._evict(force_scan=True)
+
+    def _index_path(self, url: str) -> str:
+        return os.path.join(self.index_dir, f"{url_key(url)}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest)
+
+    @staticmethod
+    def _read_index(path: str) -> Optional[dict]:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _add_ref(self, digest: str, index_name: str):
+        ref_dir = os.path.join(self.refs_dir, digest)
+        os.makedirs(ref_dir, exist_ok=True)
+        open(os.path.join(ref_dir, index_name), "a").close()
+
+    def _remove_index(self, index_name: str, digest: Optional[str]):
+        """Delete an index entry if it still points at `digest` (None: unconditionally)"""
+        path = os.path.join(self.index_dir, index_name)
+        if digest is not None:
+            meta = self._read_index(path)
+            if meta is not None and meta.get("digest") != digest:
+                return  # Rewritten to another blob since the ref was added
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _remove_blob(self, digest: str):
+        """Delete a blob and every index entry pointing at it"""
+        try:
+            os.remove(self._blob_path(digest))
+        except OSError:
+            pass
+        ref_dir = os.path.join(self.refs_dir, digest)
+        try:
+            names = os.listdir(ref_dir)
+        except OSError:
+            names = []
+        for name in names:
+            self._remove_index(name, digest)
+            try:
+                os.remove(os.path.join(ref_dir, name))
+            except OSError:
+                pass
+        try:
+            os.rmdir(ref_dir)
+        except OSError:
+            pass
+
+    def get(self, url: str, pin: bool = False) -> Optional[CachedImage]:
+        """Look up `url`; with `pin=True` the blob stays on disk until `unpin()`"""
+        return self._lookup(url, pin=pin)
+
+    def open(self, url: str) -> Optional[OpenedImage]:
+        """Look up `url` and open its blob for reading"""
+        return self._lookup(url, open_file=True)
+
+    def _lookup(self, url: str, pin: bool = False, open_file: bool = False):
+        index_path = self._index_path(url)
+        meta = self._read_index(index_path)
+        if meta is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        digest = meta.get("digest", "")
+        path = self._blob_path(digest)
+        # Under the lock so the blob can't be evicted between the check and the open/pin
+        with self._lock:
+            try:
+                if open_file:
+                    file = open(path, "rb")
+                    size = os.fstat(file.fileno()).st_size
+                else:
+                    size = os.path.getsize(path)
+            except OSError:
+                # Blob was evicted (possibly by another worker)
+                if digest in self._blobs:
+                    self.total_bytes -= self._blobs.pop(digest)
+                self.misses += 1
+                self._remove_index(os.path.basename(index_path), digest)
+                return None
+            if digest not in self._blobs:
+                # Written by another worker since the last scan
+                self._blobs[digest] = size
+                self.total_bytes += size
+            self._blobs.move_to_end(digest)
+            if pin:
+                self._pins[digest] += 1
+            self.hits += 1
+        try:
+            os.utime(path)  # Shared recency for every worker's eviction
+        except OSError:
+            pass
+        image = CachedImage(
+            path=path,
+            content_type=meta.get("content_type", "image/jpeg"),
+            etag=etag_for(digest),
+            size=size,
+            digest=digest,
+        )
+        return OpenedImage(image, file) if open_file else image
+
+    def unpin(self, image: CachedImage):
+        with self._lock:
+            self._pins[image.digest] -= 1
+            if self._pins[image.digest] <= 0:
+                del self._pins[image.digest]
+            self._evict()
+
+    def writer(self) -> "ImageWriter":
+        return ImageWriter(self)
+
+    def put(self, url: str, data: bytes, content_type: str) -> CachedImage:
+        writer = self.writer()
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.discard()
+            raise
+        return writer.commit(url, content_type)
+
+    def _commit(self, url: str, tmp_path: str, digest: str, size: int, content_type: str) -> CachedImage:
+        path = self._blob_path(digest)
+        index_name = os.path.basename(self._index_path(url))
+        with self._lock:
+            try:
+                os.utime(path)  # Already stored (possibly through another URL)
+                os.remove(tmp_path)
+            except OSError:
+                os.replace(tmp_path, path)
+            if digest not in self._blobs:
+                self._blobs[digest] = size
+                self.total_bytes += size
+            self._blobs.move_to_end(digest)
+
+            self._add_ref(digest, index_name)
+            index_tmp = os.path.join(self.tmp_dir, f"{index_name}.{os.getpid()}.{threading.get_ident()}")
+            with open(index_tmp, "w") as f:
+                json.dump({"digest": digest, "content_type": content_type, "url": url[:2000], "stored_at": time.time()}, f)
+            os.replace(index_tmp, os.path.join(self.index_dir, index_name))
+
+            self._evict(keep=digest)
+        return CachedImage(path=path, content_type=content_type, etag=etag_for(digest), size=size, digest=digest)
+
+    def _scan(self):
+        """Rebuild the blob list and total from the shared directory, least recently used first (caller holds the lock)"""
+        # Coarse mtimes can tie; this process's own order breaks the tie
+        rank = {digest: i for i, digest in enumerate(self._blobs)}
+        blobs = []
+        for name in os.listdir(self.blob_dir):
+            try:
+                stat = os.stat(os.path.join(self.blob_dir, name))
+            except OSError:
+                continue
+            blobs.append((stat.st_mtime_ns, rank.get(name, -1), name, stat.st_size))
+        blobs.sort()
+        self._blobs = OrderedDict((digest, size) for _, _, digest, size in blobs)
+        self.total_bytes = sum(self._blobs.values())
+        self._scanned_at = time.monotonic()
+        self.scans += 1
+
+    def _evict(self, keep: Optional[str] = None, force_scan: bool = False):
+        """
+        Rescan and delete least recently used, unpinned blobs if this process
+        thinks the directory is over max_bytes or a scan is due (caller holds the lock)
+        """
+        scan_due = time.monotonic() - self._scanned_at >= self.scan_interval
+        if self.total_bytes <= self.max_bytes and not scan_due and not force_scan:
+            return
+        with _file_lock(self._lock_path):
+            self._scan()
+            if self.total_bytes <= self.max_bytes:
+                return
+            target = self.max_bytes * self.LOW_WATER
+            for digest in list(self._blobs):
+                if self.total_bytes <= target:
+                    break
+                if digest == keep or digest in self._pins:
+                    continue
+                self.total_bytes -= self._blobs.pop(digest)
+                self.evictions += 1
+                self._remove_blob(digest)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "dir": self.root,
+                "blobs": len(self._blobs),
+                "pinned": len(self._pins),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "scans": self.scans,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class ImageWriter:
+    """Writes a body to a temp file while hashing it; `commit()` moves it into the cache"""
+
+    def __init__(self, cache: DiskImageCache):
+        self.cache = cache
+        fd, self.tmp_path = tempfile.mkstemp(dir=cache.tmp_dir, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self, url: str, content_type: str) -> CachedImage:
+        self._file.close()
+        return self.cache._commit(url, self.tmp_path, self._hash.hexdigest(), self.size, content_type)
+
+    def discard(self):
+        self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+class UpstreamImage:
+    """An upstream image response ready to be streamed (and cached) chunk by chunk"""
+
+    def __init__(self, proxy: "ImageProxy", url: str, response: httpx.Response, head: bytes, chunks: AsyncIterator[bytes]):
+        self.proxy = proxy
+        self.url = url
+        self.response = response
+        self.content_type = response.headers.get("content-type", "image/jpeg")
+        self.content_length = response.headers.get("content-length")
+        self._head = head
+        self._chunks = chunks
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        writer = None
+        # Chunks are collected and written to disk in CHUNK_SIZE batches off the event loop
+        pending = bytearray()
+        try:
+            writer = await asyncio.to_thread(self.proxy.cache.writer)
+            pending += self._head
+            yield self._head
+            async for chunk in self._chunks:
+                pending += chunk
+                if len(pending) >= CHUNK_SIZE:
+                    await asyncio.to_thread(writer.write, bytes(pending))
+                    pending.clear()
+                yield chunk
+            if pending:
+                await asyncio.to_thread(writer.write, bytes(pending))
+            cached = await asyncio.to_thread(writer.commit, self.url, self.content_type)
+            writer = None
+            logger.info(f"[PROXY-IMAGE] Cached {cached.size} bytes as {cached.etag}")
+        finally:
+            if writer is not None:
+                # Client disconnected or upstream failed mid-body
+                await asyncio.to_thread(writer.discard)
+            await self.response.aclose()
+
+
+class ImageProxy:
+    """Pooled upstream client plus the disk cache behind `/proxy-image`"""
+
+    def __init__(self, config: Optional[ImageProxyConfig] = None):
+        self.config = config or ImageProxyConfig()
+        self.cache = DiskImageCache(self.config.cache_dir, self.config.cache_max_bytes, self.config.cache_scan_interval)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._renders = SingleFlight()
+        self.thumbnail_formats = supported_thumbnail_formats()
+        self.upstream_fetches = 0
+        self.thumbnails_rendered = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # Disable SSL verification for dev (Pollinations uses valid certs but Windows can have issues)
+            self._client = httpx.AsyncClient(
+                timeout=self.config.timeout,
+                follow_redirects=True,
+                verify=False,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_connections,
+                ),
+            )
+        return self._client
+
+    async def open_cached(self, url: str) -> Optional[OpenedImage]:
+        """The cached image for `url` opened for serving, or None on a miss"""
+        return await asyncio.to_thread(self.cache.open, url)
+
+    async def open_upstream(self, url: str) -> UpstreamImage:
+        """
+        Start streaming `url` from upstream. Reads just enough of the body to
+        reject error pages, then hands back the rest as a stream.
+        """
+        client = self._get_client()
+        response = await client.send(client.build_request("GET", url), stream=True)
+        self.upstream_fetches += 1
+        try:
+            logger.info(f"[PROXY-IMAGE] Got response: {response.status_code}")
+            if response.status_code != 200:
+                raise UpstreamImageError(response.status_code, f"Upstream returned {response.status_code}")
+
+            chunks = response.aiter_bytes()
+            head = b""
+            async for chunk in chunks:
+                head += chunk
+                if len(head) >= self.config.min_image_bytes:
+                    break
+            if len(head) < self.config.min_image_bytes:
+                raise UpstreamImageError(502, "Image response too small")
+            return UpstreamImage(self, url, response, head, chunks)
+        except BaseException:
+            await response.aclose()
+            raise
+
+    def negotiate_format(self, requested: Optional[str], accept: Optional[str]) -> str:
+        """Pick the thumbnail format: an explicit `requested` one, else the best the browser accepts"""
+        if requested and requested.lower() != "auto":
+            fmt = "jpeg" if requested.lower() == "jpg" else requested.lower()
+            if fmt not in THUMBNAIL_FORMATS:
+                raise ThumbnailRequestError(f"Unsupported format '{requested}'")
+            if fmt not in self.thumbnail_formats:
+                raise ThumbnailRequestError(f"Format '{fmt}' is not available on this server")
+            return fmt
+        accept = (accept or "").lower()
+        for fmt, content_type in THUMBNAIL_FORMATS.items():
+            if fmt in self.thumbnail_formats and content_type in accept:
+                return fmt
+        return "jpeg"
+
+    def validate_size(self, width: Optional[int], height: Optional[int]):
+        limit = self.config.thumbnail_max_dimension
+        for name, value in (("w", width), ("h", height)):
+            if value is not None and not 1 <= value <= limit:
+                raise ThumbnailRequestError(f"'{name}' must be between 1 and {limit}")
+
+    async def thumbnail(self, url: str, width: Optional[int], height: Optional[int], fmt: str, regenerate: bool = False) -> OpenedImage:
+        """
+        Return a cached `fmt` thumbnail of `url` opened for serving, rendering
+        it (and fetching the original) on a miss. Thumbnails are cached under
+        a key derived from the URL and parameters; concurrent requests for the
+        same one render once.
+        """
+        key = f"{url}#thumbnail={width or ''}x{height or ''}.{fmt}"
+        if not regenerate:
+            opened = await self.open_cached(key)
+            if opened:
+                return opened
+        for _ in range(2):
+            await self._renders.do(key, lambda: self._render(url, key, width, height, fmt, regenerate))
+            opened = await self.open_cached(key)
+            if opened:
+                return opened
+            regenerate = False  # Evicted right after rendering by a concurrent write - render again
+        raise UpstreamImageError(502, "Thumbnail could not be cached")
+
+    async def _render(self, url: str, key: str, width: Optional[int], height: Optional[int], fmt: str, regenerate: bool) -> CachedImage:
+        original = None if regenerate else await asyncio.to_thread(self.cache.get, url, True)
+        if original is None:
+            upstream = await self.open_upstream(url)
+            async for _ in upstream.iter_bytes():
+                pass  # Stored in the cache as it is read
+            original = await asyncio.to_thread(self.cache.get, url, True)
+            if original is None:
+                raise UpstreamImageError(502, "Image could not be cached")
+
+        # The original stays pinned so eviction can't delete it under the worker process
+        try:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.config.thumbnail_workers)
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(
+                self._pool, render_thumbnail, original.path, width, height, fmt, self.config.thumbnail_quality
+            )
+        finally:
+            await asyncio.to_thread(self.cache.unpin, original)
+        self.thumbnails_rendered += 1
+        logger.info(f"[PROXY-IMAGE] Rendered {fmt} thumbnail {width}x{height}: {original.size} -> {len(data)} bytes")
+        return await asyncio.to_thread(self.cache.put, key, data, THUMBNAIL_FORMATS[fmt])
+
+    def stats(self) -> dict:
+        return {
+            "upstream_fetches": self.upstream_fetches,
+            "thumbnail_formats": sorted(self.thumbnail_formats),
+            "thumbnails_rendered": self.thumbnails_rendered,
+            "cache": self.cache.stats(),
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
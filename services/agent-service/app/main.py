@@ -13,21 +13,28 @@ from contextlib import asynccontextmanager
 from datetime import datetime
 import httpx
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials
 import traceback
+import asyncio
+import json
+import time
 import pytz
 
 from .config import settings
-from .mcp_client import MCPClient
+from .mcp_client import MCPClient, MCPUnavailableError
 from .linkedin_agent import LinkedInOAuthAgent
 from .twitter_agent import TwitterOAuthAgent
 from .facebook_agent import FacebookOAuthAgent
 from .content_agent import ContentRefinementAgent
 from .trending_agent import TrendingTopicsAgent
+from .trending_prefetch import TrendingPrefetcher
+from .image_proxy import ImageProxy, OpenedImage, ThumbnailRequestError, UpstreamImageError, etag_matches
+from .data_store import AgentDataStore, create_firestore_data_store
 
 # Add parent directory to path for shared utilities
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 from shared.logging_utils import CorrelationLogger, generate_correlation_id
+from shared.token_cache import token_cache
 
 # Configure logging
 logging.basicConfig(
@@ -35,12 +42,24 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+# httpx logs full request URLs at INFO, and GNews takes its API key as a query parameter
+logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # Service Config
 INTEGRATION_SERVICE_URL = os.getenv("INTEGRATION_SERVICE_URL", "http://localhost:8002")
 
-# Service Config
-INTEGRATION_SERVICE_URL = os.getenv("INTEGRATION_SERVICE_URL", "http://localhost:8002")
+# Model used by the Composer chat endpoints
+CHAT_MODEL = "gpt-4o-mini"
+
+# Per-platform timeout (seconds) when fanning out a multi-platform post
+PLATFORM_POST_TIMEOUT = float(os.getenv("PLATFORM_POST_TIMEOUT", "60"))
+
+# MCP tool used to publish on each platform
+MCP_POST_TOOLS = {
+    "linkedin": "postToLinkedIn",
+    "twitter": "postToTwitter",
+    "facebook": "postToFacebook",
+}
 
 # Initialize correlation logger
 # Use absolute path to project root logs directory
@@ -59,15 +78,18 @@ twitter_agent: Optional[TwitterOAuthAgent] = None
 facebook_agent: Optional[FacebookOAuthAgent] = None
 content_agent: Optional[ContentRefinementAgent] = None
 trending_agent: Optional[TrendingTopicsAgent] = None
+trending_prefetcher: Optional[TrendingPrefetcher] = None
+image_proxy: Optional[ImageProxy] = None
+openai_client = None  # Shared AsyncOpenAI client for chat, created on first use
+integration_client: Optional[httpx.AsyncClient] = None  # Pooled client for Integration Service calls, created on first use
 
-# Global Firebase DB client
-db = None
+# Async Firestore data-access layer (created in lifespan, bound to the running loop)
+data_store: Optional[AgentDataStore] = None
 
 # Robust Firebase Initialization
 try:
     # Check if Firebase is already initialized
     firebase_admin.get_app()
-    db = firestore.client()
     logger.info("✅ Firebase already initialized and connected")
 except ValueError:
     # Initialize Firebase with credentials from environment
@@ -93,7 +115,6 @@ except ValueError:
                     "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
                 })
                 firebase_admin.initialize_app(cred)
-                db = firestore.client()
                 logger.info("✅ Firebase initialized successfully with real credentials")
         else:
             logger.warning("❌ CRITICAL: Firebase credentials are incomplete or missing!")
@@ -101,51 +122,10 @@ except ValueError:
         logger.error(f"❌ ERROR: Could not initialize Firebase: {e}")
         logger.error(traceback.format_exc())
 
-# Helper to get platform tokens
-def get_platform_token(user_id: str, platform: str) -> Optional[str]:
-    """Retrieve OAuth access token for a user and platform from Firestore"""
-    if db is None:
-        logger.warning(f"Firestore not initialized, cannot get token for {platform}")
-        return None
-    try:
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
-        
-        if not user_doc.exists:
-            return None
-            
-        user_data = user_doc.to_dict()
-        integrations = user_data.get('integrations', {})
-        platform_data = integrations.get(platform, {})
-        return platform_data.get('access_token')
-    except Exception as e:
-        logger.error(f"Error fetching {platform} token: {e}")
-        return None
-
-
-def get_business_context(user_id: str) -> Optional[dict]:
-    """Retrieve business profile context for a user from Firestore.
-    Returns the business profile dict if user is a business user, else None.
-    """
-    if db is None:
-        return None
-    try:
-        account_ref = db.document(f'users/{user_id}/profile/accountType')
-        account_doc = account_ref.get()
-        if account_doc.exists:
-            data = account_doc.to_dict()
-            if data.get('userType') == 'business' and data.get('businessProfile'):
-                logger.info(f"✅ Business context found for user {user_id}: {data['businessProfile'].get('businessName', 'Unknown')}")
-                return data['businessProfile']
-        return None
-    except Exception as e:
-        logger.error(f"Error fetching business context for {user_id}: {e}")
-        return None
-
 # Helper to save post history
 async def save_post_history(user_id: str, content: str, platforms: list, results: dict):
     """Save posted content to Firestore 'scheduled_posts' collection so it appears in Calendar"""
-    if db is None:
+    if data_store is None:
         logger.warning("Firestore not initialized, cannot save post history")
         return
         
@@ -180,7 +160,7 @@ async def save_post_history(user_id: str, content: str, platforms: list, results
         }
         
         # Add to 'scheduled_posts' collection so it appears in Calendar
-        db.collection('users').document(user_id).collection('scheduled_posts').add(post_doc)
+        await data_store.add_scheduled_post(user_id, post_doc)
         logger.info(f"✅ Saved AI chat post to 'scheduled_posts' for calendar - user: {user_id}, platforms: {successful_platforms}")
         
     except Exception as e:
@@ -193,20 +173,26 @@ async def save_post_history(user_id: str, content: str, platforms: list, results
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager for the application"""
-    global mcp_client, linkedin_agent, twitter_agent, facebook_agent, content_agent, trending_agent
+    global mcp_client, linkedin_agent, twitter_agent, facebook_agent, content_agent, trending_agent, trending_prefetcher, image_proxy, data_store
     
     # Startup
     logger.info("Initializing Agent Service...")
     
     try:
+        # Async Firestore client must be created inside the running event loop
+        data_store = create_firestore_data_store()
+        
         # Initialize MCP client
-        mcp_client = MCPClient(settings.mcp_server.base_url)
+        mcp_client = MCPClient(
+            settings.mcp_server.base_url,
+            tools_ttl=settings.mcp_server.tools_ttl,
+            discovery_wait=settings.mcp_server.discovery_wait
+        )
         logger.info(f"MCP Client initialized with server: {settings.mcp_server.base_url}")
         
-        # Discover available tools with force refresh to get latest from MCP server
-        tools = await mcp_client.discover_tools(force_refresh=True)
-        tool_names = [tool.get('name') for tool in tools.get('tools', [])]
-        logger.info(f"Discovered {len(tools.get('tools', []))} MCP tools: {tool_names}")
+        # Discover tools in the background so a slow or down MCP server doesn't block startup;
+        # requests that need MCP wait for it (bounded by MCP_DISCOVERY_WAIT_SECONDS)
+        mcp_client.start_discovery()
         
         # Initialize LinkedIn agent
         linkedin_agent = LinkedInOAuthAgent(
@@ -244,6 +230,14 @@ async def lifespan(app: FastAPI):
         )
         logger.info("Trending Topics Agent initialized")
         
+        # Keep popular interests warm in the trending cache
+        trending_prefetcher = TrendingPrefetcher(trending_agent)
+        trending_prefetcher.start()
+        
+        # Pooled client + disk cache for /proxy-image
+        image_proxy = ImageProxy()
+        logger.info(f"Image proxy cache at {image_proxy.config.cache_dir}")
+        
     except Exception as e:
         logger.error(f"Failed to initialize services: {str(e)}")
         raise
@@ -254,6 +248,14 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down Agent Service...")
     if mcp_client:
         await mcp_client.close()
+    if trending_prefetcher:
+        await trending_prefetcher.stop()
+    if trending_agent:
+        await trending_agent.close()
+    if image_proxy:
+        await image_proxy.close()
+    if integration_client:
+        await integration_client.aclose()
 
 
 app = FastAPI(
@@ -275,44 +277,79 @@ app.add_middleware(
 
 # --- Image Proxy Endpoint (Bypass CORS for external AI images) ---
 import httpx
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+
+def cached_image_response(opened: OpenedImage, headers: dict, if_none_match: Optional[str]) -> Response:
+    """304 when the browser's copy is current, else the cached body streamed from its open file"""
+    headers = {**headers, "ETag": opened.image.etag}
+    if etag_matches(if_none_match, opened.image.etag):
+        opened.close()
+        return Response(status_code=304, headers=headers)
+    headers["Content-Length"] = str(opened.image.size)
+    return StreamingResponse(opened.iter_bytes(), media_type=opened.image.content_type, headers=headers)
+
 
 @app.get("/proxy-image")
-async def proxy_image(url: str):
+async def proxy_image(
+    url: str,
+    request: Request,
+    regenerate: bool = False,
+    w: Optional[int] = None,
+    h: Optional[int] = None,
+    format: Optional[str] = None
+):
     """
     Proxy external images through our backend to bypass CORS restrictions.
     Used for fetching AI-generated images from services like Pollinations.ai.
+    Images are served from the disk cache when present (with ETag/304);
+    `regenerate=true` skips the cache and stores the freshly fetched image.
+    `w`/`h`/`format` (webp, avif, jpeg or auto) return a resized thumbnail.
     """
     logger.info(f"[PROXY-IMAGE] Fetching: {url[:100]}...")
+    cache_headers = {
+        "Cache-Control": f"public, max-age={image_proxy.config.browser_max_age}",
+        "Access-Control-Allow-Origin": "*"
+    }
     
     try:
-        # Disable SSL verification for dev (Pollinations uses valid certs but Windows can have issues)
-        async with httpx.AsyncClient(
-            timeout=60.0,  # Longer timeout - image generation can be slow
-            follow_redirects=True,
-            verify=False  # Bypass SSL cert verification for development
-        ) as client:
-            response = await client.get(url)
-            
-            logger.info(f"[PROXY-IMAGE] Got response: {response.status_code}, size: {len(response.content)} bytes")
-            
-            if response.status_code != 200:
-                logger.error(f"[PROXY-IMAGE] Upstream returned {response.status_code}")
-                raise HTTPException(status_code=response.status_code, detail=f"Upstream returned {response.status_code}")
-            
-            if len(response.content) < 1000:
-                logger.error(f"[PROXY-IMAGE] Response too small, likely an error page")
-                raise HTTPException(status_code=502, detail="Image response too small")
-            
-            # Return the image with proper headers
-            return Response(
-                content=response.content,
-                media_type=response.headers.get("content-type", "image/jpeg"),
-                headers={
-                    "Cache-Control": "no-cache",  # Don't cache so regenerate works
-                    "Access-Control-Allow-Origin": "*"
-                }
-            )
+        wants_thumbnail = w is not None or h is not None or bool(format)
+        if wants_thumbnail and not image_proxy.thumbnail_formats:
+            logger.warning("[PROXY-IMAGE] Pillow not installed, serving original image")
+        elif wants_thumbnail:
+            image_proxy.validate_size(w, h)
+            fmt = image_proxy.negotiate_format(format, request.headers.get("accept"))
+            thumb = await image_proxy.thumbnail(url, w, h, fmt, regenerate=regenerate)
+            headers = dict(cache_headers)
+            if not format or format.lower() == "auto":
+                headers["Vary"] = "Accept"
+            if regenerate:
+                headers["Cache-Control"] = "no-cache"
+            return cached_image_response(thumb, headers, None if regenerate else request.headers.get("if-none-match"))
+        
+        if not regenerate:
+            cached = await image_proxy.open_cached(url)
+            if cached:
+                logger.info(f"[PROXY-IMAGE] Cache hit: {cached.image.size} bytes")
+                return cached_image_response(cached, cache_headers, request.headers.get("if-none-match"))
+        
+        upstream = await image_proxy.open_upstream(url)
+        headers = dict(cache_headers)
+        if regenerate:
+            headers["Cache-Control"] = "no-cache"  # Don't let the browser keep the replaced image
+        if upstream.content_length and "content-encoding" not in upstream.response.headers:
+            headers["Content-Length"] = upstream.content_length
+        
+        # Stream straight through; the body is written to the cache as it passes
+        return StreamingResponse(
+            upstream.iter_bytes(),
+            media_type=upstream.content_type,
+            headers=headers
+        )
+    except ThumbnailRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamImageError as e:
+        logger.error(f"[PROXY-IMAGE] {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except httpx.RequestError as e:
         logger.error(f"[PROXY-IMAGE] Request error: {type(e).__name__}: {e}")
         raise HTTPException(status_code=502, detail=f"Request failed: {str(e)}")
@@ -528,23 +565,38 @@ async def health_check(request: Request):
     correlation_id = getattr(request.state, "correlation_id", "unknown")
     
     try:
-        # Check MCP server connectivity
+        # MCP readiness is reported separately; the service is up either way
         if mcp_client:
-            tools = await mcp_client.list_available_tools()
+            tools = mcp_client.registry.names()
+            discovery = mcp_client.discovery_status()
             
-            correlation_logger.success(
-                f"Health check passed - {len(tools)} MCP tools available",
-                correlation_id=correlation_id,
-                additional_data={
-                    "mcp_server": settings.mcp_server.base_url,
-                    "tools_count": len(tools)
-                }
-            )
+            if discovery["ready"]:
+                correlation_logger.success(
+                    f"Health check passed - {len(tools)} MCP tools available",
+                    correlation_id=correlation_id,
+                    additional_data={
+                        "mcp_server": settings.mcp_server.base_url,
+                        "tools_count": len(tools)
+                    }
+                )
+            else:
+                correlation_logger.warning(
+                    f"Health check - MCP tool discovery {discovery['state']}",
+                    correlation_id=correlation_id,
+                    additional_data={"mcp_server": settings.mcp_server.base_url, "last_error": discovery["last_error"]}
+                )
             
             return {
                 "status": "healthy",
                 "mcp_server": settings.mcp_server.base_url,
-                "available_tools": len(tools)
+                "mcp_ready": discovery["ready"],
+                "mcp_discovery": discovery,
+                "available_tools": len(tools),
+                "mcp_registry": mcp_client.registry_stats(),
+                "token_cache": token_cache.stats(),
+                "trending_cache": trending_agent.cache_stats() if trending_agent else None,
+                "trending_prefetch": trending_prefetcher.stats() if trending_prefetcher else None,
+                "image_proxy": image_proxy.stats() if image_proxy else None
             }
         else:
             correlation_logger.warning(
@@ -595,6 +647,8 @@ async def get_mcp_tools(request: Request):
         
         return {"tools": tools}
         
+    except MCPUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"Error fetching MCP tools: {str(e)}")
         
@@ -1549,85 +1603,93 @@ async def refresh_mcp_tools(request: Request):
 # AI CHAT ENDPOINT FOR COMPOSER 2.0 WITH TOOL CALLING
 # ============================================================
 
-async def execute_post_to_platforms(user_id: str, content: str, platforms: list, correlation_id: str, image_data: str = None, image_mime_type: str = None):
-    """Execute posting to specified platforms via MCP using direct token access"""
-    results = {}
+async def _post_to_platform(user_id: str, platform: str, content: str, correlation_id: str, image_data: str = None, image_mime_type: str = None) -> dict:
+    """Post to a single platform via MCP (or Integration Service for LinkedIn images)"""
+    # Token lookups are served by the shared token cache, warmed once per fan-out
+    token = await data_store.get_platform_token(user_id, platform) if data_store else None
     
-    for platform in platforms:
-        try:
-            # Get token directly from DB
-            token = get_platform_token(user_id, platform)
-            
-            if not token:
-                results[platform] = {"success": False, "error": "Not authenticated. Please connect account first."}
-                continue
+    if not token:
+        return {"success": False, "error": "Not authenticated. Please connect account first."}
+
+    if platform == "linkedin" and image_data:
+        # Bypass MCP for LinkedIn image posts and call Integration Service directly
+        response = await get_integration_client().post(
+            f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/post-with-image",
+            json={
+                "content": content,
+                "user_id": user_id,
+                "image_data": image_data,
+                "image_mime_type": image_mime_type or "image/jpeg"
+            },
+            timeout=60.0
+        )
+        if response.status_code == 200:
+            return {"success": True, "result": response.json()}
+        return {"success": False, "error": f"Failed to upload image: {response.text}"}
+    
+    tool_name = MCP_POST_TOOLS.get(platform)
+    if not tool_name:
+        return {"success": False, "error": f"Platform {platform} not supported yet"}
+    
+    result = await mcp_client.invoke_tool(
+        tool_name=tool_name,
+        parameters={
+            "content": content, 
+            "accessToken": token,
+            "userId": user_id,
+            "imageData": image_data,
+            "imageMimeType": image_mime_type
+        },
+        correlation_id=correlation_id,
+        user_id=user_id
+    )
+    return {"success": True, "result": result}
 
-            if platform == "linkedin":
-                if image_data:
-                    # Bypass MCP for LinkedIn image posts and call Integration Service directly
-                    async with httpx.AsyncClient() as client:
-                        response = await client.post(
-                            f"{INTEGRATION_SERVICE_URL}/api/integrations/linkedin/post-with-image",
-                            json={
-                                "content": content,
-                                "user_id": user_id,
-                                "image_data": image_data,
-                                "image_mime_type": image_mime_type or "image/jpeg"
-                            },
-                             timeout=60.0
-                        )
-                        if response.status_code == 200:
-                             result = response.json()
-                             results[platform] = {"success": True, "result": result}
-                        else:
-                             results[platform] = {"success": False, "error": f"Failed to upload image: {response.text}"}
-                else: 
-                     result = await mcp_client.invoke_tool(
-                        tool_name="postToLinkedIn",
-                        parameters={
-                            "content": content, 
-                            "accessToken": token,
-                            "userId": user_id,
-                            "imageData": image_data,
-                            "imageMimeType": image_mime_type
-                        },
-                        correlation_id=correlation_id,
-                        user_id=user_id
-                    )
-                     results[platform] = {"success": True, "result": result}
-            elif platform == "twitter":
-                result = await mcp_client.invoke_tool(
-                    tool_name="postToTwitter",
-                    parameters={
-                        "content": content, 
-                        "accessToken": token,
-                        "userId": user_id,
-                        "imageData": image_data,
-                        "imageMimeType": image_mime_type
-                    },
-                    correlation_id=correlation_id,
-                    user_id=user_id
-                )
-                results[platform] = {"success": True, "result": result}
-            elif platform == "facebook":
-                result = await mcp_client.invoke_tool(
-                    tool_name="postToFacebook",
-                    parameters={
-                        "content": content, 
-                        "accessToken": token,
-                        "userId": user_id,
-                        "imageData": image_data,
-                        "imageMimeType": image_mime_type
-                    },
-                    correlation_id=correlation_id,
-                    user_id=user_id
-                )
-                results[platform] = {"success": True, "result": result}
-            else:
-                results[platform] = {"success": False, "error": f"Platform {platform} not supported yet"}
+
+async def _timed_post_to_platform(user_id: str, platform: str, content: str, correlation_id: str, image_data: str = None, image_mime_type: str = None) -> dict:
+    """Post to one platform with its own timeout and error isolation, recording elapsed time"""
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(
+            _post_to_platform(user_id, platform, content, correlation_id, image_data, image_mime_type),
+            timeout=PLATFORM_POST_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        result = {"success": False, "error": f"Timed out after {PLATFORM_POST_TIMEOUT:.0f}s"}
+        logger.error(f"Failed to post to {platform}: timed out after {PLATFORM_POST_TIMEOUT}s")
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+        logger.error(f"Failed to post to {platform}: {str(e)}")
+    
+    result["duration_ms"] = round((time.perf_counter() - started) * 1000)
+    return result
+
+
+async def execute_post_to_platforms(user_id: str, content: str, platforms: list, correlation_id: str, image_data: str = None, image_mime_type: str = None):
+    """
+    Execute posting to specified platforms concurrently.
+    Each platform runs with its own timeout, so total latency is that of the
+    slowest platform; per-platform timings are returned as `duration_ms`.
+    """
+    # Read the user's integrations once so the concurrent per-platform lookups hit the cache
+    if data_store:
+        try:
+            await data_store.get_integrations(user_id)
         except Exception as e:
-            results[platform] = {"success": False, "error": str(e)}
-            logger.error(f"Failed to post to {platform}: {str(e)}")
+            logger.warning(f"Token prefetch failed, platforms will retry individually: {e}")
+    
+    outcomes = await asyncio.gather(*[
+        _timed_post_to_platform(user_id, platform, content, correlation_id, image_data, image_mime_type)
+        for platform in platforms
+    ])
+    results = dict(zip(platforms, outcomes))
+
+    correlation_logger.info(
+        "Multi-platform post completed",
+        correlation_id=correlation_id,
+        user_id=user_id,
+        additional_data={p: {"success": r["success"], "duration_ms": r["duration_ms"]} for p, r in results.items()}
+    )
 
     # Save history side-effect
     await save_post_history(user_id, content, platforms, results)
@@ -1656,7 +1718,7 @@ async def execute_schedule_post(user_id: str, content: str, platforms: list, dat
         }
         
         # Save to Firestore directly (Bypassing MCP tool to avoid dependency issues)
-        if db is None:
+        if data_store is None:
             raise Exception("Database connection not initialized")
 
         # Convert ISO strings back to datetime objects for Firestore Timestamp compatibility
@@ -1665,10 +1727,9 @@ async def execute_schedule_post(user_id: str, content: str, platforms: list, dat
         scheduled_post["createdAt"] = datetime.now(pytz.UTC)
 
         # Add to users/{userId}/scheduled_posts
-        doc_ref = db.collection('users').document(user_id).collection('scheduled_posts').document()
-        doc_ref.set(scheduled_post)
+        doc_id = await data_store.add_scheduled_post(user_id, scheduled_post)
         
-        result = {"id": doc_ref.id, "success": True}
+        result = {"id": doc_id, "success": True}
         
         return {
             "success": True,
@@ -1684,37 +1745,30 @@ async def execute_schedule_post(user_id: str, content: str, platforms: list, dat
         }
 
 
-@app.post("/agent/chat", response_model=ChatResponse)
-async def chat_with_ai(
-    request: Request,
-    chat_request: ChatRequest,
-    x_correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID")
-):
-    """
-    AI-powered chat endpoint for the Composer with tool-calling capabilities.
-    Can post content, schedule posts, or just help write/refine content.
-    """
-    correlation_id = x_correlation_id or f"chat-{chat_request.user_id}-{id(request)}"
-    
-    correlation_logger.info(
-        f"AI Chat request received",
-        correlation_id=correlation_id,
-        additional_data={
-            "user_id": chat_request.user_id,
-            "message_preview": chat_request.message[:100] if chat_request.message else "",
-            "has_current_content": bool(chat_request.current_content),
-            "history_length": len(chat_request.conversation_history),
-            "selected_platforms": chat_request.selected_platforms,
-            "connected_platforms": chat_request.connected_platforms
-        }
-    )
+def get_integration_client() -> httpx.AsyncClient:
+    """Return the shared Integration Service client, creating it on first use"""
+    global integration_client
+    if integration_client is None:
+        integration_client = httpx.AsyncClient(timeout=30.0)
+    return integration_client
+
+
+def get_openai_client():
+    """Return the shared AsyncOpenAI client, creating it on first use"""
+    global openai_client
+    if openai_client is None:
+        from openai import AsyncOpenAI
+        openai_client = AsyncOpenAI()
+    return openai_client
+
+
+async def build_chat_messages(chat_request: ChatRequest) -> list:
+    """Build the OpenAI message list (system prompt, history, user turn) for a chat request"""
+    # Build the enhanced system prompt with tool awareness
+    connected_str = ", ".join(chat_request.connected_platforms) if chat_request.connected_platforms else "none"
+    selected_str = ", ".join(chat_request.selected_platforms) if chat_request.selected_platforms else "none"
     
-    try:
-        # Build the enhanced system prompt with tool awareness
-        connected_str = ", ".join(chat_request.connected_platforms) if chat_request.connected_platforms else "none"
-        selected_str = ", ".join(chat_request.selected_platforms) if chat_request.selected_platforms else "none"
-        
-        system_prompt = f"""You are a professional social media content writer and assistant. 
+    system_prompt = f"""You are a professional social media content writer and assistant. 
 Your job is to help users write engaging posts and manage their social media presence.
 
 CURRENT CONTEXT:
@@ -1722,16 +1776,16 @@ CURRENT CONTEXT:
 - User's currently selected platforms: {selected_str}
 - Current date/time: {datetime.now().strftime("%Y-%m-%d %H:%M")}
 """
-        
-        # Inject business context if the user is a business account
-        biz_context = get_business_context(chat_request.user_id)
-        if biz_context:
-            biz_name = biz_context.get('businessName', '')
-            biz_category = biz_context.get('category', '')
-            biz_audience = biz_context.get('targetAudience', '')
-            biz_website = biz_context.get('websiteUrl', '')
-            
-            system_prompt += f"""BUSINESS CONTEXT (this user is a business account):
+    
+    # Inject business context if the user is a business account
+    biz_context = await data_store.get_business_context(chat_request.user_id) if data_store else None
+    if biz_context:
+        biz_name = biz_context.get('businessName', '')
+        biz_category = biz_context.get('category', '')
+        biz_audience = biz_context.get('targetAudience', '')
+        biz_website = biz_context.get('websiteUrl', '')
+        
+        system_prompt += f"""BUSINESS CONTEXT (this user is a business account):
 - Business Name: {biz_name}
 - Industry/Category: {biz_category}
 - Target Audience: {biz_audience}
@@ -1742,8 +1796,8 @@ Use language and topics that resonate with their specific audience.
 When writing posts, reflect the professional identity of {biz_name}.
 
 """
-        
-        system_prompt += f"""CAPABILITIES:
+    
+    system_prompt += f"""CAPABILITIES:
 1. **Write Content**: Help write engaging posts for social media
 2. **Post Now**: When user says "post this", "publish", or "send now" - use the post_to_platforms function
 3. **Schedule**: When user says "schedule for..." - use the schedule_post function
@@ -1784,29 +1838,237 @@ Only include sections for the platforms that are currently selected. If only ONE
 
 When executing actions (posting/scheduling), just respond naturally confirming what you did."""
 
-        # Build conversation messages for OpenAI
-        messages = [{"role": "system", "content": system_prompt}]
+    # Build conversation messages for OpenAI
+    messages = [{"role": "system", "content": system_prompt}]
+    
+    # Add conversation history
+    for msg in chat_request.conversation_history[-10:]:
+        messages.append({
+            "role": msg.role,
+            "content": msg.content
+        })
+    
+    # Add context about current content if exists
+    user_message = chat_request.message
+    if chat_request.current_content:
+        user_message = f"[Current post content in editor: \"{chat_request.current_content}\"]\n\nUser: {chat_request.message}"
+    
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def parse_chat_reply(ai_response: str) -> tuple:
+    """Split an AI reply into (reply, suggested_content, suggested_platforms)"""
+    # Parse the response to extract suggested content
+    suggested_content = None
+    reply = ai_response
+    
+    if "---POST---" in ai_response and "---END---" in ai_response:
+        parts = ai_response.split("---POST---")
+        reply = parts[0].strip()
+        content_part = parts[1].split("---END---")[0].strip()
+        if content_part:
+            suggested_content = content_part
+    
+    # Check for per-platform format (---LINKEDIN---, ---TWITTER---, etc.)
+    platform_markers = ['LINKEDIN', 'TWITTER', 'FACEBOOK', 'INSTAGRAM']
+    has_platform_format = any(f"---{p}---" in ai_response for p in platform_markers)
+    
+    suggested_platforms = None
+    if has_platform_format:
+        suggested_platforms = {}
+        # Extract the reply (text before first platform marker)
+        first_marker_pos = len(ai_response)
+        for p in platform_markers:
+            marker = f"---{p}---"
+            pos = ai_response.find(marker)
+            if pos != -1 and pos < first_marker_pos:
+                first_marker_pos = pos
+        reply = ai_response[:first_marker_pos].strip()
+        
+        # Extract each platform's content
+        for p in platform_markers:
+            marker = f"---{p}---"
+            if marker in ai_response:
+                start = ai_response.find(marker) + len(marker)
+                # Find next marker or ---END---
+                end = len(ai_response)
+                for next_p in platform_markers:
+                    next_marker = f"---{next_p}---"
+                    if next_marker != marker:
+                        next_pos = ai_response.find(next_marker, start)
+                        if next_pos != -1 and next_pos < end:
+                            end = next_pos
+                end_pos = ai_response.find("---END---", start)
+                if end_pos != -1 and end_pos < end:
+                    end = end_pos
+                platform_content = ai_response[start:end].strip()
+                if platform_content:
+                    suggested_platforms[p.lower()] = platform_content
+        
+        # Also set suggested_content to first platform's content for backward compat
+        if suggested_platforms:
+            suggested_content = next(iter(suggested_platforms.values()))
+            logger.info(f"Parsed per-platform content for: {list(suggested_platforms.keys())}")
+    return reply, suggested_content, suggested_platforms
+
+
+async def handle_chat_tool_call(chat_request: ChatRequest, function_name: str, function_args: dict, correlation_id: str) -> Optional[ChatResponse]:
+    """Execute a post/schedule tool call requested by the model; None for unknown tools"""
+    correlation_logger.info(
+        f"AI requesting tool call: {function_name}",
+        correlation_id=correlation_id,
+        additional_data={"function_args": function_args}
+    )
+    
+    # Execute the function
+    if function_name == "post_to_platforms":
+        content = function_args.get("content", chat_request.current_content)
+        platforms = function_args.get("platforms", chat_request.selected_platforms)
         
-        # Add conversation history
-        for msg in chat_request.conversation_history[-10:]:
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+        if not content:
+            return ChatResponse(
+                success=True,
+                reply="I don't see any content to post. Please write something first or tell me what you'd like to post!",
+                action=None
+            )
+        
+        if not platforms:
+            return ChatResponse(
+                success=True,
+                reply="Please select at least one platform to post to, or tell me which platforms you want to use.",
+                action=None
+            )
         
-        # Add context about current content if exists
-        user_message = chat_request.message
-        if chat_request.current_content:
-            user_message = f"[Current post content in editor: \"{chat_request.current_content}\"]\n\nUser: {chat_request.message}"
+        # Execute posting
+        post_results = await execute_post_to_platforms(
+            user_id=chat_request.user_id,
+            content=content,
+            platforms=platforms,
+            correlation_id=correlation_id,
+            image_data=chat_request.image_data,
+            image_mime_type=chat_request.image_mime_type
+        )
         
-        messages.append({"role": "user", "content": user_message})
+        # Build response message
+        success_platforms = [p for p, r in post_results.items() if r.get("success")]
+        failed_platforms = [p for p, r in post_results.items() if not r.get("success")]
         
-        # Call OpenAI with function calling
-        import openai
-        client = openai.OpenAI()
+        if success_platforms and not failed_platforms:
+            reply = f"✅ **Posted successfully!**\n" + "\n".join([f"- {p.title()}: ✓ Posted" for p in success_platforms])
+            reply += "\n\nYour content is now live! 🎉"
+        elif success_platforms and failed_platforms:
+            reply = f"⚠️ **Partially posted**\n"
+            reply += "\n".join([f"- {p.title()}: ✓ Posted" for p in success_platforms])
+            reply += "\n" + "\n".join([f"- {p.title()}: ✗ Failed ({post_results[p].get('error', 'Unknown error')})" for p in failed_platforms])
+        else:
+            reply = f"❌ **Posting failed**\n"
+            reply += "\n".join([f"- {p.title()}: ✗ {post_results[p].get('error', 'Unknown error')}" for p in failed_platforms])
+        
+        if success_platforms:
+            action_type = "posted"
+        else:
+            action_type = None
+
+        return ChatResponse(
+            success=True,
+            reply=reply,
+            action=action_type,
+            action_result={
+                "platforms": platforms,
+                "results": post_results,
+                "content_preview": content[:100] + "..." if len(content) > 100 else content
+            }
+        )
+    
+    elif function_name == "schedule_post":
+        content = function_args.get("content", chat_request.current_content)
+        platforms = function_args.get("platforms", chat_request.selected_platforms)
+        date = function_args.get("date")
+        time_str = function_args.get("time")
+        
+        if not content:
+            return ChatResponse(
+                success=True,
+                reply="I don't see any content to schedule. Please write something first!",
+                action=None
+            )
+        
+        if not platforms:
+            return ChatResponse(
+                success=True,
+                reply="Please select platforms to schedule for.",
+                action=None
+            )
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        # Execute scheduling
+        schedule_result = await execute_schedule_post(
+            user_id=chat_request.user_id,
+            content=content,
+            platforms=platforms,
+            date=date,
+            time=time_str,
+            timezone=chat_request.timezone or "Asia/Kolkata",
+            correlation_id=correlation_id
+        )
+        
+        if schedule_result.get("success"):
+            platforms_str = ", ".join([p.title() for p in platforms])
+            reply = f"📅 **Scheduled successfully!**\n\n"
+            reply += f"Your post will be published to {platforms_str} on {schedule_result.get('scheduled_time')}.\n\n"
+            reply += "You can view and manage your scheduled posts in the Calendar."
+            
+            return ChatResponse(
+                success=True,
+                reply=reply,
+                action="scheduled",
+                action_result={
+                    "platforms": platforms,
+                    "scheduled_time": schedule_result.get("scheduled_time"),
+                    "content_preview": content[:100] + "..." if len(content) > 100 else content
+                }
+            )
+        else:
+            return ChatResponse(
+                success=True,
+                reply=f"❌ Failed to schedule: {schedule_result.get('error')}",
+                action=None
+            )
+    
+    return None
+
+
+@app.post("/agent/chat", response_model=ChatResponse)
+async def chat_with_ai(
+    request: Request,
+    chat_request: ChatRequest,
+    x_correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID")
+):
+    """
+    AI-powered chat endpoint for the Composer with tool-calling capabilities.
+    Can post content, schedule posts, or just help write/refine content.
+    """
+    correlation_id = x_correlation_id or f"chat-{chat_request.user_id}-{id(request)}"
+    
+    correlation_logger.info(
+        f"AI Chat request received",
+        correlation_id=correlation_id,
+        additional_data={
+            "user_id": chat_request.user_id,
+            "message_preview": chat_request.message[:100] if chat_request.message else "",
+            "has_current_content": bool(chat_request.current_content),
+            "history_length": len(chat_request.conversation_history),
+            "selected_platforms": chat_request.selected_platforms,
+            "connected_platforms": chat_request.connected_platforms
+        }
+    )
+    
+    try:
+        messages = await build_chat_messages(chat_request)
+        
+        # Call OpenAI with function calling
+        response = await get_openai_client().chat.completions.create(
+            model=CHAT_MODEL,
             messages=messages,
             tools=CHAT_TOOLS,
             tool_choice="auto",
@@ -1819,184 +2081,13 @@ When executing actions (posting/scheduling), just respond naturally confirming w
         # Check if the model wants to call a function
         if response_message.tool_calls:
             tool_call = response_message.tool_calls[0]
-            function_name = tool_call.function.name
-            import json
             function_args = json.loads(tool_call.function.arguments)
-            
-            correlation_logger.info(
-                f"AI requesting tool call: {function_name}",
-                correlation_id=correlation_id,
-                additional_data={"function_args": function_args}
-            )
-            
-            # Execute the function
-            if function_name == "post_to_platforms":
-                content = function_args.get("content", chat_request.current_content)
-                platforms = function_args.get("platforms", chat_request.selected_platforms)
-                
-                if not content:
-                    return ChatResponse(
-                        success=True,
-                        reply="I don't see any content to post. Please write something first or tell me what you'd like to post!",
-                        action=None
-                    )
-                
-                if not platforms:
-                    return ChatResponse(
-                        success=True,
-                        reply="Please select at least one platform to post to, or tell me which platforms you want to use.",
-                        action=None
-                    )
-                
-                # Execute posting
-                post_results = await execute_post_to_platforms(
-                    user_id=chat_request.user_id,
-                    content=content,
-                    platforms=platforms,
-                    correlation_id=correlation_id,
-                    image_data=chat_request.image_data,
-                    image_mime_type=chat_request.image_mime_type
-                )
-                
-                # Build response message
-                success_platforms = [p for p, r in post_results.items() if r.get("success")]
-                failed_platforms = [p for p, r in post_results.items() if not r.get("success")]
-                
-                if success_platforms and not failed_platforms:
-                    reply = f"✅ **Posted successfully!**\n" + "\n".join([f"- {p.title()}: ✓ Posted" for p in success_platforms])
-                    reply += "\n\nYour content is now live! 🎉"
-                elif success_platforms and failed_platforms:
-                    reply = f"⚠️ **Partially posted**\n"
-                    reply += "\n".join([f"- {p.title()}: ✓ Posted" for p in success_platforms])
-                    reply += "\n" + "\n".join([f"- {p.title()}: ✗ Failed ({post_results[p].get('error', 'Unknown error')})" for p in failed_platforms])
-                else:
-                    reply = f"❌ **Posting failed**\n"
-                    reply += "\n".join([f"- {p.title()}: ✗ {post_results[p].get('error', 'Unknown error')}" for p in failed_platforms])
-                
-                if success_platforms:
-                    action_type = "posted"
-                else:
-                    action_type = None
-
-                return ChatResponse(
-                    success=True,
-                    reply=reply,
-                    action=action_type,
-                    action_result={
-                        "platforms": platforms,
-                        "results": post_results,
-                        "content_preview": content[:100] + "..." if len(content) > 100 else content
-                    }
-                )
-            
-            elif function_name == "schedule_post":
-                content = function_args.get("content", chat_request.current_content)
-                platforms = function_args.get("platforms", chat_request.selected_platforms)
-                date = function_args.get("date")
-                time = function_args.get("time")
-                
-                if not content:
-                    return ChatResponse(
-                        success=True,
-                        reply="I don't see any content to schedule. Please write something first!",
-                        action=None
-                    )
-                
-                if not platforms:
-                    return ChatResponse(
-                        success=True,
-                        reply="Please select platforms to schedule for.",
-                        action=None
-                    )
-                
-                # Execute scheduling
-                schedule_result = await execute_schedule_post(
-                    user_id=chat_request.user_id,
-                    content=content,
-                    platforms=platforms,
-                    date=date,
-                    time=time,
-                    timezone=chat_request.timezone or "Asia/Kolkata",
-                    correlation_id=correlation_id
-                )
-                
-                if schedule_result.get("success"):
-                    platforms_str = ", ".join([p.title() for p in platforms])
-                    reply = f"📅 **Scheduled successfully!**\n\n"
-                    reply += f"Your post will be published to {platforms_str} on {schedule_result.get('scheduled_time')}.\n\n"
-                    reply += "You can view and manage your scheduled posts in the Calendar."
-                    
-                    return ChatResponse(
-                        success=True,
-                        reply=reply,
-                        action="scheduled",
-                        action_result={
-                            "platforms": platforms,
-                            "scheduled_time": schedule_result.get("scheduled_time"),
-                            "content_preview": content[:100] + "..." if len(content) > 100 else content
-                        }
-                    )
-                else:
-                    return ChatResponse(
-                        success=True,
-                        reply=f"❌ Failed to schedule: {schedule_result.get('error')}",
-                        action=None
-                    )
+            tool_response = await handle_chat_tool_call(chat_request, tool_call.function.name, function_args, correlation_id)
+            if tool_response:
+                return tool_response
         
         # No tool call - regular content response
-        ai_response = response_message.content or ""
-        
-        # Parse the response to extract suggested content
-        suggested_content = None
-        reply = ai_response
-        
-        if "---POST---" in ai_response and "---END---" in ai_response:
-            parts = ai_response.split("---POST---")
-            reply = parts[0].strip()
-            content_part = parts[1].split("---END---")[0].strip()
-            if content_part:
-                suggested_content = content_part
-        
-        # Check for per-platform format (---LINKEDIN---, ---TWITTER---, etc.)
-        platform_markers = ['LINKEDIN', 'TWITTER', 'FACEBOOK', 'INSTAGRAM']
-        has_platform_format = any(f"---{p}---" in ai_response for p in platform_markers)
-        
-        suggested_platforms = None
-        if has_platform_format:
-            suggested_platforms = {}
-            # Extract the reply (text before first platform marker)
-            first_marker_pos = len(ai_response)
-            for p in platform_markers:
-                marker = f"---{p}---"
-                pos = ai_response.find(marker)
-                if pos != -1 and pos < first_marker_pos:
-                    first_marker_pos = pos
-            reply = ai_response[:first_marker_pos].strip()
-            
-            # Extract each platform's content
-            for p in platform_markers:
-                marker = f"---{p}---"
-                if marker in ai_response:
-                    start = ai_response.find(marker) + len(marker)
-                    # Find next marker or ---END---
-                    end = len(ai_response)
-                    for next_p in platform_markers:
-                        next_marker = f"---{next_p}---"
-                        if next_marker != marker:
-                            next_pos = ai_response.find(next_marker, start)
-                            if next_pos != -1 and next_pos < end:
-                                end = next_pos
-                    end_pos = ai_response.find("---END---", start)
-                    if end_pos != -1 and end_pos < end:
-                        end = end_pos
-                    platform_content = ai_response[start:end].strip()
-                    if platform_content:
-                        suggested_platforms[p.lower()] = platform_content
-            
-            # Also set suggested_content to first platform's content for backward compat
-            if suggested_platforms:
-                suggested_content = next(iter(suggested_platforms.values()))
-                logger.info(f"Parsed per-platform content for: {list(suggested_platforms.keys())}")
+        reply, suggested_content, suggested_platforms = parse_chat_reply(response_message.content or "")
         
         correlation_logger.success(
             f"AI Chat response generated",
@@ -2028,6 +2119,118 @@ When executing actions (posting/scheduling), just respond naturally confirming w
         )
 
 
+def sse_event(payload: dict) -> str:
+    """Format a payload as a server-sent event"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def stream_chat_events(chat_request: ChatRequest, correlation_id: str):
+    """
+    Stream a chat completion as SSE events.
+    Emits `token` events as text arrives, a `tool_call` event once a tool call's
+    arguments are complete, then a final `done` event carrying the ChatResponse.
+    """
+    try:
+        messages = await build_chat_messages(chat_request)
+        stream = await get_openai_client().chat.completions.create(
+            model=CHAT_MODEL,
+            messages=messages,
+            tools=CHAT_TOOLS,
+            tool_choice="auto",
+            max_tokens=1500,
+            temperature=0.7,
+            stream=True
+        )
+        
+        text_parts = []
+        tool_calls = {}  # index -> {"name": str, "arguments": str}
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                text_parts.append(delta.content)
+                yield sse_event({"type": "token", "content": delta.content})
+            # Tool-call names and arguments arrive as fragments keyed by index
+            for tc in delta.tool_calls or []:
+                call = tool_calls.setdefault(tc.index, {"name": "", "arguments": ""})
+                if tc.function and tc.function.name:
+                    call["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["arguments"] += tc.function.arguments
+        
+        if tool_calls:
+            first_call = tool_calls[min(tool_calls)]
+            function_args = json.loads(first_call["arguments"] or "{}")
+            yield sse_event({"type": "tool_call", "name": first_call["name"], "arguments": function_args})
+            tool_response = await handle_chat_tool_call(chat_request, first_call["name"], function_args, correlation_id)
+            if tool_response:
+                yield sse_event({"type": "done", "response": tool_response.model_dump()})
+                return
+        
+        reply, suggested_content, suggested_platforms = parse_chat_reply("".join(text_parts))
+        
+        correlation_logger.success(
+            f"AI Chat stream completed",
+            correlation_id=correlation_id,
+            additional_data={
+                "reply_length": len(reply),
+                "has_suggested_content": suggested_content is not None,
+                "used_tools": bool(tool_calls)
+            }
+        )
+        
+        response = ChatResponse(
+            success=True,
+            reply=reply,
+            suggested_content=suggested_content,
+            suggested_platforms=suggested_platforms
+        )
+        yield sse_event({"type": "done", "response": response.model_dump()})
+        
+    except Exception as e:
+        correlation_logger.error(
+            f"AI Chat stream error: {str(e)}",
+            correlation_id=correlation_id,
+            additional_data={"error": str(e)}
+        )
+        response = ChatResponse(
+            success=False,
+            reply=f"Sorry, I encountered an error: {str(e)}",
+            error=str(e)
+        )
+        yield sse_event({"type": "error", "response": response.model_dump()})
+
+
+@app.post("/agent/chat/stream")
+async def chat_with_ai_stream(
+    request: Request,
+    chat_request: ChatRequest,
+    x_correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID")
+):
+    """
+    Streaming variant of /agent/chat for the Composer.
+    Returns `text/event-stream`; tokens are forwarded as soon as OpenAI produces them.
+    """
+    correlation_id = x_correlation_id or f"chat-{chat_request.user_id}-{id(request)}"
+    
+    correlation_logger.info(
+        f"AI Chat stream request received",
+        correlation_id=correlation_id,
+        additional_data={
+            "user_id": chat_request.user_id,
+            "message_preview": chat_request.message[:100] if chat_request.message else "",
+            "history_length": len(chat_request.conversation_history)
+        }
+    )
+    
+    return StreamingResponse(
+        stream_chat_events(chat_request, correlation_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ============================================================
 # REFINE TONE ENDPOINT
 # ============================================================
@@ -2073,7 +2276,7 @@ async def refine_tone(
             raise HTTPException(status_code=503, detail="Content agent not initialized")
         
         # Fetch business context for business users
-        biz_context = get_business_context(req.user_id)
+        biz_context = await data_store.get_business_context(req.user_id) if data_store else None
         
         result = await content_agent.refine_content(
             original_content=req.content,
@@ -2165,25 +2368,15 @@ async def get_trending_topics(
             error="Trending agent not initialized"
         )
     
-    if not db:
+    if not data_store:
         return TrendingResponse(
             success=False,
             error="Database not initialized"
         )
     
     try:
-        # Fetch user's interests from Firestore
-        interests = []
-        
-        # Try to get interests from onboarding preferences
-        onboarding_ref = db.document(f'users/{user_id}/preferences/onboarding')
-        onboarding_doc = onboarding_ref.get()
-        
-        if onboarding_doc.exists:
-            data = onboarding_doc.to_dict()
-            # Check if personalization is enabled OR if interests exist (for backward compatibility)
-            if data.get('personalizationEnabled', False) or data.get('selectedInterests'):
-                interests = data.get('selectedInterests', [])
+        # Fetch user's interests from onboarding preferences
+        interests = await data_store.get_interests(user_id)
         
         if not interests:
             correlation_logger.warning(
@@ -2259,19 +2452,12 @@ async def get_trending_fast(
     if not trending_agent:
         return TrendingResponse(success=False, error="Trending agent not initialized")
     
-    if not db:
+    if not data_store:
         return TrendingResponse(success=False, error="Database not initialized")
     
     try:
         # Fetch user's interests from Firestore
-        onboarding_ref = db.document(f'users/{user_id}/preferences/onboarding')
-        onboarding_doc = onboarding_ref.get()
-        
-        interests = []
-        if onboarding_doc.exists:
-            data = onboarding_doc.to_dict()
-            if data.get('personalizationEnabled', False) or data.get('selectedInterests'):
-                interests = data.get('selectedInterests', [])
+        interests = await data_store.get_interests(user_id)
         
         if not interests:
             return TrendingResponse(
@@ -2295,7 +2481,8 @@ async def get_trending_fast(
             correlation_id=correlation_id,
             items_per_interest=items_per,
             max_total=max_total,
-            shuffle=shuffle
+            shuffle=shuffle,
+            user_id=user_id
         )
         
         if result.get("success"):
@@ -2319,6 +2506,62 @@ async def get_trending_fast(
         return TrendingResponse(success=False, error=str(e))
 
 
+async def stream_trending_events(user_id: str, correlation_id: str):
+    """SSE events for /trending/{user_id}/fast/stream"""
+    try:
+        interests = await data_store.get_interests(user_id)
+        if not interests:
+            yield sse_event({
+                "type": "error",
+                "error": "No interests configured. Please enable personalization in Settings and select your interests."
+            })
+            return
+        
+        async for event in trending_agent.stream_news_fast(
+            interests=interests,
+            correlation_id=correlation_id,
+            max_total=15,
+            user_id=user_id
+        ):
+            yield sse_event(event)
+    except Exception as e:
+        correlation_logger.error(
+            f"Error in FAST trending stream: {str(e)}",
+            correlation_id=correlation_id
+        )
+        yield sse_event({"type": "error", "error": str(e)})
+
+
+@app.get("/trending/{user_id}/fast/stream")
+async def get_trending_fast_stream(
+    user_id: str,
+    x_correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID")
+):
+    """
+    Streaming variant of /trending/{user_id}/fast.
+    Returns `text/event-stream`: `topics` events carry new cards as each interest
+    arrives, and a final `done` event carries the `cached` and `complete` markers.
+    """
+    correlation_id = x_correlation_id or generate_correlation_id()
+    
+    correlation_logger.info(
+        f"FAST trending stream request for user {user_id}",
+        correlation_id=correlation_id
+    )
+    
+    if not trending_agent:
+        return TrendingResponse(success=False, error="Trending agent not initialized")
+    
+    if not data_store:
+        return TrendingResponse(success=False, error="Database not initialized")
+    
+    return StreamingResponse(
+        stream_trending_events(user_id, correlation_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # --- ON-DEMAND AI DRAFTING FROM TRENDING TOPIC ---
 
 class DraftFromTopicRequest(BaseModel):
@@ -2430,14 +2673,15 @@ async def draft_from_trending_topic(
 @app.post("/trending/clear-cache")
 
 async def clear_trending_cache(
+    user_id: Optional[str] = None,
     x_correlation_id: Optional[str] = Header(None, alias="X-Correlation-ID")
 ):
-    """Clear the trending topics cache"""
+    """Clear the trending topics cache (only the given user's feeds when user_id is set)"""
     correlation_id = x_correlation_id or generate_correlation_id()
     
     if trending_agent:
-        trending_agent.clear_cache()
-        correlation_logger.info("Trending cache cleared", correlation_id=correlation_id)
+        trending_agent.clear_cache(user_id)
+        correlation_logger.info("Trending cache cleared", correlation_id=correlation_id, user_id=user_id)
         return {"success": True, "message": "Cache cleared"}
     
     return {"success": False, "error": "Trending agent not initialized"}
@@ -2,13 +2,16 @@
 MCP (Model Context Protocol) Client
 Handles communication with the MCP server for tool discovery and invocation
 """
+import asyncio
 import httpx
 import logging
 import time
 import sys
 import os
 from typing import Dict, List, Any, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import RetryError, retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+
+from .mcp_registry import RegisteredTool, ToolRegistry
 
 # Add parent directory to path for shared utilities
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
@@ -17,19 +20,91 @@ from shared.mcp_logging_utils import MCPInteractionLogger
 logger = logging.getLogger(__name__)
 mcp_logger = MCPInteractionLogger("AGENT-SERVICE-MCP-CLIENT")
 
+# Minimum gap between background refresh attempts after one fails
+REFRESH_RETRY_SECONDS = 30.0
+# Upper bound on the delay between startup discovery attempts
+DISCOVERY_MAX_BACKOFF_SECONDS = 60.0
+
+
+class MCPUnavailableError(Exception):
+    """MCP tools have not been discovered yet (server slow or unreachable)"""
+
 
 class MCPClient:
     """Client for interacting with MCP server"""
     
-    def __init__(self, mcp_server_url: str):
+    def __init__(self, mcp_server_url: str, tools_ttl: float = 300.0, discovery_wait: float = 5.0):
         self.mcp_server_url = mcp_server_url.rstrip('/')
         self.tools_cache: Optional[Dict[str, Any]] = None
+        self.registry = ToolRegistry(tools_ttl)
+        self.discovery_wait = discovery_wait
         self.client = httpx.AsyncClient(timeout=30.0)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._last_refresh_failure = 0.0
+        self._discovery_task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._started_at: Optional[float] = None
+        self._ready_after: Optional[float] = None
+        self.discovery_attempts = 0
+        self.discovery_error: Optional[str] = None
     
     async def close(self):
         """Close the HTTP client"""
+        for task in (self._refresh_task, self._discovery_task):
+            if task and not task.done():
+                task.cancel()
         await self.client.aclose()
     
+    @property
+    def ready(self) -> bool:
+        return self.registry.loaded
+    
+    def start_discovery(self):
+        """Discover tools in the background, retrying until the MCP server answers"""
+        if self._discovery_task is None:
+            self._started_at = time.monotonic()
+            self._discovery_task = asyncio.create_task(self._discover_until_ready())
+    
+    async def _discover_until_ready(self):
+        delay = 1.0
+        while not self.ready:
+            self.discovery_attempts += 1
+            try:
+                await self.discover_tools(force_refresh=True)
+                self.discovery_error = None
+            except Exception as e:
+                if isinstance(e, RetryError) and e.last_attempt.failed:
+                    e = e.last_attempt.exception()
+                self.discovery_error = str(e)
+                logger.warning(f"MCP tool discovery attempt {self.discovery_attempts} failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, DISCOVERY_MAX_BACKOFF_SECONDS)
+    
+    async def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to `timeout` seconds (default: discovery_wait) for tools to be discovered"""
+        if self.ready:
+            return True
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=self.discovery_wait if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.ready
+    
+    def discovery_status(self) -> Dict[str, Any]:
+        if self.ready:
+            state = "ready"
+        elif self._discovery_task is None:
+            state = "not_started"
+        else:
+            state = "discovering"
+        return {
+            "ready": self.ready,
+            "state": state,
+            "attempts": self.discovery_attempts,
+            "last_error": self.discovery_error,
+            "ready_after_seconds": round(self._ready_after, 2) if self._ready_after is not None else None,
+        }
+    
     async def refresh_tools_cache(self) -> Dict[str, Any]:
         """
         Force refresh the tools cache from MCP server
@@ -78,6 +153,13 @@ class MCPClient:
             tool_names = [tool.get('name') for tool in self.tools_cache.get('tools', [])]
             logger.info(f"Available MCP tools: {tool_names}")
             
+            if self.registry.load(self.tools_cache.get('tools', [])):
+                logger.info(f"MCP tool registry updated to version {self.registry.version}")
+            if not self._ready.is_set():
+                self._ready.set()
+                if self._started_at is not None:
+                    self._ready_after = time.monotonic() - self._started_at
+            
             return self.tools_cache
             
         except httpx.HTTPStatusError as e:
@@ -90,6 +172,47 @@ class MCPClient:
             logger.error(f"Unexpected error discovering tools: {str(e)}")
             raise
     
+    def _schedule_refresh(self):
+        """Refresh the registry in the background unless a refresh is running or just failed"""
+        if self._refresh_task and not self._refresh_task.done():
+            return
+        if time.monotonic() - self._last_refresh_failure < REFRESH_RETRY_SECONDS:
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+    
+    async def _background_refresh(self):
+        try:
+            await self.discover_tools()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._last_refresh_failure = time.monotonic()
+            logger.warning(f"Background MCP tool refresh failed, keeping registry version {self.registry.version}: {e}")
+    
+    async def _ensure_registry(self):
+        """
+        Make sure tools are known. Until the first discovery succeeds, callers
+        wait at most `discovery_wait` seconds for it; a stale registry is served
+        as-is while it refreshes in the background.
+        """
+        if not self.registry.loaded:
+            if self._discovery_task is None:
+                await self.discover_tools()
+            elif not await self.wait_until_ready():
+                raise MCPUnavailableError(
+                    f"MCP tools not available yet ({self.discovery_error or 'discovery in progress'})"
+                )
+        elif self.registry.stale:
+            self._schedule_refresh()
+    
+    async def get_registered_tool(self, tool_name: str) -> Optional[RegisteredTool]:
+        """Look up a tool (with its compiled validator) by name"""
+        await self._ensure_registry()
+        tool = self.registry.get(tool_name)
+        if tool is None:
+            logger.warning(f"Tool '{tool_name}' not found in MCP server")
+        return tool
+    
     async def get_tool_schema(self, tool_name: str) -> Optional[Dict[str, Any]]:
         """
         Get schema for a specific tool
@@ -97,20 +220,19 @@ class MCPClient:
             tool_name: Name of the tool
         Returns: Tool schema or None if not found
         """
-        if not self.tools_cache:
-            await self.discover_tools()
-        
-        tools = self.tools_cache.get('tools', [])
-        for tool in tools:
-            if tool.get('name') == tool_name:
-                return tool
-        
-        logger.warning(f"Tool '{tool_name}' not found in MCP server")
-        return None
+        tool = await self.get_registered_tool(tool_name)
+        return tool.definition if tool else None
+    
+    def registry_stats(self) -> Dict[str, Any]:
+        stats = self.registry.stats()
+        stats["refreshing"] = bool(self._refresh_task and not self._refresh_task.done())
+        return stats
     
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        # Unknown tools and invalid arguments fail the same way on every attempt
+        retry=retry_if_not_exception_type((ValueError, MCPUnavailableError))
     )
     async def invoke_tool(
         self, 
@@ -132,10 +254,13 @@ class MCPClient:
         endpoint = f"{self.mcp_server_url}/mcp/v1"
         
         try:
-            # Get tool schema to validate
-            tool_schema = await self.get_tool_schema(tool_name)
-            if not tool_schema:
+            # Validate against the registered schema before the round trip
+            tool = await self.get_registered_tool(tool_name)
+            if not tool:
                 raise ValueError(f"Tool '{tool_name}' not found on MCP server")
+            errors = tool.validate(parameters)
+            if errors:
+                raise ValueError(f"Invalid arguments for tool '{tool_name}': {'; '.join(errors)}")
             
             # Create JSON-RPC request
             json_rpc_request = {
@@ -645,8 +770,5 @@ class MCPClient:
         Get list of available tool names
         Returns: List of tool names
         """
-        if not self.tools_cache:
-            await self.discover_tools()
-        
-        tools = self.tools_cache.get('tools', [])
-        return [tool.get('name') for tool in tools if tool.get('name')]
+        await self._ensure_registry()
+        return self.registry.names()
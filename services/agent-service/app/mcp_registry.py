@@ -0,0 +1,164 @@
+"""
+MCP tool registry
+Tools discovered from the MCP server, indexed by name, with a version hash
+per schema and argument validators compiled once per discovery
+"""
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# JSON Schema type -> accepted Python types (bool is excluded from numbers below)
+_JSON_TYPES = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list, tuple),
+}
+
+Validator = Callable[[Dict[str, Any]], List[str]]
+
+
+def schema_hash(tool: Dict[str, Any]) -> str:
+    """Stable short hash of a tool definition"""
+    encoded = json.dumps(tool, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def _type_matches(value: Any, json_type) -> bool:
+    types = json_type if isinstance(json_type, list) else [json_type]
+    for t in types:
+        if t == "null":
+            if value is None:
+                return True
+            continue
+        accepted = _JSON_TYPES.get(t)
+        if accepted is None:
+            return True  # Unknown type keyword - don't second-guess the server
+        if isinstance(value, bool) and t in ("number", "integer"):
+            continue
+        if isinstance(value, accepted):
+            return True
+    return False
+
+
+def compile_validator(input_schema: Optional[Dict[str, Any]]) -> Validator:
+    """
+    Build an argument checker for a tool's `inputSchema`.
+
+    Checks the top level only: required arguments are present and not None,
+    and supplied arguments match their declared `type` and `enum`. The MCP
+    server stays the authority on everything else; this catches bad calls
+    before they cost a round trip.
+    """
+    schema = input_schema or {}
+    required = tuple(schema.get("required") or ())
+    checks = []
+    for name, prop in (schema.get("properties") or {}).items():
+        if not isinstance(prop, dict):
+            continue
+        json_type = prop.get("type")
+        enum = tuple(prop["enum"]) if isinstance(prop.get("enum"), list) else None
+        if json_type or enum:
+            checks.append((name, json_type, enum))
+
+    def validate(arguments: Dict[str, Any]) -> List[str]:
+        errors = [f"missing required argument '{name}'" for name in required if arguments.get(name) is None]
+        for name, json_type, enum in checks:
+            value = arguments.get(name)
+            if value is None:
+                continue
+            if json_type and not _type_matches(value, json_type):
+                errors.append(f"argument '{name}' must be of type {json_type}")
+            elif enum is not None and value not in enum:
+                errors.append(f"argument '{name}' must be one of {list(enum)}")
+        return errors
+
+    return validate
+
+
+@dataclass
+class RegisteredTool:
+    name: str
+    definition: Dict[str, Any]
+    schema_hash: str
+    validate: Validator
+
+
+class ToolRegistry:
+    """
+    Name -> tool index rebuilt on each discovery.
+
+    `version` hashes every tool schema, so a refresh that returns the same
+    tools is recognised and keeps the already compiled validators. The
+    registry is stale `ttl_seconds` after the last successful load; callers
+    keep using stale entries while a refresh runs in the background.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._tools: Dict[str, RegisteredTool] = {}
+        self.version: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.loads = 0
+        self.changes = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    @property
+    def stale(self) -> bool:
+        return not self.loaded or time.monotonic() - self.loaded_at >= self.ttl_seconds
+
+    def load(self, tools: List[Dict[str, Any]]) -> bool:
+        """Index a discovery result; returns True if any schema changed"""
+        hashes = {tool.get("name"): schema_hash(tool) for tool in tools if tool.get("name")}
+        version = hashlib.sha256(
+            "".join(f"{name}:{h}" for name, h in sorted(hashes.items())).encode("utf-8")
+        ).hexdigest()[:16]
+
+        self.loaded_at = time.monotonic()
+        self.loads += 1
+        if version == self.version:
+            return False
+
+        registry = {}
+        for tool in tools:
+            name = tool.get("name")
+            if not name:
+                continue
+            existing = self._tools.get(name)
+            if existing and existing.schema_hash == hashes[name]:
+                registry[name] = existing
+            else:
+                registry[name] = RegisteredTool(
+                    name=name,
+                    definition=tool,
+                    schema_hash=hashes[name],
+                    validate=compile_validator(tool.get("inputSchema")),
+                )
+        self._tools = registry
+        self.version = version
+        self.changes += 1
+        return True
+
+    def get(self, name: str) -> Optional[RegisteredTool]:
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tools": len(self._tools),
+            "version": self.version,
+            "age_seconds": round(time.monotonic() - self.loaded_at, 1) if self.loaded else None,
+            "ttl_seconds": self.ttl_seconds,
+            "stale": self.stale,
+            "loads": self.loads,
+            "changes": self.changes,
+        }
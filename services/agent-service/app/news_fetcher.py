@@ -0,0 +1,280 @@
+"""
+News fetching for the Trending Topics Agent
+One pooled httpx.AsyncClient and a global concurrency limit shared by every
+GNews and Google News RSS request, instead of a thread and socket per interest.
+RSS feeds are revalidated with conditional GETs against a per-feed cache.
+"""
+import asyncio
+import logging
+import os
+import re
+import urllib.parse
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+GNEWS_SEARCH_URL = "https://gnews.io/api/v4/search"
+GOOGLE_NEWS_RSS_URL = "https://news.google.com/rss/search"
+
+
+class NewsFetchConfig:
+    """Connection pool and concurrency settings for news fetches"""
+    def __init__(self):
+        self.max_concurrency: int = int(os.getenv("TRENDING_MAX_CONCURRENCY", "16"))
+        self.max_connections: int = int(os.getenv("TRENDING_MAX_CONNECTIONS", "32"))
+        self.gnews_timeout: float = float(os.getenv("TRENDING_GNEWS_TIMEOUT", "8"))
+        self.rss_timeout: float = float(os.getenv("TRENDING_RSS_TIMEOUT", "5"))
+        self.feed_cache_max_entries: int = int(os.getenv("TRENDING_FEED_CACHE_MAX_ENTRIES", "2000"))
+
+
+def rss_feed_url(interest: str) -> str:
+    """Google News RSS search URL for an interest"""
+    query = urllib.parse.quote(interest)
+    return f"{GOOGLE_NEWS_RSS_URL}?q={query}&hl=en-IN&gl=IN&ceid=IN:en"
+
+
+def _rss_item_to_news(item: ET.Element, interest: str) -> Optional[Dict[str, str]]:
+    """Convert one RSS <item> into a news item, or None if it has no title"""
+    title_elem = item.find('title')
+    link_elem = item.find('link')
+    desc_elem = item.find('description')
+    pubdate_elem = item.find('pubDate')
+
+    title = unescape(title_elem.text) if title_elem is not None and title_elem.text else ""
+    link = link_elem.text if link_elem is not None and link_elem.text else ""
+
+    # Clean up description (remove HTML tags)
+    desc = ""
+    if desc_elem is not None and desc_elem.text:
+        desc = re.sub(r'<[^>]+>', '', unescape(desc_elem.text))
+
+    pubdate = pubdate_elem.text if pubdate_elem is not None else ""
+
+    if not title:  # Only add if we have a title
+        return None
+    return {
+        "title": title[:150],  # Limit title length
+        "link": link,
+        "snippet": desc[:300] if desc else "",  # Limit snippet
+        "pubDate": pubdate,
+        "category": interest
+    }
+
+
+class IncrementalRSSParser:
+    """
+    Pull parser for RSS fed chunk by chunk. Stops parsing once `max_items`
+    <item> elements have been read, so the rest of the document is never parsed.
+    """
+
+    def __init__(self, interest: str, max_items: int):
+        self.interest = interest
+        self.max_items = max_items
+        self.items: List[Dict[str, str]] = []
+        self.items_seen = 0
+        self.done = False
+        self._parser = ET.XMLPullParser(events=("end",))
+
+    def feed(self, chunk: bytes):
+        if self.done:
+            return
+        self._parser.feed(chunk)
+        for _, elem in self._parser.read_events():
+            if elem.tag != 'item':
+                continue
+            self.items_seen += 1
+            news_item = _rss_item_to_news(elem, self.interest)
+            if news_item:
+                self.items.append(news_item)
+            elem.clear()
+            if self.items_seen >= self.max_items:
+                self.done = True
+                return
+
+    def close(self):
+        """Finish a document that ended before `max_items` items (raises ET.ParseError if malformed)"""
+        if not self.done:
+            self._parser.close()
+            for _, elem in self._parser.read_events():
+                if elem.tag == 'item' and self.items_seen < self.max_items:
+                    self.items_seen += 1
+                    news_item = _rss_item_to_news(elem, self.interest)
+                    if news_item:
+                        self.items.append(news_item)
+
+    @property
+    def truncated(self) -> bool:
+        """True when parsing stopped early, i.e. the feed may hold more items"""
+        return self.done
+
+
+@dataclass
+class FeedEntry:
+    """Validators and parsed items of one RSS feed"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    items: List[Dict[str, str]] = field(default_factory=list)
+    parsed_limit: int = 0
+    truncated: bool = False
+
+    def covers(self, max_items: int) -> bool:
+        """Whether the stored items can answer a request for `max_items`"""
+        return self.parsed_limit >= max_items or not self.truncated
+
+
+class NewsFetcher:
+    """
+    Async GNews / Google News RSS client.
+
+    The AsyncClient is created on first use (inside the running event loop)
+    and reused for the life of the process; `max_concurrency` caps the
+    number of in-flight news requests across all trending requests.
+    """
+
+    def __init__(self, gnews_api_key: str = "", config: Optional[NewsFetchConfig] = None):
+        self.gnews_api_key = gnews_api_key
+        self.config = config or NewsFetchConfig()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._feeds: "OrderedDict[str, FeedEntry]" = OrderedDict()
+        self.feed_not_modified = 0
+        self.feed_downloads = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": "Mozilla/5.0"},
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_connections,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        return self._client
+
+    async def _get(self, url: str, timeout: float, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        async with self._semaphore:
+            return await client.get(url, timeout=timeout, **kwargs)
+
+    async def fetch_gnews(self, interest: str, max_items: int, correlation_id: str = "unknown") -> List[Dict]:
+        """Fetch articles from GNews API for one interest."""
+        params = {
+            "q": interest,
+            "lang": "en",
+            "country": "in",
+            "max": max_items,
+            "sortby": "publishedAt",
+            "apikey": self.gnews_api_key,
+        }
+        try:
+            response = await self._get(GNEWS_SEARCH_URL, self.config.gnews_timeout, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            articles = []
+            for a in data.get("articles", []):
+                articles.append({
+                    "title": (a.get("title") or "")[:150],
+                    "description": (a.get("description") or ""),
+                    "image": a.get("image") or "",
+                    "url": a.get("url") or "",
+                    "publishedAt": a.get("publishedAt") or "",
+                    "source": (a.get("source") or {}).get("name", ""),
+                    "category": interest
+                })
+            return articles
+        except httpx.HTTPStatusError as e:
+            # The error text includes the request URL, which carries the API key
+            logger.error(f"[{correlation_id}] GNews error for '{interest}': HTTP {e.response.status_code}")
+            return []
+        except Exception as e:
+            logger.error(f"[{correlation_id}] GNews error for '{interest}': {e}")
+            return []
+
+    async def fetch_rss(self, interest: str, max_items: int = 5) -> List[Dict[str, str]]:
+        """
+        Fetch real news from Google News RSS for a given interest.
+
+        Sends If-None-Match / If-Modified-Since when the feed was seen before and
+        reuses the stored items on 304; otherwise parses only the first
+        `max_items` items as the body streams in.
+
+        Returns:
+            List of news items with title, link, snippet, pubDate
+        """
+        url = rss_feed_url(interest)
+        logger.info(f"[RSS] Fetching news for interest: {interest}")
+
+        entry = self._feeds.get(url)
+        headers = {}
+        if entry and entry.covers(max_items):
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        try:
+            client = self._get_client()
+            async with self._semaphore:
+                async with client.stream("GET", url, headers=headers, timeout=self.config.rss_timeout) as response:
+                    if response.status_code == 304 and headers:
+                        self.feed_not_modified += 1
+                        self._feeds.move_to_end(url)
+                        logger.info(f"[RSS] Not modified, reusing {min(len(entry.items), max_items)} items for {interest}")
+                        return [dict(item) for item in entry.items[:max_items]]
+
+                    response.raise_for_status()
+                    parser = IncrementalRSSParser(interest, max_items)
+                    async for chunk in response.aiter_bytes():
+                        # Keep draining after the parser is done so the connection can be reused
+                        parser.feed(chunk)
+                    parser.close()
+                    self.feed_downloads += 1
+
+                    self._store_feed(url, FeedEntry(
+                        etag=response.headers.get("etag"),
+                        last_modified=response.headers.get("last-modified"),
+                        items=parser.items,
+                        parsed_limit=max_items,
+                        truncated=parser.truncated,
+                    ))
+
+            logger.info(f"[RSS] Fetched {len(parser.items)} news items for {interest}")
+            return [dict(item) for item in parser.items]
+        except httpx.HTTPError as e:
+            logger.error(f"[RSS] Network error fetching {interest}: {e}")
+        except ET.ParseError as e:
+            logger.error(f"[RSS] XML parse error for {interest}: {e}")
+        except Exception as e:
+            logger.error(f"[RSS] Unexpected error fetching {interest}: {e}")
+        return []
+
+    def _store_feed(self, url: str, entry: FeedEntry):
+        if not entry.etag and not entry.last_modified:
+            # Nothing to revalidate with - caching the items would never be used
+            self._feeds.pop(url, None)
+            return
+        self._feeds[url] = entry
+        self._feeds.move_to_end(url)
+        while len(self._feeds) > self.config.feed_cache_max_entries:
+            self._feeds.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "feeds_cached": len(self._feeds),
+            "feed_not_modified": self.feed_not_modified,
+            "feed_downloads": self.feed_downloads,
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,44 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight computation
+instead of each starting their own
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async work by key.
+
+    The first caller for a key starts the computation as a task; callers that
+    arrive while it runs await the same task. Waiters are shielded, so a
+    cancelled (disconnected) caller does not cancel the work the others are
+    waiting on. The key is released as soon as the task finishes, so results
+    are never reused after the fact - caching stays the caller's job.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._release(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved so an unawaited failure isn't logged as lost
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "executions": self.executions, "coalesced": self.coalesced}
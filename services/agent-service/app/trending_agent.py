@@ -3,22 +3,53 @@ Trending Topics Agent - AI-powered trending content generation
 Uses OpenAI GPT-4o to generate personalized trending topics based on user interests
 Now fetches REAL news from Google News RSS and uses AI for formatting only.
 """
+import asyncio
 import logging
 import json
+import os
 import hashlib
-import urllib.request
-import xml.etree.ElementTree as ET
-from html import unescape
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime
 from openai import AsyncOpenAI
 
+from .news_fetcher import NewsFetcher
+from .article_extractor import ArticleExtractor
+from .url_resolver import GoogleNewsUrlResolver, is_google_news_url
+from .trending_cache import TrendingCache
+from .single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
-# In-memory cache for trending topics
-_trending_cache: Dict[str, Dict[str, Any]] = {}
 CACHE_DURATION_MINUTES = 10  # 10 min cache — fresh enough for news, fast for users
 
+# In-memory cache for trending topics (level 2: assembled feed per interest set)
+_trending_cache = TrendingCache(
+    max_entries=int(os.getenv("TRENDING_CACHE_MAX_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("TRENDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl_seconds=CACHE_DURATION_MINUTES * 60,
+)
+
+# Level 1: raw articles per normalized interest, shared by every user with that interest
+_interest_cache = TrendingCache(
+    max_entries=int(os.getenv("TRENDING_INTEREST_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("TRENDING_INTEREST_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+    ttl_seconds=CACHE_DURATION_MINUTES * 60,
+)
+# Articles fetched per interest, so one entry can serve any user's per-interest share
+INTEREST_FETCH_ITEMS = int(os.getenv("TRENDING_INTEREST_FETCH_ITEMS", "10"))
+# generate_trending_topics continues with whatever feeds arrived within this many seconds
+RSS_FETCH_DEADLINE = float(os.getenv("TRENDING_RSS_DEADLINE", "4"))
+# Read article pages before generation for prompt excerpts and og:images (off: RSS snippets only,
+# since it adds up to PREVIEW_DEADLINE and a page fetch per item to every fresh generation)
+ARTICLE_PREVIEWS_ENABLED = os.getenv("TRENDING_ARTICLE_PREVIEWS_ENABLED", "false").lower() == "true"
+# Article previews still being extracted after this many seconds are left out of the AI prompt
+PREVIEW_DEADLINE = float(os.getenv("TRENDING_PREVIEW_DEADLINE", "3"))
+
+
+def normalize_interest(interest: str) -> str:
+    """Cache key form of an interest ("  AI " and "ai" share an entry)"""
+    return " ".join(interest.lower().split())
+
 
 class TrendingTopicsAgent:
     """
@@ -39,383 +70,368 @@ class TrendingTopicsAgent:
         self.client = AsyncOpenAI(api_key=openai_api_key)
         self.model = model
         self.gnews_api_key = gnews_api_key
+        self.fetcher = NewsFetcher(gnews_api_key)
+        self.url_resolver = GoogleNewsUrlResolver()
+        self.extractor = ArticleExtractor(self._article_url)
+        # Decayed request counts per normalized interest, used to pick what to prefetch
+        self.interest_popularity: Dict[str, float] = {}
+        self._interest_labels: Dict[str, str] = {}
+        # Coalesces identical concurrent fetches/generations (keyed by cache key)
+        self._inflight = SingleFlight()
         logger.info(f"TrendingTopicsAgent initialized with model: {model}, gnews={'yes' if gnews_api_key else 'no'}")
     
     def _get_cache_key(self, interests: List[str]) -> str:
         """Generate a cache key based on sorted interests"""
-        sorted_interests = sorted([i.lower().strip() for i in interests])
+        sorted_interests = sorted([normalize_interest(i) for i in interests])
         return hashlib.md5(json.dumps(sorted_interests).encode()).hexdigest()
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Check if cached data is still valid"""
-        if cache_key not in _trending_cache:
-            return False
-        
-        cached = _trending_cache[cache_key]
-        expiry = cached.get("expiry")
-        if not expiry:
-            return False
-        
-        return datetime.now() < expiry
-    
-    def _get_cached(self, cache_key: str) -> Optional[List[Dict]]:
+    def _get_cached(self, cache_key: str, user_id: Optional[str] = None) -> Optional[List[Dict]]:
         """Get cached trending topics if valid"""
-        if self._is_cache_valid(cache_key):
+        cached = _trending_cache.get(cache_key, user_id)
+        if cached is not None:
             logger.info(f"Cache hit for key: {cache_key[:8]}...")
-            return _trending_cache[cache_key]["data"]
-        return None
+            cached = self._with_resolved_urls(cached)
+        return cached
     
-    def _set_cache(self, cache_key: str, data: List[Dict]):
+    def _with_resolved_urls(self, topics: List[Dict]) -> List[Dict]:
+        """
+        Cards are cached with whatever sourceUrl was known when they were built;
+        swap in article URLs decoded since then, without touching the cached cards.
+        """
+        resolved = []
+        for topic in topics:
+            url = topic.get("sourceUrl") or ""
+            actual_url = self._resolve_google_news_url(url)
+            resolved.append({**topic, "sourceUrl": actual_url} if actual_url != url else topic)
+        return resolved
+    
+    def _set_cache(self, cache_key: str, data: List[Dict], user_id: Optional[str] = None):
         """Cache trending topics with expiry"""
-        _trending_cache[cache_key] = {
-            "data": data,
-            "expiry": datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES),
-            "created_at": datetime.now().isoformat()
-        }
+        _trending_cache.set(cache_key, data, user_id)
         logger.info(f"Cached {len(data)} trending topics for key: {cache_key[:8]}...")
     
+    def _interest_cache_key(self, interest: str) -> str:
+        source = "gnews" if self.gnews_api_key else "rss"
+        return f"{source}:{normalize_interest(interest)}"
+    
+    def _get_cached_interest(self, interest: str, min_items: int) -> Optional[List[Dict]]:
+        """Level-1 lookup: fresh articles for an interest fetched with at least `min_items`"""
+        cached = _interest_cache.get(self._interest_cache_key(interest))
+        if not cached:
+            return None
+        # A short result means the source had no more articles, so it still satisfies
+        if cached["requested"] < min_items and len(cached["data"]) >= cached["requested"]:
+            return None
+        return cached["data"]
+    
+    def _set_cached_interest(self, interest: str, articles: List[Dict], requested: int):
+        _interest_cache.set(self._interest_cache_key(interest), {"data": articles, "requested": requested})
+    
+    def record_interest_requests(self, interests: List[str]):
+        """
+        Count a request for each interest (feeds the background prefetcher).
+        Called once per incoming request, before any cache check.
+        """
+        for interest in interests:
+            key = normalize_interest(interest)
+            self.interest_popularity[key] = self.interest_popularity.get(key, 0.0) + 1.0
+            self._interest_labels[key] = interest
+    
+    def decay_interest_popularity(self, factor: float, floor: float = 0.05):
+        """Age request counts so recent demand dominates; forget interests that fell below `floor`"""
+        for key in list(self.interest_popularity):
+            score = self.interest_popularity[key] * factor
+            if score < floor:
+                del self.interest_popularity[key]
+                self._interest_labels.pop(key, None)
+            else:
+                self.interest_popularity[key] = score
+    
+    def popular_interests(self, limit: int) -> List[str]:
+        """Most requested interests, most popular first"""
+        ranked = sorted(self.interest_popularity.items(), key=lambda kv: kv[1], reverse=True)
+        return [self._interest_labels[key] for key, _ in ranked[:limit]]
+    
+    def interest_expires_in(self, interest: str) -> Optional[float]:
+        """Seconds until an interest's cached articles expire, or None if not cached"""
+        return _interest_cache.expires_in(self._interest_cache_key(interest))
+    
+    async def refresh_interest(self, interest: str, correlation_id: str = "prefetch") -> int:
+        """Re-fetch one interest into the level-1 cache; returns the number of articles cached"""
+        cached = _interest_cache.peek(self._interest_cache_key(interest))
+        fetch_items = max(INTEREST_FETCH_ITEMS, cached["requested"] if cached else 0)
+        articles = await self._fetch_and_cache_interest(interest, fetch_items, correlation_id)
+        return len(articles)
+    
     def clear_cache(self, user_id: str = None):
-        """Clear cache - optionally for specific user"""
-        global _trending_cache
+        """Clear cache - optionally only the feeds a specific user has read"""
         if user_id:
-            # Clear caches that might belong to this user
-            # In a production system, you'd track user -> cache key mapping
-            pass
-        else:
-            _trending_cache = {}
+            removed = _trending_cache.invalidate_user(user_id)
+            logger.info(f"Trending cache cleared for user {user_id} ({removed} entries)")
+            return
+        _trending_cache.clear()
+        _interest_cache.clear()
         logger.info("Trending cache cleared")
     
-    def _fetch_rss_feed(self, interest: str, max_items: int = 5) -> List[Dict[str, str]]:
+    def cache_stats(self) -> Dict[str, Any]:
+        """Size and hit counters of both cache levels"""
+        return {
+            "feeds": _trending_cache.stats(),
+            "interests": _interest_cache.stats(),
+            "single_flight": self._inflight.stats(),
+            "rss": self.fetcher.stats(),
+            "previews": self.extractor.stats(),
+            "url_resolver": self.url_resolver.stats()
+        }
+    
+    async def close(self):
+        """Release the pooled news and article HTTP clients"""
+        await self.fetcher.close()
+        await self.extractor.close()
+        self.url_resolver.close()
+    
+    async def _fetch_rss_feeds(
+        self,
+        interests: List[str],
+        max_items: int,
+        correlation_id: str,
+        deadline: float = RSS_FETCH_DEADLINE
+    ) -> List[Dict[str, str]]:
         """
-        Fetch real news from Google News RSS for a given interest.
-        
-        Args:
-            interest: The topic/interest to search for
-            max_items: Maximum number of items to return per interest
-            
-        Returns:
-            List of news items with title, link, snippet, pubDate
+        Fetch Google News RSS for all interests concurrently and return the items
+        of every feed that arrived before `deadline` seconds; slower feeds are cancelled.
         """
-        import re
-        
-        # Build Google News RSS URL
-        query = urllib.request.quote(interest)
-        url = f"https://news.google.com/rss/search?q={query}&hl=en-IN&gl=IN&ceid=IN:en"
-        
-        logger.info(f"[RSS] Fetching news for interest: {interest}")
-        logger.info(f"[RSS] URL: {url}")
-        
-        news_items = []
-        
-        try:
-            # Fetch with timeout
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, timeout=5) as response:
-                xml_data = response.read().decode('utf-8')
-            
-            # Parse XML
-            root = ET.fromstring(xml_data)
-            channel = root.find('channel')
-            
-            if channel is None:
-                logger.warning(f"[RSS] No channel found in RSS response for {interest}")
-                return []
-            
-            for item in channel.findall('item')[:max_items]:
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                desc_elem = item.find('description')
-                pubdate_elem = item.find('pubDate')
-                
-                title = unescape(title_elem.text) if title_elem is not None and title_elem.text else ""
-                link = link_elem.text if link_elem is not None and link_elem.text else ""
-                
-                # Clean up description (remove HTML tags)
-                desc = ""
-                if desc_elem is not None and desc_elem.text:
-                    desc = re.sub(r'<[^>]+>', '', unescape(desc_elem.text))
-                
-                pubdate = pubdate_elem.text if pubdate_elem is not None else ""
-                
-                if title:  # Only add if we have a title
-                    news_items.append({
-                        "title": title[:150],  # Limit title length
-                        "link": link,
-                        "snippet": desc[:300] if desc else "",  # Limit snippet
-                        "pubDate": pubdate,
-                        "category": interest
-                    })
-            
-            logger.info(f"[RSS] Fetched {len(news_items)} news items for {interest}")
-            
-        except urllib.error.URLError as e:
-            logger.error(f"[RSS] Network error fetching {interest}: {e}")
-        except ET.ParseError as e:
-            logger.error(f"[RSS] XML parse error for {interest}: {e}")
-        except Exception as e:
-            logger.error(f"[RSS] Unexpected error fetching {interest}: {e}")
+        tasks = {
+            asyncio.create_task(self.fetcher.fetch_rss(interest, max_items)): interest
+            for interest in interests
+        }
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"[{correlation_id}] RSS deadline ({deadline:.1f}s) hit, skipping: {[tasks[t] for t in pending]}")
         
-        return news_items
+        all_news = []
+        for task, interest in tasks.items():
+            if task not in done:
+                continue
+            try:
+                news_items = task.result()
+            except Exception as e:
+                logger.error(f"[{correlation_id}] Failed to fetch '{interest}': {e}")
+                continue
+            logger.info(f"[{correlation_id}] Got {len(news_items)} items for '{interest}'")
+            all_news.extend(news_items)
+        return all_news
 
-    def _resolve_google_news_url(self, url: str) -> str:
+    def _resolve_google_news_url(self, url: str, wait: bool = False) -> str:
         """Resolve a Google News redirect URL to the actual article URL.
-        Uses googlenewsdecoder to decode the protobuf-encoded URLs."""
-        if not url or 'news.google.com' not in url:
-            return url
+        Returns the memoized article URL, or `url` itself while it is decoded in the
+        background; with `wait=True` a miss is decoded inline (call off the event loop)."""
+        return self.url_resolver.resolve(url, wait=wait)
+
+    def _article_url(self, url: str) -> Optional[str]:
+        """Article URL to read a preview from, or None while a Google News link is still being decoded"""
+        actual_url = self._resolve_google_news_url(url)
+        return None if is_google_news_url(actual_url) else actual_url
+
+    async def _attach_previews(
+        self,
+        news_items: List[Dict[str, str]],
+        correlation_id: str,
+        deadline: float = PREVIEW_DEADLINE
+    ) -> List[Dict[str, str]]:
+        """
+        Copies of `news_items` with the article excerpt (`preview`) and og:image
+        (`image_url`) of every page extracted within `deadline` seconds. Slower
+        extractions keep running in the background and are cached for the next
+        generation.
+        """
+        tasks = {
+            asyncio.create_task(self.extractor.extract(item.get("link", ""))): i
+            for i, item in enumerate(news_items)
+        }
+        if not tasks:
+            return news_items
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
         
-        try:
-            from googlenewsdecoder import new_decoderv1
-            result = new_decoderv1(url, interval=5)
-            if result and result.get("status"):
-                decoded = result.get("decoded_url", "")
-                if decoded:
-                    logger.debug(f"[URL-RESOLVE] Decoded: {decoded[:80]}")
-                    return decoded
-        except Exception as e:
-            logger.debug(f"[URL-RESOLVE] Decoder failed for {url[:60]}: {e}")
+        enriched = [dict(item) for item in news_items]
+        for task in done:
+            data = task.result()
+            item = enriched[tasks[task]]
+            if data["preview"]:
+                item["preview"] = data["preview"]
+            if data["image_url"]:
+                item["image_url"] = data["image_url"]
+        found = sum(1 for item in enriched if item.get("preview") or item.get("image_url"))
+        logger.info(f"[{correlation_id}] Article previews for {found}/{len(news_items)} items "
+                    f"({len(pending)} still extracting at {deadline:.1f}s)")
+        return enriched
+    
+    async def _fetch_interest_articles(self, interest: str, max_items: int, correlation_id: str) -> List[Dict]:
+        """Fetch one interest's articles from GNews, or Google News RSS when no GNews key is set"""
+        if self.gnews_api_key:
+            return await self.fetcher.fetch_gnews(interest, max_items, correlation_id)
         
-        return url
-
-    def _extract_article_data(self, url: str, max_paragraphs: int = 3) -> Dict[str, str]:
+        items = await self.fetcher.fetch_rss(interest, max_items)
+        return [
+            {
+                "title": item.get("title", ""),
+                "description": item.get("snippet", ""),
+                "image": self._get_category_image_url(item.get("category", "General"), item.get("title", "")),
+                # Resolved when a card is served, not for every fetched item
+                "url": item.get("link", ""),
+                "publishedAt": item.get("pubDate", ""),
+                "source": "",
+                "category": item.get("category", "General")
+            }
+            for item in items
+        ]
+    
+    async def _load_interest(self, interest: str, items_per_interest: int, correlation_id: str) -> List[Dict]:
         """
-        Fetch an article URL and extract preview text, og:image, and og:description.
-        Handles Google News redirect URLs.
-        Returns dict with keys: preview, image_url, description, source_url
+        Up to `items_per_interest` articles for one interest, labelled with the
+        user's own interest string. Served from the level-1 cache; a miss is
+        fetched with INTEREST_FETCH_ITEMS so the entry serves other users too.
         """
-        import re
+        articles = self._get_cached_interest(interest, items_per_interest)
+        if articles is None:
+            fetch_items = max(items_per_interest, INTEREST_FETCH_ITEMS)
+            articles = await self._fetch_and_cache_interest(interest, fetch_items, correlation_id)
+        return [{**a, "category": interest} for a in articles[:items_per_interest]]
+    
+    async def _fetch_and_cache_interest(self, interest: str, fetch_items: int, correlation_id: str) -> List[Dict]:
+        """Fetch one interest into the level-1 cache; concurrent callers share a single fetch"""
+        async def fetch():
+            articles = await self._fetch_interest_articles(interest, fetch_items, correlation_id)
+            if articles:  # Empty results are usually fetch errors - don't cache them
+                self._set_cached_interest(interest, articles, fetch_items)
+            return articles
         
-        result = {"preview": "", "image_url": "", "description": "", "source_url": ""}
+        return await self._inflight.do(f"interest:{self._interest_cache_key(interest)}:{fetch_items}", fetch)
+    
+    async def _get_interest_articles(
+        self,
+        interests: List[str],
+        items_per_interest: int,
+        correlation_id: str
+    ) -> Dict[str, List[Dict]]:
+        """Load every interest concurrently; interests with no articles are omitted"""
+        if not self.gnews_api_key:
+            logger.warning(f"[{correlation_id}] No GNews API key — falling back to RSS")
         
-        if not url:
-            return result
+        results = await asyncio.gather(
+            *(self._load_interest(interest, items_per_interest, correlation_id) for interest in interests),
+            return_exceptions=True
+        )
+        articles = {}
+        for interest, result in zip(interests, results):
+            if isinstance(result, Exception):
+                logger.error(f"[{correlation_id}] Error fetching '{interest}': {result}")
+            elif result:
+                articles[interest] = result
+        return articles
+    
+    @staticmethod
+    def _title_dedup_key(title: str) -> str:
+        """Normalize a headline for duplicate detection (drops the " - Source" suffix and punctuation)"""
+        import re as _re
+        raw = title.lower().strip()
+        normalized = _re.sub(r'\s*[-|–—]\s*[^-|–—]+$', '', raw).strip()
+        return _re.sub(r'[^\w\s]', '', normalized).strip()
+    
+    def _build_topic_card(self, topic_id: int, article: Dict) -> Dict[str, Any]:
+        """Dashboard topic card for a fetched article"""
+        category = article.get("category", "General")
+        desc = article.get("description", "").strip()
+        summary = desc if desc and len(desc) > 20 else f"Latest {category} update — tap to read the full story."
         
-        try:
-            from bs4 import BeautifulSoup
-            
-            # Resolve Google News redirects to get the actual article URL
-            actual_url = self._resolve_google_news_url(url)
-            result["source_url"] = actual_url
-            
-            req = urllib.request.Request(actual_url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'identity',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            })
-            with urllib.request.urlopen(req, timeout=10) as response:
-                html = response.read().decode('utf-8', errors='ignore')
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # --- Extract og:image / twitter:image for thumbnail ---
-            og_image = (
-                soup.find('meta', property='og:image') or
-                soup.find('meta', attrs={'name': 'og:image'}) or
-                soup.find('meta', attrs={'name': 'twitter:image'}) or
-                soup.find('meta', property='twitter:image') or
-                soup.find('meta', attrs={'name': 'twitter:image:src'})
-            )
-            if og_image and og_image.get('content'):
-                img_url = og_image['content'].strip()
-                # Make sure it's a full URL
-                if img_url.startswith('//'):
-                    img_url = 'https:' + img_url
-                elif img_url.startswith('/'):
-                    # Relative URL - construct from base
-                    from urllib.parse import urlparse
-                    parsed = urlparse(actual_url)
-                    img_url = f"{parsed.scheme}://{parsed.netloc}{img_url}"
-                # Filter out Google News logos and other non-article images
-                if not any(domain in img_url.lower() for domain in ['google.com', 'gstatic.com', 'google.co', 'googleapis.com/logo']):
-                    result["image_url"] = img_url
-                    logger.debug(f"[Preview] Found og:image: {img_url[:80]}")
-                else:
-                    logger.debug(f"[Preview] Skipped Google og:image: {img_url[:80]}")
-            
-            # --- Extract og:description / meta description ---
-            og_desc = (
-                soup.find('meta', property='og:description') or
-                soup.find('meta', attrs={'name': 'og:description'}) or
-                soup.find('meta', attrs={'name': 'description'}) or
-                soup.find('meta', attrs={'name': 'twitter:description'})
-            )
-            if og_desc and og_desc.get('content'):
-                desc = og_desc['content'].strip()
-                if len(desc) > 30:
-                    result["description"] = desc
-            
-            # --- Remove non-content elements for paragraph extraction ---
-            for tag in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'form', 'figure', 'figcaption', 'iframe', 'noscript']):
-                tag.decompose()
-            
-            # Try to find the main article content area
-            article = (
-                soup.find('article') or 
-                soup.find('main') or 
-                soup.find('div', class_=re.compile(r'(article[-_]?(body|content|text)|story[-_]?(body|content)|post[-_]?(body|content))', re.I)) or
-                soup.find('div', class_=re.compile(r'^(content|body|entry)', re.I)) or
-                soup.find('div', {'role': 'article'}) or
-                soup.find('div', id=re.compile(r'(article|content|story|body)', re.I))
-            )
-            search_area = article if article else (soup.body if soup.body else soup)
-            
-            # Extract meaningful paragraphs
-            paragraphs = []
-            for p in search_area.find_all('p'):
-                text = p.get_text(strip=True)
-                # Skip short text (captions, dates, bylines, cookie notices)
-                if len(text) > 40 and not re.match(r'^(By |Written by |Published |Updated |Photo |Image |Credit |Source |\u00a9|Subscribe |Sign up |Log in |Advertisement)', text, re.I):
-                    paragraphs.append(text)
-                    if len(paragraphs) >= max_paragraphs:
-                        break
-            
-            preview = '\n\n'.join(paragraphs)
-            result["preview"] = preview[:1000] if preview else ""
-            
-            return result
-            
-        except Exception as e:
-            logger.debug(f"[Preview] Could not extract from {url[:60]}: {e}")
-            return result
-
+        return {
+            "id": topic_id,
+            "title": article.get("title", ""),
+            "summary": summary,
+            "category": category,
+            "sourceUrl": self._resolve_google_news_url(article.get("url", "")),
+            "pubDate": article.get("publishedAt", ""),
+            "imageUrl": article.get("image", ""),
+            "source": article.get("source", ""),
+            "hashtags": [],
+            "platforms": []
+        }
+    
     async def fetch_news_fast(
         self,
         interests: List[str],
         correlation_id: str = "unknown",
         items_per_interest: int = 5,
         max_total: int = 15,
-        shuffle: bool = False
+        shuffle: bool = False,
+        user_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Fast news fetch via GNews API — returns real images + descriptions instantly.
         Falls back to Google News RSS if GNews API key is not set.
         """
-        import asyncio, time, re as _re
-        from concurrent.futures import ThreadPoolExecutor
-        t_start = time.time()
-        
         logger.info(f"[{correlation_id}] FAST fetch for {len(interests)} interests: {interests}")
         
         if not interests:
             return {"success": False, "error": "No interests provided.", "topics": []}
         
+        # Counted before the cache check so hits and joined builds count too
+        self.record_interest_requests(interests)
+        
         # --- Cache check: instant return if cached ---
         cache_key = self._get_cache_key(interests)
-        cached_topics = self._get_cached(cache_key)
+        cached_topics = self._get_cached(cache_key, user_id)
         if cached_topics and not shuffle:
             logger.info(f"[{correlation_id}] Cache HIT — returning {len(cached_topics)} topics in 0ms")
             return {"success": True, "topics": cached_topics, "cached": True}
         
+        # Concurrent identical requests share one build (shuffled feeds are per-request)
+        if shuffle:
+            return await self._build_news_fast(interests, cache_key, correlation_id, max_total, shuffle, user_id)
+        result = await self._inflight.do(
+            f"fast:{cache_key}",
+            lambda: self._build_news_fast(interests, cache_key, correlation_id, max_total, shuffle, user_id)
+        )
+        if result.get("success") and user_id:
+            _trending_cache.link(user_id, cache_key)
+        return result
+    
+    async def _build_news_fast(
+        self,
+        interests: List[str],
+        cache_key: str,
+        correlation_id: str,
+        max_total: int,
+        shuffle: bool,
+        user_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Fetch, interleave, dedup and cache the fast feed (the uncached part of fetch_news_fast)"""
+        import time
+        t_start = time.time()
+        
         # --- Dynamically calculate items per interest to cover ALL interests ---
         # Ensure every interest gets at least 2 articles, distributed evenly
         items_per_interest = max(2, (max_total + len(interests) - 1) // len(interests))
         logger.info(f"[{correlation_id}] {len(interests)} interests -> {items_per_interest} items each (max_total={max_total})")
         
-        # --- Fetch from GNews API (includes images + descriptions) ---
-        all_articles = []
+        # --- Per-interest articles from the shared level-1 cache, fetching only misses ---
+        articles_by_interest = await self._get_interest_articles(interests, items_per_interest, correlation_id)
         
-        if self.gnews_api_key:
-            try:
-                loop = asyncio.get_running_loop()
-            except RuntimeError:
-                loop = asyncio.get_event_loop()
-            
-            def _fetch_gnews(interest: str, max_items: int) -> List[Dict]:
-                """Fetch articles from GNews API for one interest."""
-                import urllib.request as _ur
-                encoded_q = _ur.quote(interest)
-                api_url = (
-                    f"https://gnews.io/api/v4/search?"
-                    f"q={encoded_q}&lang=en&country=in&max={max_items}"
-                    f"&sortby=publishedAt"
-                    f"&apikey={self.gnews_api_key}"
-                )
-                req = _ur.Request(api_url, headers={"User-Agent": "Mozilla/5.0"})
-                try:
-                    with _ur.urlopen(req, timeout=8) as resp:
-                        data = json.loads(resp.read().decode("utf-8"))
-                    
-                    articles = []
-                    for a in data.get("articles", []):
-                        articles.append({
-                            "title": (a.get("title") or "")[:150],
-                            "description": (a.get("description") or ""),
-                            "image": a.get("image") or "",
-                            "url": a.get("url") or "",
-                            "publishedAt": a.get("publishedAt") or "",
-                            "source": (a.get("source") or {}).get("name", ""),
-                            "category": interest
-                        })
-                    return articles
-                except Exception as e:
-                    logger.error(f"[{correlation_id}] GNews error for '{interest}': {e}")
-                    return []
-            
-            # Parallel fetch — one thread per interest
-            gnews_pool = ThreadPoolExecutor(max_workers=len(interests))
-            
-            async def fetch_one(interest):
-                return await loop.run_in_executor(
-                    gnews_pool, _fetch_gnews, interest, items_per_interest
-                )
-            
-            tasks = [fetch_one(interest) for interest in interests]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            gnews_pool.shutdown(wait=False)
-            
-            # Interleave round-robin across interests for diversity
-            results_by_interest = {}
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"[{correlation_id}] Error fetching '{interests[i]}': {result}")
-                elif result:
-                    results_by_interest[interests[i]] = result
-            
-            if results_by_interest:
-                queues = list(results_by_interest.values())
-                max_len = max(len(q) for q in queues)
-                for round_idx in range(max_len):
-                    for queue in queues:
-                        if round_idx < len(queue):
-                            all_articles.append(queue[round_idx])
-            
-            logger.info(f"[{correlation_id}] GNews fetched {len(all_articles)} articles (interleaved)")
+        # Interleave round-robin across interests for diversity
+        all_articles = []
+        if articles_by_interest:
+            queues = list(articles_by_interest.values())
+            max_len = max(len(q) for q in queues)
+            for round_idx in range(max_len):
+                for queue in queues:
+                    if round_idx < len(queue):
+                        all_articles.append(queue[round_idx])
         
-        else:
-            # Fallback to Google News RSS if no GNews API key
-            logger.warning(f"[{correlation_id}] No GNews API key — falling back to RSS")
-            try:
-                loop = asyncio.get_running_loop()
-            except RuntimeError:
-                loop = asyncio.get_event_loop()
-            
-            rss_pool = ThreadPoolExecutor(max_workers=len(interests))
-            
-            async def fetch_rss(interest):
-                return await loop.run_in_executor(
-                    rss_pool, self._fetch_rss_feed, interest, items_per_interest
-                )
-            
-            tasks = [fetch_rss(interest) for interest in interests]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            rss_pool.shutdown(wait=False)
-            
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"[{correlation_id}] RSS error '{interests[i]}': {result}")
-                elif result:
-                    for item in result:
-                        all_articles.append({
-                            "title": item.get("title", ""),
-                            "description": item.get("snippet", ""),
-                            "image": self._get_category_image_url(item.get("category", "General"), item.get("title", "")),
-                            "url": item.get("link", ""),
-                            "publishedAt": item.get("pubDate", ""),
-                            "source": "",
-                            "category": item.get("category", "General")
-                        })
+        logger.info(f"[{correlation_id}] Assembled {len(all_articles)} articles from {len(articles_by_interest)} interests (interleaved)")
         
         if not all_articles:
             return {
@@ -431,9 +447,7 @@ class TrendingTopicsAgent:
         seen_titles = set()
         unique = []
         for item in all_articles:
-            raw = item.get("title", "").lower().strip()
-            normalized = _re.sub(r'\s*[-|–—]\s*[^-|–—]+$', '', raw).strip()
-            key = _re.sub(r'[^\w\s]', '', normalized).strip()
+            key = self._title_dedup_key(item.get("title", ""))
             if key and key not in seen_titles:
                 seen_titles.add(key)
                 unique.append(item)
@@ -447,30 +461,13 @@ class TrendingTopicsAgent:
             random.shuffle(all_articles)
         
         # --- Build topic cards ---
-        topics = []
-        for idx, a in enumerate(all_articles):
-            category = a.get("category", "General")
-            desc = a.get("description", "").strip()
-            summary = desc if desc and len(desc) > 20 else f"Latest {category} update — tap to read the full story."
-            
-            topics.append({
-                "id": idx + 1,
-                "title": a.get("title", ""),
-                "summary": summary,
-                "category": category,
-                "sourceUrl": a.get("url", ""),
-                "pubDate": a.get("publishedAt", ""),
-                "imageUrl": a.get("image", ""),
-                "source": a.get("source", ""),
-                "hashtags": [],
-                "platforms": []
-            })
+        topics = [self._build_topic_card(idx + 1, a) for idx, a in enumerate(all_articles)]
         
         elapsed = time.time() - t_start
         logger.info(f"[{correlation_id}] FAST fetch complete: {len(topics)} topics in {elapsed:.1f}s")
         
         # Cache for instant next load
-        self._set_cache(cache_key, topics)
+        self._set_cache(cache_key, topics, user_id)
         
         return {
             "success": True,
@@ -480,6 +477,74 @@ class TrendingTopicsAgent:
 
 
 
+    async def stream_news_fast(
+        self,
+        interests: List[str],
+        correlation_id: str = "unknown",
+        max_total: int = 15,
+        user_id: Optional[str] = None
+    ):
+        """
+        Streaming variant of fetch_news_fast.
+        Yields a `topics` event with new, de-duplicated cards as each interest's
+        articles arrive, then a final `done` event with the cached/complete markers
+        (or an `error` event if nothing could be fetched).
+        """
+        if not interests:
+            yield {"type": "error", "error": "No interests provided."}
+            return
+        
+        self.record_interest_requests(interests)
+        cache_key = self._get_cache_key(interests)
+        cached_topics = self._get_cached(cache_key, user_id)
+        if cached_topics:
+            yield {"type": "topics", "topics": cached_topics}
+            yield {"type": "done", "cached": True, "complete": True, "count": len(cached_topics)}
+            return
+        
+        items_per_interest = max(2, (max_total + len(interests) - 1) // len(interests))
+        tasks = [
+            asyncio.create_task(self._load_interest(interest, items_per_interest, correlation_id))
+            for interest in interests
+        ]
+        
+        topics = []
+        seen_titles = set()
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                try:
+                    articles = await next_result
+                except Exception as e:
+                    logger.error(f"[{correlation_id}] Error fetching interest: {e}")
+                    continue
+                
+                new_cards = []
+                for article in articles:
+                    if len(topics) >= max_total:
+                        break
+                    key = self._title_dedup_key(article.get("title", ""))
+                    if not key or key in seen_titles:
+                        continue
+                    seen_titles.add(key)
+                    card = self._build_topic_card(len(topics) + 1, article)
+                    topics.append(card)
+                    new_cards.append(card)
+                
+                if new_cards:
+                    yield {"type": "topics", "topics": new_cards}
+        finally:
+            # Client went away (or we are done): stop any fetches still running
+            for task in tasks:
+                task.cancel()
+        
+        if not topics:
+            yield {"type": "error", "error": "Unable to fetch news. Please check your connection."}
+            return
+        
+        logger.info(f"[{correlation_id}] FAST stream complete: {len(topics)} topics")
+        self._set_cache(cache_key, topics, user_id)
+        yield {"type": "done", "cached": False, "complete": True, "count": len(topics)}
+    
     async def generate_trending_topics(
         self,
         user_id: str,
@@ -511,17 +576,18 @@ class TrendingTopicsAgent:
                 "topics": []
             }
         
+        self.record_interest_requests(interests)
+        
         # Check cache first (unless force refresh)
         cache_key = self._get_cache_key(interests)
         
         if force_refresh:
-            # Clear ALL cache entries to force complete regeneration
-            global _trending_cache
-            old_count = len(_trending_cache)
-            _trending_cache = {}
-            logger.info(f"[{correlation_id}] FORCE REFRESH: Cleared {old_count} cache entries")
+            # Only this user's feeds are regenerated; other users keep their cache
+            removed = _trending_cache.invalidate_user(user_id)
+            _trending_cache.invalidate(cache_key)
+            logger.info(f"[{correlation_id}] FORCE REFRESH: Cleared {removed} cache entries for user {user_id}")
         else:
-            cached = self._get_cached(cache_key)
+            cached = self._get_cached(cache_key, user_id)
             if cached:
                 logger.info(f"[{correlation_id}] SERVING FROM CACHE (key: {cache_key[:8]})")
                 # Log the first image URL from cache to debug
@@ -535,21 +601,32 @@ class TrendingTopicsAgent:
                     "cache_key": cache_key[:8]
                 }
         
+        # Concurrent identical requests share one RSS fetch + OpenAI call
+        result = await self._inflight.do(
+            f"ai:{cache_key}",
+            lambda: self._generate_fresh_topics(user_id, interests, cache_key, correlation_id, count)
+        )
+        if result.get("success"):
+            _trending_cache.link(user_id, cache_key)
+        return result
+    
+    async def _generate_fresh_topics(
+        self,
+        user_id: str,
+        interests: List[str],
+        cache_key: str,
+        correlation_id: str,
+        count: int
+    ) -> Dict[str, Any]:
+        """Fetch RSS, format with OpenAI and cache (the uncached part of generate_trending_topics)"""
         logger.info(f"[{correlation_id}] GENERATING FRESH TOPICS (no cache)")
         try:
             # STEP 1: Fetch real news from Google News RSS for each interest
-            all_news = []
             items_per_interest = max(3, 15 // len(interests))  # Distribute evenly
             
             logger.info(f"[{correlation_id}] Fetching RSS for {len(interests)} interests: {interests}")
             
-            for interest in interests:
-                try:
-                    news_items = self._fetch_rss_feed(interest, items_per_interest)
-                    logger.info(f"[{correlation_id}] Got {len(news_items)} items for '{interest}'")
-                    all_news.extend(news_items)
-                except Exception as e:
-                    logger.error(f"[{correlation_id}] Failed to fetch '{interest}': {e}")
+            all_news = await self._fetch_rss_feeds(interests, items_per_interest, correlation_id)
             
             logger.info(f"[{correlation_id}] Total fetched: {len(all_news)} news items from RSS")
             
@@ -562,6 +639,10 @@ class TrendingTopicsAgent:
                     "topics": []
                 }
             
+            # Article excerpts give the AI more than the RSS snippet to summarise
+            if ARTICLE_PREVIEWS_ENABLED:
+                all_news = await self._attach_previews(all_news, correlation_id)
+            
             # STEP 2: Pass real news to AI for formatting/enrichment
             system_prompt = self._build_system_prompt()
             user_prompt = self._build_user_prompt(all_news, count)
@@ -608,12 +689,13 @@ class TrendingTopicsAgent:
                     "topics": []
                 }
             
-            # Validate and enrich topics (add images)
-            enriched_topics = self._enrich_topics(topics)
+            # Validate and enrich topics (add images, preferring each article's own og:image)
+            article_images = {item["link"]: item["image_url"] for item in all_news if item.get("image_url")}
+            enriched_topics = self._enrich_topics(topics, article_images)
             logger.info(f"[{correlation_id}] Enriched {len(enriched_topics)} topics with images")
             
             # Cache the results
-            self._set_cache(cache_key, enriched_topics)
+            self._set_cache(cache_key, enriched_topics, user_id)
             
             return {
                 "success": True,
@@ -698,6 +780,7 @@ Always respond with valid JSON containing a "topics" array."""
         # Format news items for the AI
         news_text = "\n\n".join([
             f"NEWS ITEM {i+1}:\n- Title: {item['title']}\n- Snippet: {item.get('snippet', 'No snippet available')}\n- Link: {item['link']}\n- Category: {item.get('category', 'General')}"
+            + (f"\n- Article excerpt: {item['preview']}" if item.get('preview') else "")
             for i, item in enumerate(news_items)
         ])
         
@@ -1055,8 +1138,8 @@ Respond with JSON: {{"topics": [...]}}"""
         
         return url
 
-    def _enrich_topics(self, topics: List[Dict]) -> List[Dict]:
-        """Validate and enrich topic data"""
+    def _enrich_topics(self, topics: List[Dict], article_images: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Validate and enrich topic data; `article_images` maps source links to their og:image"""
         platform_icons = {
             "linkedin": "Linkedin",
             "twitter": "Twitter", 
@@ -1072,8 +1155,8 @@ Respond with JSON: {{"topics": [...]}}"""
             category = topic.get("category", "General")
             logger.info(f"[ENRICH] Topic {i+1}: '{title}' (Category: {category})")
             
-            # Generate image URL based on category (more reliable than title)
-            image_url = self._get_category_image_url(category, title)
+            # Use the article's own image, else one based on category (more reliable than title)
+            image_url = (article_images or {}).get(topic.get("sourceUrl", "")) or self._get_category_image_url(category, title)
             logger.info(f"[ENRICH] Topic {i+1} imageUrl: {image_url[:60] if image_url else 'None'}...")
 
             enriched_topic = {
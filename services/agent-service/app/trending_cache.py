@@ -0,0 +1,161 @@
+"""
+Bounded LRU + TTL store for trending topics
+Caps both entry count and approximate memory, and tracks which users read
+which entries so one user's refresh only drops that user's feeds
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+
+def estimate_size(data: Any) -> int:
+    """Approximate memory cost of a cached value (its JSON size in bytes)"""
+    try:
+        return len(json.dumps(data, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class TrendingCache:
+    """
+    LRU cache with per-entry expiry and a byte budget.
+
+    Expired entries are removed on access and by a periodic sweep, and the
+    least recently used entries are evicted while the cache is over
+    `max_entries` or `max_bytes`. Only used from the event loop, so no locking.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float, sweep_interval: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        # key -> (expires_at, created_at, size, data)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._user_keys: Dict[str, Set[str]] = {}
+        self._key_users: Dict[str, Set[str]] = {}
+        self._last_sweep = time.monotonic()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, user_id: Optional[str] = None) -> Optional[Any]:
+        """Return the cached value, or None on miss/expiry; records `user_id` as a reader"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.monotonic() >= entry[0]:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if user_id:
+            self._link(user_id, key)
+        return entry[3]
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Return a live value without counting a lookup or refreshing its LRU position"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[0]:
+            return None
+        return entry[3]
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Seconds until `key` expires, or None if it is not cached"""
+        entry = self._entries.get(key)
+        return entry[0] - time.monotonic() if entry else None
+
+    def set(self, key: str, data: Any, user_id: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        """Cache a value, evicting LRU entries until within the count and byte limits"""
+        if key in self._entries:
+            self._remove(key, keep_users=True)
+        now = time.monotonic()
+        size = estimate_size(data)
+        self._entries[key] = (now + (ttl_seconds or self.ttl_seconds), now, size, data)
+        self.total_bytes += size
+        if user_id:
+            self._link(user_id, key)
+
+        if now - self._last_sweep >= self.sweep_interval:
+            self.purge_expired()
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            if oldest == key and len(self._entries) == 1:
+                break  # Keep a single oversized entry rather than caching nothing
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop every entry this user has read or written; returns how many were removed"""
+        keys = self._user_keys.pop(user_id, set())
+        removed = 0
+        for key in keys:
+            if key in self._entries:
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def clear(self):
+        self._entries.clear()
+        self._user_keys.clear()
+        self._key_users.clear()
+        self.total_bytes = 0
+
+    def purge_expired(self) -> int:
+        """Remove all expired entries"""
+        now = time.monotonic()
+        self._last_sweep = now
+        expired = [key for key, entry in self._entries.items() if now >= entry[0]]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def link(self, user_id: str, key: str):
+        """Record `user_id` as a reader of a cached entry (no-op if it isn't cached)"""
+        if key in self._entries:
+            self._link(user_id, key)
+
+    def _link(self, user_id: str, key: str):
+        self._user_keys.setdefault(user_id, set()).add(key)
+        self._key_users.setdefault(key, set()).add(user_id)
+
+    def _remove(self, key: str, keep_users: bool = False):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry[2]
+        if keep_users:
+            return
+        for user_id in self._key_users.pop(key, set()):
+            keys = self._user_keys.get(user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._user_keys[user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "users": len(self._user_keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,100 @@
+"""
+Background warm-up of the trending news cache
+Keeps the most requested interests in the level-1 interest cache so dashboard
+loads assemble their feed from memory instead of waiting on GNews/RSS
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchConfig:
+    """Background prefetch settings"""
+    def __init__(self):
+        self.enabled: bool = os.getenv("TRENDING_PREFETCH_ENABLED", "true").lower() == "true"
+        self.interval: float = float(os.getenv("TRENDING_PREFETCH_INTERVAL", "30"))
+        self.top_interests: int = int(os.getenv("TRENDING_PREFETCH_TOP_INTERESTS", "40"))
+        # Refresh entries that expire within this many seconds
+        self.refresh_ahead: float = float(os.getenv("TRENDING_PREFETCH_REFRESH_AHEAD", "90"))
+        # Popularity is multiplied by this factor every interval
+        self.decay: float = float(os.getenv("TRENDING_PREFETCH_DECAY", "0.9"))
+        self.concurrency: int = int(os.getenv("TRENDING_PREFETCH_CONCURRENCY", "4"))
+
+
+class TrendingPrefetcher:
+    """
+    Periodically refreshes the most popular interests shortly before their
+    cached articles expire. Popularity comes from the agent's decayed request
+    counts, so the warm set follows what users are currently opening.
+    """
+
+    def __init__(self, agent, config: Optional[PrefetchConfig] = None):
+        self.agent = agent
+        self.config = config or PrefetchConfig()
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def start(self):
+        if not self.config.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Trending prefetcher started (top {self.config.top_interests} interests, every {self.config.interval:.0f}s)")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> int:
+        """Refresh popular interests that are missing or about to expire; returns how many were refreshed"""
+        due = []
+        for interest in self.agent.popular_interests(self.config.top_interests):
+            expires_in = self.agent.interest_expires_in(interest)
+            if expires_in is None or expires_in <= self.config.refresh_ahead:
+                due.append(interest)
+        if not due:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+
+        async def refresh(interest: str) -> bool:
+            async with semaphore:
+                try:
+                    return await self.agent.refresh_interest(interest) > 0
+                except Exception as e:
+                    logger.warning(f"[PREFETCH] Failed to refresh '{interest}': {e}")
+                    return False
+
+        results = await asyncio.gather(*(refresh(interest) for interest in due))
+        refreshed = sum(results)
+        self.refreshes += refreshed
+        self.failures += len(results) - refreshed
+        logger.info(f"[PREFETCH] Refreshed {refreshed}/{len(due)} interests")
+        return refreshed
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"[PREFETCH] Error: {e}")
+            self.agent.decay_interest_popularity(self.config.decay)
+            await asyncio.sleep(self.config.interval)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.config.enabled,
+            "running": self._task is not None,
+            "tracked_interests": len(self.agent.interest_popularity),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+        }
@@ -0,0 +1,226 @@
+"""
+Memoized Google News URL resolution
+Encoded news.google.com article URLs are decoded once and remembered in a
+SQLite file shared by every worker process on the host, so refreshes that
+return the same headlines never hit the decoder again
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def is_google_news_url(url: str) -> bool:
+    return bool(url) and 'news.google.com' in url
+
+
+class UrlResolverConfig:
+    """Google News URL memo settings"""
+    def __init__(self):
+        self.db_path: str = os.getenv(
+            "GNEWS_URL_CACHE_PATH",
+            os.path.join(tempfile.gettempdir(), "gnews_url_cache.sqlite3")
+        )
+        self.ttl_seconds: float = float(os.getenv("GNEWS_URL_CACHE_TTL", str(7 * 24 * 3600)))
+        # Failed decodes are retried after this long instead of on every refresh
+        self.failure_ttl_seconds: float = float(os.getenv("GNEWS_URL_FAILURE_TTL", "900"))
+        self.decode_interval: int = int(os.getenv("GNEWS_DECODE_INTERVAL", "5"))
+        self.background_workers: int = int(os.getenv("GNEWS_RESOLVE_WORKERS", "2"))
+        # Background decodes queued beyond this are skipped (retried on a later lookup)
+        self.max_pending: int = int(os.getenv("GNEWS_RESOLVE_MAX_PENDING", "200"))
+        self.memory_entries: int = int(os.getenv("GNEWS_URL_MEMORY_ENTRIES", "5000"))
+        # Expired rows are purged once every this many writes
+        self.purge_every: int = int(os.getenv("GNEWS_URL_PURGE_EVERY", "500"))
+
+
+class GoogleNewsUrlResolver:
+    """
+    Encoded Google News URL -> article URL memo.
+
+    `resolve(url)` returns the memoized article URL, or the original URL
+    while the decode runs on a background thread pool - the caller never
+    waits on googlenewsdecoder. At most `max_pending` decodes are queued;
+    misses beyond that are not scheduled and get another chance on a later
+    lookup. `resolve(url, wait=True)` decodes inline on
+    a miss, for callers already off the event loop. Entries expire after
+    `ttl_seconds`; failed decodes are remembered for `failure_ttl_seconds`.
+    Safe to call from any thread.
+    """
+
+    def __init__(self, config: Optional[UrlResolverConfig] = None):
+        self.config = config or UrlResolverConfig()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Process-local front of the SQLite store: url -> (expires_at, resolved or None)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.background_workers,
+            thread_name_prefix="gnews-resolve"
+        )
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.decoded = 0
+        self.failures = 0
+        self.dropped = 0
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.config.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        try:
+            os.makedirs(os.path.dirname(self.config.db_path) or ".", exist_ok=True)
+            conn = self._connect()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS resolved_urls ("
+                "url TEXT PRIMARY KEY, resolved TEXT, expires_at REAL NOT NULL)"
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            # Keep working from the in-process memo only
+            logger.warning(f"[URL-RESOLVE] Persistent cache unavailable at {self.config.db_path}: {e}")
+
+    def resolve(self, url: str, wait: bool = False) -> str:
+        if not is_google_news_url(url):
+            return url
+
+        found, resolved = self._lookup(url)
+        if found:
+            self.hits += 1
+            return resolved or url
+        self.misses += 1
+
+        if wait:
+            return self._decode_and_store(url) or url
+        self._schedule(url)
+        return url
+
+    def _lookup(self, url: str):
+        """Return (found, resolved) from memory, then SQLite; resolved is None for a remembered failure"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(url)
+                    return True, entry[1]
+                del self._memory[url]
+
+        try:
+            row = self._connect().execute(
+                "SELECT resolved, expires_at FROM resolved_urls WHERE url = ?", (url,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"[URL-RESOLVE] Lookup failed: {e}")
+            return False, None
+        if row is None or row[1] <= now:
+            return False, None
+        self._remember(url, row[0], row[1])
+        return True, row[0]
+
+    def _remember(self, url: str, resolved: Optional[str], expires_at: float):
+        with self._lock:
+            self._memory[url] = (expires_at, resolved)
+            self._memory.move_to_end(url)
+            while len(self._memory) > self.config.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _schedule(self, url: str):
+        with self._lock:
+            if url in self._pending:
+                return
+            if len(self._pending) >= self.config.max_pending:
+                self.dropped += 1
+                return
+            self._pending.add(url)
+        try:
+            self._executor.submit(self._resolve_in_background, url)
+        except RuntimeError:
+            # Executor already shut down
+            with self._lock:
+                self._pending.discard(url)
+
+    def _resolve_in_background(self, url: str):
+        try:
+            # Another worker process may have resolved it meanwhile
+            if not self._lookup(url)[0]:
+                self._decode_and_store(url)
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    def _decode(self, url: str) -> Optional[str]:
+        try:
+            from googlenewsdecoder import new_decoderv1
+            result = new_decoderv1(url, interval=self.config.decode_interval)
+            if result and result.get("status"):
+                decoded = result.get("decoded_url", "")
+                if decoded:
+                    logger.debug(f"[URL-RESOLVE] Decoded: {decoded[:80]}")
+                    return decoded
+        except Exception as e:
+            logger.debug(f"[URL-RESOLVE] Decoder failed for {url[:60]}: {e}")
+        return None
+
+    def _decode_and_store(self, url: str) -> Optional[str]:
+        resolved = self._decode(url)
+        if resolved:
+            self.decoded += 1
+            ttl = self.config.ttl_seconds
+        else:
+            self.failures += 1
+            ttl = self.config.failure_ttl_seconds
+        expires_at = time.time() + ttl
+        self._remember(url, resolved, expires_at)
+        self._store(url, resolved, expires_at)
+        return resolved
+
+    def _store(self, url: str, resolved: Optional[str], expires_at: float):
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO resolved_urls (url, resolved, expires_at) VALUES (?, ?, ?)",
+                (url, resolved, expires_at)
+            )
+            with self._lock:
+                self._writes += 1
+                purge = self._writes % self.config.purge_every == 0
+            if purge:
+                conn.execute("DELETE FROM resolved_urls WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"[URL-RESOLVE] Store failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+            memory = len(self._memory)
+        return {
+            "path": self.config.db_path,
+            "memory_entries": memory,
+            "pending": pending,
+            "hits": self.hits,
+            "misses": self.misses,
+            "decoded": self.decoded,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "max_pending": self.config.max_pending,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
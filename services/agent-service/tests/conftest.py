@@ -0,0 +1,54 @@
+"""
+Test Configuration and Fixtures for Agent Service Tests
+
+Provides shared fixtures for testing the agent service's caches and storage
+layers without network access, Firestore or OpenAI.
+"""
+
+import logging
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Configure detailed test logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
+)
+
+# Test logger for monitoring
+test_logger = logging.getLogger("agent_service_tests")
+
+
+class FakeDecoder:
+    """Stand-in for googlenewsdecoder.new_decoderv1 that records its calls"""
+
+    def __init__(self):
+        self.calls = []
+        self.results = {}
+
+    def __call__(self, url, interval=None):
+        self.calls.append(url)
+        decoded = self.results.get(url)
+        if decoded is None:
+            return {"status": False, "message": "not decodable"}
+        return {"status": True, "decoded_url": decoded}
+
+
+@pytest.fixture
+def fake_decoder(monkeypatch):
+    decoder = FakeDecoder()
+    monkeypatch.setitem(sys.modules, "googlenewsdecoder", SimpleNamespace(new_decoderv1=decoder))
+    return decoder
+
+
+@pytest.fixture
+def trending_agent(tmp_path, monkeypatch, fake_decoder):
+    """TrendingTopicsAgent with its URL memo in a temp dir and no network access"""
+    monkeypatch.setenv("GNEWS_URL_CACHE_PATH", str(tmp_path / "urls.sqlite3"))
+    from app.trending_agent import TrendingTopicsAgent
+
+    agent = TrendingTopicsAgent(openai_api_key="sk-test")
+    yield agent
+    agent.url_resolver.close()
@@ -0,0 +1,222 @@
+"""
+Article Extractor Tests
+
+Tests for the streamed article preview extraction used by trending topics.
+
+Test Coverage:
+1. og:image and description are read from the <head> meta tags alone
+2. Paragraph extraction skips boilerplate and stops at max_paragraphs
+3. Page reads stop at the end of the article or at max_bytes
+4. Links that can't be resolved yet are not fetched
+5. Previews reach the trending prompt and topic images, only when enabled
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app import trending_agent as trending_agent_module
+from app.article_extractor import ArticleExtractConfig, ArticleExtractor, parse_head, parse_paragraphs
+
+from .conftest import test_logger
+
+PAGE_URL = "https://example.com/news/story"
+PARAGRAPH = "This paragraph is long enough to count as real article text for the preview."
+
+HEAD = (
+    '<html><head><title>Story</title>'
+    '<meta property="og:image" content="/images/story.jpg">'
+    '<meta name="description" content="A description that is comfortably longer than thirty characters.">'
+    '</head>'
+)
+ARTICLE = f"<body><article><p>By Staff Writer</p><p>{PARAGRAPH}</p><p>{PARAGRAPH} Again.</p></article>"
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Response body delivered in chunks, recording how many were read"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+
+def make_extractor(resolve_url, handler, monkeypatch, max_bytes=None):
+    if max_bytes is not None:
+        monkeypatch.setenv("PREVIEW_MAX_BYTES", str(max_bytes))
+    extractor = ArticleExtractor(resolve_url, ArticleExtractConfig())
+    extractor._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    extractor._semaphore = asyncio.Semaphore(extractor.config.max_concurrency)
+    return extractor
+
+
+class TestParsing:
+    """Test the head and body parsers"""
+
+    def test_parse_head_reads_meta_only(self):
+        """Test that relative og:image URLs are made absolute and descriptions kept"""
+        result = parse_head(HEAD, PAGE_URL, "html.parser")
+
+        assert result["image_url"] == "https://example.com/images/story.jpg"
+        assert result["description"].startswith("A description")
+
+        test_logger.info("✓ Meta tags parsed from the head")
+
+    def test_parse_head_skips_google_images_and_short_descriptions(self):
+        """Test that Google News logos and too-short descriptions are ignored"""
+        head = (
+            '<head><meta property="og:image" content="https://lh3.google.com/logo.png">'
+            '<meta property="og:description" content="Too short"></head>'
+        )
+
+        assert parse_head(head, PAGE_URL, "html.parser") == {"image_url": "", "description": ""}
+
+        test_logger.info("✓ Google images and short descriptions skipped")
+
+    def test_parse_paragraphs_skips_boilerplate_and_caps_count(self):
+        """Test that bylines, nav text and extra paragraphs are left out"""
+        body = (
+            f"<body><nav><p>{PARAGRAPH} (nav)</p></nav>"
+            f"<article><p>By Staff Writer of the Example News Network today</p>"
+            f"<p>{PARAGRAPH} One.</p><p>{PARAGRAPH} Two.</p><p>{PARAGRAPH} Three.</p></article></body>"
+        )
+
+        preview = parse_paragraphs(body, "html.parser", max_paragraphs=2)
+
+        assert preview == f"{PARAGRAPH} One.\n\n{PARAGRAPH} Two."
+
+        test_logger.info("✓ Boilerplate skipped and paragraph count capped")
+
+
+class TestArticleExtractor:
+    """Test streamed reads and URL resolution"""
+
+    async def test_stops_reading_after_article(self, monkeypatch):
+        """Test that chunks after </article> are never read"""
+        stream = ChunkedStream([HEAD.encode(), ARTICLE.encode(), b"<p>comments</p>" * 1000, b"</body>"])
+        extractor = make_extractor(lambda url: url, lambda request: httpx.Response(200, stream=stream), monkeypatch)
+
+        result = await extractor.extract(PAGE_URL, max_paragraphs=3)
+        await extractor.close()
+
+        assert stream.sent == 2
+        assert result["image_url"] == "https://example.com/images/story.jpg"
+        assert result["preview"] == f"{PARAGRAPH}\n\n{PARAGRAPH} Again."
+        assert "comments" not in result["preview"]
+
+        test_logger.info("✓ Page read stopped at the end of the article")
+
+    async def test_stops_reading_at_max_bytes(self, monkeypatch):
+        """Test that pages without an end marker are cut off at max_bytes"""
+        stream = ChunkedStream([HEAD.encode()] + [b"<div>" + b"x" * 1000 + b"</div>"] * 50)
+        extractor = make_extractor(lambda url: url, lambda request: httpx.Response(200, stream=stream),
+                                   monkeypatch, max_bytes=4096)
+
+        result = await extractor.extract(PAGE_URL)
+        await extractor.close()
+
+        assert stream.sent < 10
+        assert extractor.bytes_read < 6000
+        assert result["image_url"] == "https://example.com/images/story.jpg"
+
+        test_logger.info("✓ Page read capped at max_bytes")
+
+    async def test_results_are_cached_by_resolved_url(self, monkeypatch):
+        """Test that a second extraction of the same article doesn't refetch it"""
+        requests = []
+
+        def handler(request):
+            requests.append(str(request.url))
+            return httpx.Response(200, content=(HEAD + ARTICLE + "</body>").encode())
+
+        extractor = make_extractor(lambda url: PAGE_URL, handler, monkeypatch)
+        first = await extractor.extract("https://news.google.com/rss/articles/a")
+        second = await extractor.extract("https://news.google.com/rss/articles/b")
+        await extractor.close()
+
+        assert first == second
+        assert requests == [PAGE_URL]
+
+        test_logger.info("✓ Extraction cached per article URL")
+
+    async def test_unresolved_links_are_not_fetched(self, monkeypatch):
+        """Test that a link still being decoded returns an empty preview without a request"""
+        requests = []
+        extractor = make_extractor(lambda url: None, lambda request: requests.append(request), monkeypatch)
+
+        result = await extractor.extract("https://news.google.com/rss/articles/pending")
+        await extractor.close()
+
+        assert result["preview"] == "" and result["image_url"] == ""
+        assert requests == []
+
+        test_logger.info("✓ Unresolved link skipped")
+
+
+class TestTrendingPreviews:
+    """Test that previews feed the AI trending generation"""
+
+    async def test_previews_reach_prompt_and_images(self, trending_agent):
+        """Test that excerpts go into the prompt and og:images become topic images"""
+        items = [
+            {"title": "Story", "snippet": "snippet", "link": "https://example.com/a", "category": "Tech"},
+            {"title": "Other", "snippet": "snippet", "link": "https://news.google.com/rss/articles/x", "category": "Tech"},
+        ]
+        trending_agent.extractor.extract = AsyncMock(side_effect=[
+            {"preview": PARAGRAPH, "image_url": "https://example.com/a.jpg", "description": "", "source_url": ""},
+            {"preview": "", "image_url": "", "description": "", "source_url": ""},
+        ])
+
+        enriched = await trending_agent._attach_previews(items, "test")
+
+        assert enriched[0]["preview"] == PARAGRAPH
+        assert "preview" not in enriched[1]
+        assert "preview" not in items[0]  # Fetched items are not modified
+        assert f"Article excerpt: {PARAGRAPH}" in trending_agent._build_user_prompt(enriched, 1)
+
+        topics = trending_agent._enrich_topics(
+            [{"title": "Story", "category": "Tech", "sourceUrl": "https://example.com/a"}],
+            {"https://example.com/a": "https://example.com/a.jpg"},
+        )
+        assert topics[0]["imageUrl"] == "https://example.com/a.jpg"
+
+        test_logger.info("✓ Previews used in the prompt and for images")
+
+    def test_google_news_links_wait_for_decoding(self, trending_agent):
+        """Test that undecoded Google News links are not handed to the extractor"""
+        trending_agent.url_resolver._schedule = lambda url: None
+
+        assert trending_agent._article_url("https://news.google.com/rss/articles/x") is None
+        assert trending_agent._article_url("https://example.com/a") == "https://example.com/a"
+
+        test_logger.info("✓ Google News links skipped until decoded")
+
+    async def test_generation_skips_previews_by_default(self, trending_agent, monkeypatch):
+        """Test that fresh generation only reads article pages when previews are enabled"""
+        items = [{"title": "Story", "snippet": "snippet", "link": "https://example.com/a", "category": "Tech"}]
+        trending_agent._fetch_rss_feeds = AsyncMock(return_value=items)
+        trending_agent.extractor.extract = AsyncMock(return_value={
+            "preview": PARAGRAPH, "image_url": "", "description": "", "source_url": "",
+        })
+        create = AsyncMock(side_effect=RuntimeError("stop before formatting"))
+        trending_agent.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        await trending_agent._generate_fresh_topics("u1", ["tech"], "key", "test", 1)
+
+        trending_agent.extractor.extract.assert_not_awaited()
+        assert "Article excerpt" not in create.await_args.kwargs["messages"][-1]["content"]
+
+        monkeypatch.setattr(trending_agent_module, "ARTICLE_PREVIEWS_ENABLED", True)
+        await trending_agent._generate_fresh_topics("u1", ["tech"], "key", "test", 1)
+
+        trending_agent.extractor.extract.assert_awaited_once()
+        assert f"Article excerpt: {PARAGRAPH}" in create.await_args.kwargs["messages"][-1]["content"]
+
+        test_logger.info("✓ Previews only fetched when enabled")
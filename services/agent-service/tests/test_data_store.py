@@ -0,0 +1,174 @@
+"""
+Agent Data Store Tests
+
+Tests for AgentDataStore running on the in-memory document backend.
+
+Test Coverage:
+1. Integrations and platform tokens, including the shared token cache
+2. Business context and trending interests lookups
+3. Scheduled posts written by the schedule_post tool
+4. Post history saved after posting from the chat
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.data_store import AgentDataStore, InMemoryBackend
+from shared.token_cache import token_cache
+
+from .conftest import test_logger
+
+USER_ID = "user_123"
+
+
+@pytest.fixture
+def backend():
+    return InMemoryBackend({
+        f"users/{USER_ID}": {
+            "integrations": {
+                "linkedin": {"access_token": "li-token"},
+                "twitter": {"access_token": "tw-token"},
+            }
+        },
+        f"users/{USER_ID}/profile/accountType": {
+            "userType": "business",
+            "businessProfile": {"businessName": "Acme"},
+        },
+        f"users/{USER_ID}/preferences/onboarding": {
+            "personalizationEnabled": True,
+            "selectedInterests": ["AI", "Startups"],
+        },
+    })
+
+
+@pytest.fixture
+def store(backend):
+    token_cache.clear()
+    yield AgentDataStore(backend)
+    token_cache.clear()
+
+
+def scheduled_posts(backend):
+    prefix = f"users/{USER_ID}/scheduled_posts/"
+    return {path[len(prefix):]: data for path, data in backend.documents.items() if path.startswith(prefix)}
+
+
+class TestIntegrations:
+    """Test integration lookups and the token cache"""
+
+    async def test_platform_tokens(self, store):
+        """Test that tokens are read from the user's integrations map"""
+        assert await store.get_platform_token(USER_ID, "linkedin") == "li-token"
+        assert await store.get_platform_token(USER_ID, "facebook") is None
+        assert await store.get_integrations("unknown_user") == {}
+
+        test_logger.info("✓ Platform tokens resolved")
+
+    async def test_integrations_served_from_token_cache(self, store, backend):
+        """Test that a second lookup does not read the user document again"""
+        await store.get_integrations(USER_ID)
+
+        with patch.object(backend, "get", side_effect=AssertionError("cache bypassed")):
+            assert await store.get_platform_token(USER_ID, "twitter") == "tw-token"
+
+        token_cache.invalidate(USER_ID)
+        backend.documents[f"users/{USER_ID}"]["integrations"]["twitter"]["access_token"] = "rotated"
+        assert await store.get_platform_token(USER_ID, "twitter") == "rotated"
+
+        test_logger.info("✓ Integrations cached until invalidated")
+
+    async def test_callers_cannot_change_cached_integrations(self, store):
+        """Test that modifying a returned map leaves the cached tokens intact"""
+        integrations = await store.get_integrations(USER_ID)
+        integrations["linkedin"]["access_token"] = "tampered"
+        integrations.pop("twitter")
+
+        assert await store.get_platform_token(USER_ID, "linkedin") == "li-token"
+        assert await store.get_platform_token(USER_ID, "twitter") == "tw-token"
+
+        test_logger.info("✓ Cached integrations isolated from callers")
+
+    async def test_backend_errors_return_no_token(self, store, backend):
+        """Test that a failing read is logged and treated as not connected"""
+        with patch.object(backend, "get", side_effect=RuntimeError("unavailable")):
+            assert await store.get_platform_token(USER_ID, "linkedin") is None
+
+        test_logger.info("✓ Backend error returns no token")
+
+
+class TestProfileLookups:
+    """Test business context and interests"""
+
+    async def test_business_context(self, store, backend):
+        """Test that only business users get a business context"""
+        assert await store.get_business_context(USER_ID) == {"businessName": "Acme"}
+
+        backend.documents[f"users/{USER_ID}/profile/accountType"]["userType"] = "personal"
+        assert await store.get_business_context(USER_ID) is None
+        assert await store.get_business_context("unknown_user") is None
+
+        test_logger.info("✓ Business context only for business users")
+
+    async def test_interests(self, store, backend):
+        """Test that interests come from onboarding preferences"""
+        assert await store.get_interests(USER_ID) == ["AI", "Startups"]
+        assert await store.get_interests("unknown_user") == []
+
+        await backend.set(f"users/{USER_ID}/preferences/onboarding", {"personalizationEnabled": False})
+        assert await store.get_interests(USER_ID) == []
+
+        test_logger.info("✓ Interests read from onboarding preferences")
+
+
+class TestScheduledPosts:
+    """Test scheduled posts and post history written through the store"""
+
+    async def test_add_scheduled_post(self, store, backend):
+        """Test that each scheduled post gets its own generated ID"""
+        first = await store.add_scheduled_post(USER_ID, {"content": "one", "status": "pending"})
+        second = await store.add_scheduled_post(USER_ID, {"content": "two", "status": "pending"})
+
+        posts = scheduled_posts(backend)
+        assert first != second
+        assert posts[first]["content"] == "one"
+        assert posts[second]["content"] == "two"
+
+        test_logger.info("✓ Scheduled posts added")
+
+    async def test_schedule_post_tool(self, store, backend):
+        """Test that the schedule_post tool stores a pending post at the user's local time"""
+        from app import main
+
+        with patch.object(main, "data_store", store):
+            result = await main.execute_schedule_post(
+                USER_ID, "Launch day!", ["linkedin"], "2026-11-02", "09:30", "Asia/Kolkata", "test"
+            )
+
+        assert result["success"] is True
+        post = scheduled_posts(backend)[result["result"]["id"]]
+        assert post["status"] == "pending"
+        assert post["platforms"] == ["linkedin"]
+        assert post["scheduledTime"].isoformat() == "2026-11-02T09:30:00+05:30"
+
+        test_logger.info("✓ Scheduled post stored as pending")
+
+    async def test_save_post_history(self, store, backend):
+        """Test that only successfully posted platforms are saved, with their post IDs"""
+        from app import main
+
+        results = {
+            "linkedin": {"success": True, "result": {"urn": "urn:li:share:1"}},
+            "twitter": {"success": False, "error": "rate limited"},
+        }
+        with patch.object(main, "data_store", store):
+            await main.save_post_history(USER_ID, "Hello", ["linkedin", "twitter"], results)
+            await main.save_post_history(USER_ID, "Nothing posted", ["twitter"], results)
+
+        posts = list(scheduled_posts(backend).values())
+        assert len(posts) == 1
+        assert posts[0]["status"] == "posted"
+        assert posts[0]["platforms"] == ["linkedin"]
+        assert posts[0]["platformPostIds"] == {"linkedin": "urn:li:share:1"}
+
+        test_logger.info("✓ Post history saved for successful platforms")
@@ -0,0 +1,227 @@
+"""
+Image Proxy Tests
+
+Tests for the disk-backed image cache behind /proxy-image.
+
+Test Coverage:
+1. LRU eviction by total size
+2. Pinned blobs are not evicted
+3. An opened blob stays readable after eviction
+4. Evicted blobs take their index entries with them
+5. The size limit holds across workers sharing the directory
+6. /proxy-image caches upstream images and answers revalidation with 304
+"""
+
+import os
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.image_proxy import DiskImageCache, ImageProxy, ImageProxyConfig
+
+from .conftest import test_logger
+
+IMAGE_URL = "https://images.example.com/photo.jpg"
+
+
+def image_bytes(tag: bytes, size: int = 1000) -> bytes:
+    return (tag * size)[:size]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskImageCache(str(tmp_path / "cache"), max_bytes=2500)
+
+
+class TestDiskImageCache:
+    """Test LRU eviction and blob lifetime"""
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test that the least recently read blob is evicted first"""
+        cache.put("a", image_bytes(b"a"), "image/jpeg")
+        cache.put("b", image_bytes(b"b"), "image/jpeg")
+        assert cache.get("a") is not None  # "b" is now least recently used
+
+        cache.put("c", image_bytes(b"c"), "image/jpeg")
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] == 2000
+
+        test_logger.info("✓ LRU blob evicted")
+
+    def test_identical_bodies_stored_once(self, cache):
+        """Test that two URLs with the same body share one blob"""
+        first = cache.put("a", image_bytes(b"x"), "image/jpeg")
+        second = cache.put("b", image_bytes(b"x"), "image/png")
+
+        assert first.path == second.path
+        assert cache.stats()["blobs"] == 1
+        assert cache.get("b").content_type == "image/png"
+
+        test_logger.info("✓ Content-addressed storage deduplicated")
+
+    def test_pinned_blob_is_not_evicted(self, cache):
+        """Test that a pinned blob survives until it is unpinned"""
+        cache.put("a", image_bytes(b"a"), "image/jpeg")
+        pinned = cache.get("a", pin=True)
+        cache.put("b", image_bytes(b"b"), "image/jpeg")
+        cache.put("c", image_bytes(b"c"), "image/jpeg")
+
+        assert os.path.exists(pinned.path)
+        assert cache.get("b") is None  # Evicted in place of the pinned blob
+
+        cache.put("d", image_bytes(b"d"), "image/jpeg")
+        assert os.path.exists(pinned.path)
+
+        cache.unpin(pinned)
+        assert cache.stats()["pinned"] == 0
+        cache.put("e", image_bytes(b"e"), "image/jpeg")
+        assert not os.path.exists(pinned.path)
+
+        test_logger.info("✓ Pinned blob kept until unpinned")
+
+    async def test_opened_blob_survives_eviction(self, cache):
+        """Test that a response streaming a blob is unaffected by its eviction"""
+        body = image_bytes(b"a", 200 * 1024)
+        cache.max_bytes = 300 * 1024
+        cache.put("a", body, "image/jpeg")
+        opened = cache.open("a")
+
+        cache.put("b", image_bytes(b"b", 200 * 1024), "image/jpeg")
+        assert cache.get("a") is None
+
+        streamed = b"".join([chunk async for chunk in opened.iter_bytes()])
+        assert streamed == body
+
+        test_logger.info("✓ Evicted blob still served from its open handle")
+
+    def test_reload_keeps_entries(self, cache):
+        """Test that a new worker process sees blobs written before it started"""
+        stored = cache.put("a", image_bytes(b"a"), "image/jpeg")
+
+        reloaded = DiskImageCache(cache.root, max_bytes=2500)
+
+        assert reloaded.get("a").etag == stored.etag
+        assert reloaded.stats()["bytes"] == 1000
+
+        test_logger.info("✓ Cache reloaded from disk")
+
+
+class TestSharedCacheDirectory:
+    """Test index cleanup and the directory-wide size limit"""
+
+    def test_eviction_deletes_index_entries(self, cache):
+        """Test that every URL pointing at an evicted blob is removed from the index"""
+        cache.put("a", image_bytes(b"a"), "image/jpeg")
+        cache.put("a-alias", image_bytes(b"a"), "image/jpeg")
+        cache.put("b", image_bytes(b"b"), "image/jpeg")
+        cache.put("c", image_bytes(b"c"), "image/jpeg")
+
+        assert cache.get("a") is None
+        assert cache.get("a-alias") is None
+        assert sorted(os.listdir(cache.index_dir)) == sorted(
+            os.path.basename(cache._index_path(url)) for url in ("b", "c")
+        )
+        assert len(os.listdir(cache.refs_dir)) == 2
+
+        test_logger.info("✓ Index entries deleted with their blob")
+
+    def test_rewritten_index_entry_survives(self, cache):
+        """Test that evicting a URL's old blob keeps its entry for the new one"""
+        cache.put("a", image_bytes(b"1"), "image/jpeg")
+        cache.put("a", image_bytes(b"2"), "image/jpeg")
+        cache.put("b", image_bytes(b"b"), "image/jpeg")
+
+        assert cache.stats()["evictions"] == 1
+        assert open(cache.get("a").path, "rb").read() == image_bytes(b"2")
+
+        test_logger.info("✓ Rewritten index entry kept")
+
+    def test_limit_applies_across_workers(self, tmp_path):
+        """Test that two workers on one directory stay under a single max_bytes"""
+        root = str(tmp_path / "shared")
+        worker_a = DiskImageCache(root, max_bytes=2500, scan_interval=0)
+        worker_b = DiskImageCache(root, max_bytes=2500, scan_interval=0)
+
+        worker_a.put("a", image_bytes(b"a"), "image/jpeg")
+        worker_a.put("b", image_bytes(b"b"), "image/jpeg")
+        worker_b.put("c", image_bytes(b"c"), "image/jpeg")
+        worker_b.put("d", image_bytes(b"d"), "image/jpeg")
+
+        blob_dir = os.path.join(root, "blobs")
+        on_disk = sum(os.path.getsize(os.path.join(blob_dir, name)) for name in os.listdir(blob_dir))
+        assert on_disk <= 2500
+        assert worker_a.get("a") is None
+        assert worker_a.get("d") is not None
+
+        test_logger.info("✓ Shared directory kept under one limit")
+
+    def test_startup_drops_orphaned_index_entries(self, cache):
+        """Test that index entries whose blob is gone are removed on load"""
+        stored = cache.put("a", image_bytes(b"a"), "image/jpeg")
+        os.remove(stored.path)
+
+        DiskImageCache(cache.root, max_bytes=2500)
+
+        assert os.listdir(cache.index_dir) == []
+
+        test_logger.info("✓ Orphaned index entry removed at startup")
+
+
+class TestProxyImageEndpoint:
+    """Test caching and revalidation through /proxy-image"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from app import main
+
+        monkeypatch.setenv("IMAGE_CACHE_DIR", str(tmp_path / "proxy-cache"))
+        proxy = ImageProxy(ImageProxyConfig())
+        self.upstream_calls = []
+
+        def handler(request):
+            self.upstream_calls.append(str(request.url))
+            return httpx.Response(200, content=image_bytes(b"img", 5000), headers={"content-type": "image/jpeg"})
+
+        proxy._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(main, "image_proxy", proxy)
+        return TestClient(main.app)
+
+    def test_miss_then_hit_then_not_modified(self, client):
+        """Test that the second request is served from disk and revalidation returns 304"""
+        first = client.get("/proxy-image", params={"url": IMAGE_URL})
+        assert first.status_code == 200
+        assert first.content == image_bytes(b"img", 5000)
+
+        second = client.get("/proxy-image", params={"url": IMAGE_URL})
+        assert second.status_code == 200
+        assert second.content == first.content
+        assert second.headers["content-length"] == "5000"
+        etag = second.headers["etag"]
+        assert self.upstream_calls == [IMAGE_URL]
+
+        revalidated = client.get("/proxy-image", params={"url": IMAGE_URL}, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        changed = client.get("/proxy-image", params={"url": IMAGE_URL}, headers={"If-None-Match": '"stale"'})
+        assert changed.status_code == 200
+
+        test_logger.info("✓ Cached image revalidated with 304")
+
+    def test_regenerate_bypasses_cache(self, client):
+        """Test that regenerate=true refetches from upstream"""
+        client.get("/proxy-image", params={"url": IMAGE_URL})
+        response = client.get("/proxy-image", params={"url": IMAGE_URL, "regenerate": "true"})
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+        assert len(self.upstream_calls) == 2
+
+        test_logger.info("✓ Regenerate refetched upstream")
@@ -0,0 +1,232 @@
+"""
+MCP Registry Tests
+
+Tests for the MCP tool registry, its argument validators and the client's
+stale-while-revalidate refresh.
+
+Test Coverage:
+1. Required arguments, JSON types (bool vs number, nullable unions) and enums
+2. Reloading unchanged tools keeps their compiled validators
+3. Stale registries are served while one background refresh runs
+4. Failed refreshes keep the registry and back off
+5. Callers get MCPUnavailableError while first discovery is still running
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from tenacity import wait_none
+
+from app.mcp_client import MCPClient, MCPUnavailableError
+from app.mcp_registry import ToolRegistry, compile_validator
+
+from .conftest import test_logger
+
+POST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "content": {"type": "string"},
+        "accessToken": {"type": "string"},
+        "imageData": {"type": ["string", "null"]},
+        "visibility": {"type": "string", "enum": ["PUBLIC", "CONNECTIONS"]},
+        "retries": {"type": "integer"},
+        "weight": {"type": "number"},
+        "extra": {"type": "custom-type"},
+    },
+    "required": ["content", "accessToken"],
+}
+
+
+def tool(name, schema=None):
+    return {"name": name, "description": f"{name} tool", "inputSchema": schema or POST_SCHEMA}
+
+
+class TestCompileValidator:
+    """Test the top-level argument checks"""
+
+    def test_required_arguments(self):
+        """Test that missing and None required arguments are reported"""
+        validate = compile_validator(POST_SCHEMA)
+
+        assert validate({"content": "hi", "accessToken": "t"}) == []
+        errors = validate({"content": None})
+        assert "missing required argument 'content'" in errors
+        assert "missing required argument 'accessToken'" in errors
+
+        test_logger.info("✓ Required arguments enforced")
+
+    def test_types_and_enums(self):
+        """Test bool vs number/integer, union types, unknown types and enums"""
+        validate = compile_validator(POST_SCHEMA)
+        base = {"content": "hi", "accessToken": "t"}
+
+        assert validate({**base, "retries": 2, "weight": 2, "imageData": None}) == []
+        assert validate({**base, "weight": 0.5, "imageData": "abc", "extra": object()}) == []
+        assert validate({**base, "retries": True}) == ["argument 'retries' must be of type integer"]
+        assert validate({**base, "weight": False}) == ["argument 'weight' must be of type number"]
+        assert validate({**base, "retries": 1.5}) == ["argument 'retries' must be of type integer"]
+        assert validate({**base, "imageData": 7}) == ["argument 'imageData' must be of type ['string', 'null']"]
+        assert validate({**base, "visibility": "PUBLIC"}) == []
+        assert validate({**base, "visibility": "FRIENDS"}) == [
+            "argument 'visibility' must be one of ['PUBLIC', 'CONNECTIONS']"
+        ]
+
+        test_logger.info("✓ Types and enums checked")
+
+    def test_missing_schema_accepts_anything(self):
+        """Test that a tool without an inputSchema is not second-guessed"""
+        assert compile_validator(None)({"anything": 1}) == []
+
+        test_logger.info("✓ Schemaless tool accepted")
+
+
+class TestToolRegistry:
+    """Test versioning and validator reuse"""
+
+    def test_unchanged_reload_keeps_validators(self):
+        """Test that the same discovery result is recognised by version"""
+        registry = ToolRegistry(ttl_seconds=60)
+
+        assert registry.load([tool("post_linkedin"), tool("post_twitter")]) is True
+        validator = registry.get("post_linkedin").validate
+        version = registry.version
+
+        assert registry.load([tool("post_twitter"), tool("post_linkedin")]) is False
+        assert registry.version == version
+        assert registry.get("post_linkedin").validate is validator
+        assert registry.stats()["loads"] == 2
+        assert registry.stats()["changes"] == 1
+
+        test_logger.info("✓ Unchanged reload reused validators")
+
+    def test_changed_tool_gets_new_validator(self):
+        """Test that only the tool whose schema changed is recompiled"""
+        registry = ToolRegistry(ttl_seconds=60)
+        registry.load([tool("post_linkedin"), tool("post_twitter")])
+        linkedin = registry.get("post_linkedin").validate
+        twitter = registry.get("post_twitter").validate
+
+        assert registry.load([tool("post_linkedin"), tool("post_twitter", {"required": ["content"]})]) is True
+
+        assert registry.get("post_linkedin").validate is linkedin
+        assert registry.get("post_twitter").validate is not twitter
+        assert registry.get("post_twitter").validate({}) == ["missing required argument 'content'"]
+        assert sorted(registry.names()) == ["post_linkedin", "post_twitter"]
+
+        test_logger.info("✓ Changed tool recompiled alone")
+
+    def test_stale_after_ttl(self):
+        """Test that the registry is stale before its first load and after its TTL"""
+        registry = ToolRegistry(ttl_seconds=0)
+        assert registry.stale and not registry.loaded
+
+        registry.load([tool("post_linkedin")])
+        assert registry.loaded and registry.stale
+        assert ToolRegistry(ttl_seconds=60).stale
+
+        test_logger.info("✓ Staleness follows the TTL")
+
+
+class TestMCPClientRefresh:
+    """Test stale-while-revalidate in the MCP client"""
+
+    @pytest.fixture(autouse=True)
+    def no_retry_wait(self, monkeypatch):
+        monkeypatch.setattr(MCPClient.discover_tools.retry, "wait", wait_none())
+
+    @pytest.fixture
+    def server(self):
+        """Fake MCP server: `tools` is served, `fail` makes it return 503, `gate` holds responses"""
+        state = {"tools": [tool("post_linkedin")], "fail": False, "gate": None, "calls": 0}
+
+        async def handler(request):
+            state["calls"] += 1
+            if state["gate"] is not None:
+                await state["gate"].wait()
+            if state["fail"]:
+                return httpx.Response(503, text="unavailable")
+            return httpx.Response(200, json={"tools": state["tools"]})
+
+        state["transport"] = httpx.MockTransport(handler)
+        return state
+
+    async def make_client(self, server, **kwargs):
+        client = MCPClient("http://mcp.test", **kwargs)
+        await client.client.aclose()
+        client.client = httpx.AsyncClient(transport=server["transport"])
+        return client
+
+    async def test_first_use_discovers_inline(self, server):
+        """Test that without background discovery the first lookup fetches tools"""
+        client = await self.make_client(server)
+        try:
+            found = await client.get_registered_tool("post_linkedin")
+            assert found is not None
+            assert server["calls"] == 1
+        finally:
+            await client.close()
+
+        test_logger.info("✓ First lookup discovered tools")
+
+    async def test_stale_registry_served_during_refresh(self, server):
+        """Test that a stale registry answers at once while one refresh runs"""
+        client = await self.make_client(server, tools_ttl=0)
+        try:
+            await client.discover_tools()
+            old_version = client.registry.version
+
+            server["tools"] = [tool("post_linkedin"), tool("post_twitter")]
+            server["gate"] = asyncio.Event()
+            assert await client.get_registered_tool("post_twitter") is None
+            assert await client.get_registered_tool("post_linkedin") is not None
+            assert client.registry_stats()["refreshing"] is True
+            await asyncio.sleep(0.01)  # Let the refresh reach the server
+            assert server["calls"] == 2  # One background refresh for both lookups
+
+            server["gate"].set()
+            await client._refresh_task
+            assert client.registry.version != old_version
+            assert await client.get_registered_tool("post_twitter") is not None
+        finally:
+            await client.close()
+
+        test_logger.info("✓ Stale registry served while refreshing")
+
+    async def test_failed_refresh_keeps_registry(self, server):
+        """Test that a failed refresh keeps the old tools and isn't retried immediately"""
+        client = await self.make_client(server, tools_ttl=0)
+        try:
+            await client.discover_tools()
+            version = client.registry.version
+
+            server["fail"] = True
+            await client.get_registered_tool("post_linkedin")
+            await client._refresh_task
+            calls = server["calls"]
+
+            assert client.registry.version == version
+            assert await client.get_registered_tool("post_linkedin") is not None
+            assert client._refresh_task.done()
+            assert server["calls"] == calls  # Backing off after the failure
+        finally:
+            await client.close()
+
+        test_logger.info("✓ Failed refresh kept the registry and backed off")
+
+    async def test_unavailable_while_discovering(self, server):
+        """Test that callers fail fast while startup discovery is still running"""
+        server["gate"] = asyncio.Event()
+        client = await self.make_client(server, discovery_wait=0.05)
+        try:
+            client.start_discovery()
+            with pytest.raises(MCPUnavailableError):
+                await client.get_registered_tool("post_linkedin")
+
+            server["gate"].set()
+            assert await client.wait_until_ready(timeout=2) is True
+            assert await client.get_registered_tool("post_linkedin") is not None
+        finally:
+            await client.close()
+
+        test_logger.info("✓ Unavailable until discovery finished")
@@ -0,0 +1,103 @@
+"""
+Trending Agent Tests
+
+Tests for how the trending agent handles Google News article links.
+
+Test Coverage:
+1. Fetching an interest does not resolve every RSS item
+2. Served cards resolve their link from the memo
+3. Cached cards pick up links resolved after they were cached
+4. Every request counts towards interest popularity, cached or not
+"""
+
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+from .conftest import test_logger
+
+GNEWS_URL = "https://news.google.com/rss/articles/CBMiabc"
+ARTICLE_URL = "https://example.com/story"
+
+
+def rss_items(count):
+    return [
+        {
+            "title": f"Headline number {n} - Example",
+            "snippet": "A snippet long enough to be used as the card summary.",
+            "link": f"{GNEWS_URL}{n}",
+            "pubDate": "Mon, 12 Oct 2026 10:00:00 GMT",
+            "category": "Technology",
+        }
+        for n in range(count)
+    ]
+
+
+class TestTrendingUrlResolution:
+    """Test that Google News links are resolved when served, not when fetched"""
+
+    async def test_fetch_keeps_raw_links(self, trending_agent):
+        """Test that the RSS fast path never touches the resolver"""
+        trending_agent.fetcher.fetch_rss = AsyncMock(return_value=rss_items(10))
+
+        with patch.object(trending_agent.url_resolver, "resolve") as resolve:
+            articles = await trending_agent._fetch_interest_articles("ai", 10, "test")
+
+        resolve.assert_not_called()
+        assert [a["url"] for a in articles] == [f"{GNEWS_URL}{n}" for n in range(10)]
+
+        test_logger.info("✓ Fetched articles keep their Google News links")
+
+    async def test_cached_cards_pick_up_resolved_links(self, trending_agent, fake_decoder):
+        """Test that a card cached before its link was decoded is served with the article URL"""
+        interest = f"topic-{uuid.uuid4().hex[:8]}"
+        trending_agent.fetcher.fetch_rss = AsyncMock(return_value=rss_items(2))
+        trending_agent.url_resolver._schedule = lambda url: None  # Decode nothing yet
+
+        first = await trending_agent.fetch_news_fast([interest], "test", max_total=2)
+        assert first["cached"] is False
+        assert first["topics"][0]["sourceUrl"] == f"{GNEWS_URL}0"
+
+        trending_agent.url_resolver._remember(f"{GNEWS_URL}0", ARTICLE_URL, time.time() + 60)
+        second = await trending_agent.fetch_news_fast([interest], "test", max_total=2)
+
+        assert second["cached"] is True
+        assert second["topics"][0]["sourceUrl"] == ARTICLE_URL
+        assert second["topics"][1]["sourceUrl"] == f"{GNEWS_URL}1"
+        # The cached cards themselves are left as they were
+        assert first["topics"][0]["sourceUrl"] == f"{GNEWS_URL}0"
+        assert fake_decoder.calls == []
+
+        test_logger.info("✓ Cached cards served with newly resolved links")
+
+
+class TestInterestPopularity:
+    """Test that prefetch popularity counts requests, not cache misses"""
+
+    async def test_every_request_is_counted(self, trending_agent):
+        """Test that cache hits, joined builds, streams and AI requests all count"""
+        interest = f"topic-{uuid.uuid4().hex[:8]}"
+        key = interest.lower()
+        trending_agent.fetcher.fetch_rss = AsyncMock(return_value=rss_items(2))
+        trending_agent.url_resolver._schedule = lambda url: None
+
+        # Two concurrent requests share one build
+        await asyncio.gather(
+            trending_agent.fetch_news_fast([interest], "test", max_total=2),
+            trending_agent.fetch_news_fast([interest], "test", max_total=2),
+        )
+        assert trending_agent.fetcher.fetch_rss.await_count == 1
+        assert trending_agent.interest_popularity[key] == 2.0
+
+        hit = await trending_agent.fetch_news_fast([interest], "test", max_total=2)
+        assert hit["cached"] is True
+        events = [event async for event in trending_agent.stream_news_fast([interest], "test", max_total=2)]
+        assert events[-1]["cached"] is True
+        ai = await trending_agent.generate_trending_topics("u1", [interest], "test")
+        assert ai["cached"] is True
+
+        assert trending_agent.interest_popularity[key] == 5.0
+        assert trending_agent.popular_interests(1) == [interest]
+
+        test_logger.info("✓ Popularity counts every request")
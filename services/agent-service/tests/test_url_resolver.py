@@ -0,0 +1,123 @@
+"""
+Google News URL Resolver Tests
+
+Tests for the memoized Google News URL resolution.
+
+Test Coverage:
+1. Non-Google URLs pass through untouched
+2. Decoded URLs are memoized in memory and in the shared SQLite store
+3. Successful entries expire after the TTL
+4. Failed decodes are remembered for the failure TTL only
+5. Background decodes are capped at max_pending
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.url_resolver import GoogleNewsUrlResolver, UrlResolverConfig
+
+from .conftest import test_logger
+
+GNEWS_URL = "https://news.google.com/rss/articles/CBMiabc"
+ARTICLE_URL = "https://example.com/story"
+
+
+@pytest.fixture
+def resolver_config(tmp_path, monkeypatch):
+    monkeypatch.setenv("GNEWS_URL_CACHE_PATH", str(tmp_path / "urls.sqlite3"))
+    monkeypatch.setenv("GNEWS_URL_CACHE_TTL", "3600")
+    monkeypatch.setenv("GNEWS_URL_FAILURE_TTL", "60")
+    monkeypatch.setenv("GNEWS_DECODE_INTERVAL", "0")
+    monkeypatch.setenv("GNEWS_RESOLVE_MAX_PENDING", "2")
+    return UrlResolverConfig()
+
+
+@pytest.fixture
+def resolver(resolver_config):
+    resolver = GoogleNewsUrlResolver(resolver_config)
+    yield resolver
+    resolver.close()
+
+
+class TestGoogleNewsUrlResolver:
+    """Test memoization, expiry and the background queue bound"""
+
+    def test_non_google_urls_pass_through(self, resolver, fake_decoder):
+        """Test that ordinary article URLs are returned as-is"""
+        assert resolver.resolve(ARTICLE_URL, wait=True) == ARTICLE_URL
+        assert resolver.resolve("", wait=True) == ""
+        assert fake_decoder.calls == []
+
+        test_logger.info("✓ Non-Google URLs untouched")
+
+    def test_decoded_url_is_memoized(self, resolver, resolver_config, fake_decoder):
+        """Test that a URL is decoded once and then served from the memo and SQLite"""
+        fake_decoder.results[GNEWS_URL] = ARTICLE_URL
+
+        assert resolver.resolve(GNEWS_URL, wait=True) == ARTICLE_URL
+        assert resolver.resolve(GNEWS_URL, wait=True) == ARTICLE_URL
+        assert fake_decoder.calls == [GNEWS_URL]
+        assert resolver.stats()["hits"] == 1
+
+        # Another worker process on the host reads the shared store
+        other = GoogleNewsUrlResolver(resolver_config)
+        try:
+            assert other.resolve(GNEWS_URL) == ARTICLE_URL
+        finally:
+            other.close()
+        assert fake_decoder.calls == [GNEWS_URL]
+
+        test_logger.info("✓ Decoded once, memoized in memory and SQLite")
+
+    def test_entries_expire_after_ttl(self, resolver, fake_decoder):
+        """Test that a resolved URL is decoded again once its TTL has passed"""
+        fake_decoder.results[GNEWS_URL] = ARTICLE_URL
+        now = 1_000_000.0
+
+        with patch("app.url_resolver.time.time", return_value=now):
+            resolver.resolve(GNEWS_URL, wait=True)
+        with patch("app.url_resolver.time.time", return_value=now + 3599):
+            resolver.resolve(GNEWS_URL, wait=True)
+        assert len(fake_decoder.calls) == 1
+
+        with patch("app.url_resolver.time.time", return_value=now + 3601):
+            assert resolver.resolve(GNEWS_URL, wait=True) == ARTICLE_URL
+        assert len(fake_decoder.calls) == 2
+
+        test_logger.info("✓ Entry expired after TTL")
+
+    def test_failures_use_failure_ttl(self, resolver, fake_decoder):
+        """Test that a failed decode returns the original URL and is retried after the failure TTL"""
+        now = 1_000_000.0
+
+        with patch("app.url_resolver.time.time", return_value=now):
+            assert resolver.resolve(GNEWS_URL, wait=True) == GNEWS_URL
+        with patch("app.url_resolver.time.time", return_value=now + 59):
+            assert resolver.resolve(GNEWS_URL, wait=True) == GNEWS_URL
+        assert len(fake_decoder.calls) == 1
+        assert resolver.stats()["failures"] == 1
+
+        fake_decoder.results[GNEWS_URL] = ARTICLE_URL
+        with patch("app.url_resolver.time.time", return_value=now + 61):
+            assert resolver.resolve(GNEWS_URL, wait=True) == ARTICLE_URL
+        assert len(fake_decoder.calls) == 2
+
+        test_logger.info("✓ Failure remembered for the failure TTL only")
+
+    def test_background_queue_is_bounded(self, resolver, fake_decoder, monkeypatch):
+        """Test that misses beyond max_pending are not scheduled"""
+        release = threading.Event()
+        monkeypatch.setattr(resolver, "_resolve_in_background", lambda url: release.wait(5))
+
+        urls = [f"{GNEWS_URL}{n}" for n in range(5)]
+        for url in urls:
+            assert resolver.resolve(url) == url  # Never waits on the decoder
+
+        stats = resolver.stats()
+        assert stats["pending"] == 2
+        assert stats["dropped"] == 3
+        release.set()
+
+        test_logger.info("✓ Background decodes capped at max_pending")
@@ -22,6 +22,7 @@ from .limit_service import check_user_limit
 # Go up from app/ -> integration-service/ -> services/ -> project root
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 from shared.logging_utils import CorrelationLogger, get_correlation_id_from_headers, generate_correlation_id
+from shared.token_cache import token_cache
 
 # Initialize centralized logger
 logger = CorrelationLogger(
@@ -161,19 +162,22 @@ class AuthUrlResponse(BaseModel):
 
 # Helper function to get user from Firestore
 async def get_user_tokens(user_id: str, platform: str):
-    """Retrieve OAuth tokens for a user and platform from Firestore"""
+    """Retrieve OAuth tokens for a user and platform (cached, falling back to Firestore)"""
     if db is None:
         print("Warning: Firestore not initialized")
         return None
     try:
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
-        
-        if not user_doc.exists:
-            return None
+        integrations = token_cache.get(user_id)
+        if integrations is None:
+            user_ref = db.collection('users').document(user_id)
+            user_doc = user_ref.get()
             
-        user_data = user_doc.to_dict()
-        integrations = user_data.get('integrations', {})
+            if not user_doc.exists:
+                return None
+                
+            user_data = user_doc.to_dict()
+            integrations = user_data.get('integrations', {})
+            token_cache.set(user_id, integrations)
         
         return integrations.get(platform, {})
     except Exception as e:
@@ -205,6 +209,7 @@ async def save_user_tokens(user_id: str, platform: str, token_data: dict):
                 }
             }
         }, merge=True)
+        token_cache.invalidate(user_id)
         
         print(f"✅ [INTEGRATION-SERVICE] Tokens saved to Firestore for user {user_id}")
         return True
@@ -2207,5 +2212,6 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "integration-service",
-        "mcp_server": MCP_SOCIAL_URL
+        "mcp_server": MCP_SOCIAL_URL,
+        "token_cache": token_cache.stats()
     }
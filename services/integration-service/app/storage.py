@@ -11,6 +11,7 @@ import os
 # Add parent directory to path for shared utilities
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 from shared.logging_utils import CorrelationLogger
+from shared.token_cache import token_cache
 
 logger = CorrelationLogger(
     service_name="STORAGE",
@@ -188,6 +189,7 @@ class TokenStorage:
                     }
                 }
             }, merge=True)
+            token_cache.invalidate(user_id)
             
             logger.success(
                 f"Tokens saved for {platform}",
@@ -221,19 +223,22 @@ class TokenStorage:
             return None
         
         try:
-            user_ref = self.db.collection('users').document(user_id)
-            user_doc = user_ref.get()
-            
-            if not user_doc.exists:
-                logger.info(
-                    f"User document not found",
-                    correlation_id=correlation_id,
-                    user_id=user_id
-                )
-                return None
-            
-            user_data = user_doc.to_dict()
-            integrations = user_data.get('integrations', {})
+            integrations = token_cache.get(user_id)
+            if integrations is None:
+                user_ref = self.db.collection('users').document(user_id)
+                user_doc = user_ref.get()
+                
+                if not user_doc.exists:
+                    logger.info(
+                        f"User document not found",
+                        correlation_id=correlation_id,
+                        user_id=user_id
+                    )
+                    return None
+                
+                user_data = user_doc.to_dict()
+                integrations = user_data.get('integrations', {})
+                token_cache.set(user_id, integrations)
             
             tokens = integrations.get(platform, {})
             
@@ -276,6 +281,7 @@ class TokenStorage:
             user_ref.update({
                 f'integrations.{platform}': firestore.DELETE_FIELD
             })
+            token_cache.invalidate(user_id)
             
             logger.info(
                 f"{platform} tokens removed from user document",
@@ -121,6 +121,15 @@ def test_user_id():
     return "test_user_123456"
 
 
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    """Reset the shared token cache so tests never see another test's mocked tokens"""
+    from app.storage import token_cache
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
 @pytest.fixture
 def mock_firestore_db():
     """Mock Firestore database"""
@@ -0,0 +1,161 @@
+"""
+Token Cache Tests
+
+Tests for the shared per-user integration token cache and its use by the
+Integration Service token helpers.
+
+Test Coverage:
+1. TTL expiry and LRU eviction
+2. Hit/miss counters
+3. Callers get copies, so mutating a result doesn't change the cache
+4. Cached reads in get_user_tokens
+5. Write-through invalidation on save and disconnect
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.storage import token_cache, token_storage
+from shared.token_cache import TokenCache
+
+from .conftest import test_logger
+
+
+class TestTokenCache:
+    """Test the TokenCache data structure"""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses"""
+        cache = TokenCache(max_entries=10, ttl_seconds=60)
+
+        assert cache.get("user_a") is None
+        cache.set("user_a", {"linkedin": {"access_token": "tok"}})
+        assert cache.get("user_a") == {"linkedin": {"access_token": "tok"}}
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+        test_logger.info("✓ Hit/miss counters tracked correctly")
+
+    def test_results_are_copies(self):
+        """Test that changing a stored or returned map doesn't change the cached entry"""
+        cache = TokenCache(max_entries=10, ttl_seconds=60)
+        integrations = {"linkedin": {"access_token": "tok"}}
+        cache.set("user_a", integrations)
+        integrations["linkedin"]["access_token"] = "changed-by-writer"
+
+        first = cache.get("user_a")
+        first["linkedin"]["access_token"] = "changed-by-reader"
+        first["twitter"] = {}
+
+        assert cache.get("user_a") == {"linkedin": {"access_token": "tok"}}
+
+        test_logger.info("✓ Cached map isolated from callers")
+
+    def test_expired_entries_are_misses(self):
+        """Test that entries past their TTL are dropped"""
+        cache = TokenCache(max_entries=10, ttl_seconds=60)
+
+        with patch("shared.token_cache.time.monotonic", return_value=1000.0):
+            cache.set("user_a", {"twitter": {}})
+        with patch("shared.token_cache.time.monotonic", return_value=1061.0):
+            assert cache.get("user_a") is None
+
+        assert cache.stats()["size"] == 0
+
+        test_logger.info("✓ Expired entry evicted on read")
+
+    def test_lru_eviction_when_full(self):
+        """Test that the least recently used user is evicted first"""
+        cache = TokenCache(max_entries=2, ttl_seconds=60)
+
+        cache.set("user_a", {})
+        cache.set("user_b", {})
+        cache.get("user_a")  # user_b is now least recently used
+        cache.set("user_c", {})
+
+        assert cache.get("user_b") is None
+        assert cache.get("user_a") == {}
+        assert cache.get("user_c") == {}
+        assert cache.stats()["evictions"] == 1
+
+        test_logger.info("✓ LRU entry evicted when cache is full")
+
+    def test_invalidate_removes_user(self):
+        """Test explicit per-user invalidation"""
+        cache = TokenCache(max_entries=10, ttl_seconds=60)
+
+        cache.set("user_a", {})
+        cache.set("user_b", {})
+        cache.invalidate("user_a")
+
+        assert cache.get("user_a") is None
+        assert cache.get("user_b") == {}
+        assert cache.stats()["invalidations"] == 1
+
+        test_logger.info("✓ Invalidation only affects the given user")
+
+
+class TestTokenCacheIntegration:
+    """Test token cache usage by the Integration Service"""
+
+    @pytest.mark.asyncio
+    async def test_get_user_tokens_reads_firestore_once(
+        self,
+        mock_env_vars,
+        mock_firestore_db,
+        test_user_id
+    ):
+        """Test that repeated token reads are served from the cache"""
+        with patch('app.main.db', mock_firestore_db):
+            from app.main import get_user_tokens
+
+            first = await get_user_tokens(test_user_id, 'linkedin')
+            second = await get_user_tokens(test_user_id, 'linkedin')
+
+            assert first == second
+            assert first["access_token"] == "mock_access_token_xyz"
+            document_mock = mock_firestore_db.collection.return_value.document.return_value
+            assert document_mock.get.call_count == 1
+
+            test_logger.info("✓ Second token read served from cache")
+
+    @pytest.mark.asyncio
+    async def test_save_user_tokens_invalidates_cache(
+        self,
+        mock_env_vars,
+        mock_firestore_db,
+        test_user_id
+    ):
+        """Test that saving tokens forces the next read back to Firestore"""
+        with patch('app.main.db', mock_firestore_db):
+            from app.main import get_user_tokens, save_user_tokens
+
+            await get_user_tokens(test_user_id, 'linkedin')
+            await save_user_tokens(test_user_id, 'linkedin', {"access_token": "new_token"})
+            await get_user_tokens(test_user_id, 'linkedin')
+
+            document_mock = mock_firestore_db.collection.return_value.document.return_value
+            assert document_mock.get.call_count == 2
+
+            test_logger.info("✓ Cache invalidated on token save")
+
+    @pytest.mark.asyncio
+    async def test_disconnect_invalidates_cache(
+        self,
+        mock_env_vars,
+        mock_firestore_db,
+        test_user_id
+    ):
+        """Test that disconnecting a platform drops the cached tokens"""
+        token_cache.set(test_user_id, {"linkedin": {"access_token": "old"}})
+
+        with patch.object(token_storage, 'db', mock_firestore_db):
+            result = await token_storage.disconnect_platform(test_user_id, 'linkedin')
+
+        assert result is True
+        assert token_cache.get(test_user_id) is None
+
+        test_logger.info("✓ Cache invalidated on disconnect")
@@ -0,0 +1,166 @@
+"""
+Batched Firestore writes for finished scheduled posts
+Completions are buffered and committed as WriteBatch operations (at most 500
+per commit), and each post's add-to-posts + delete-from-scheduled_posts pair
+always lands in the same batch so the move is atomic
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, List, Optional, Tuple
+
+from google.api_core import exceptions as gcp_exceptions
+
+logger = logging.getLogger("scheduling-service")
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_OPS = 500
+
+# A write is a callable applying one operation to a WriteBatch
+WriteOp = Callable[[object], None]
+
+# (label, ops, retry_until): one post's writes, retried until the monotonic
+# deadline retry_until (or MAX_ATTEMPTS times when it is None)
+WriteGroup = Tuple[str, List[WriteOp], Optional[float]]
+
+MAX_ATTEMPTS = 3
+
+# Errors that retrying the same writes cannot fix (document deleted meanwhile,
+# update-time precondition no longer holds)
+PERMANENT_ERRORS = (gcp_exceptions.NotFound, gcp_exceptions.FailedPrecondition, gcp_exceptions.InvalidArgument)
+
+
+class CompletionBatcher:
+    """
+    Buffers per-post write groups and commits them in WriteBatches.
+
+    A group is flushed when the buffer would exceed `max_ops`, when the
+    background flusher finds it older than `max_delay` seconds, or when
+    `flush()` is called at the end of a dispatch round.
+    """
+
+    def __init__(self, db, max_ops: Optional[int] = None, max_delay: Optional[float] = None):
+        self.db = db
+        self.max_ops = min(max_ops or int(os.getenv("SCHEDULING_BATCH_MAX_OPS", str(MAX_BATCH_OPS))), MAX_BATCH_OPS)
+        self.max_delay = max_delay or float(os.getenv("SCHEDULING_BATCH_MAX_DELAY", "1.0"))
+        self._groups: List[WriteGroup] = []
+        self._op_count = 0
+        self._oldest: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self.commits = 0
+        self.writes = 0
+        self.dropped = 0
+
+    async def start(self):
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    async def add(self, label: str, ops: List[WriteOp], retry_until: Optional[float] = None):
+        """
+        Queue one post's writes; they are committed together in a single batch.
+        If the commit keeps failing it is retried until `retry_until`
+        (time.monotonic()), e.g. the end of the post's lease.
+        """
+        if len(ops) > self.max_ops:
+            raise ValueError(f"Write group for {label} has {len(ops)} ops (max {self.max_ops})")
+        if self._op_count + len(ops) > self.max_ops:
+            await self.flush()
+        self._groups.append((label, ops, retry_until))
+        self._op_count += len(ops)
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    async def flush(self):
+        """Commit everything buffered so far"""
+        async with self._lock:
+            groups, self._groups = self._groups, []
+            self._op_count = 0
+            self._oldest = None
+            if not groups:
+                return
+
+            # Concurrent add() calls can overfill the buffer, so split into
+            # chunks of at most max_ops without splitting any post's group
+            chunks: List[List[WriteGroup]] = [[]]
+            chunk_ops = 0
+            for group in groups:
+                if chunk_ops + len(group[1]) > self.max_ops:
+                    chunks.append([])
+                    chunk_ops = 0
+                chunks[-1].append(group)
+                chunk_ops += len(group[1])
+
+            for chunk in chunks:
+                await self._commit(chunk)
+
+    async def _commit(self, groups: List[WriteGroup]):
+        """
+        Commit a chunk in one batch. If that fails, every post's group is
+        committed on its own, so one post whose document was deleted (or
+        changed owner) cannot take the writes of the whole chunk down with it.
+        """
+        if len(groups) > 1:
+            try:
+                await self._commit_batch(groups)
+                return
+            except Exception as e:
+                logger.warning(f"   ⚠️ Batch commit for {len(groups)} posts failed ({e}), committing each post separately")
+        await asyncio.gather(*(self._commit_group(group) for group in groups))
+
+    async def _commit_group(self, group: WriteGroup):
+        label, _, retry_until = group
+        attempt = 0
+        while True:
+            try:
+                await self._commit_batch([group])
+                return
+            except PERMANENT_ERRORS as e:
+                logger.error(f"❌ Dropped completion writes for post {label}: {e}")
+                return
+            except Exception as e:
+                attempt += 1
+                delay = min(0.5 * 2 ** (attempt - 1), 5.0)
+                if retry_until is None:
+                    out_of_time = attempt >= MAX_ATTEMPTS
+                else:
+                    out_of_time = time.monotonic() + delay >= retry_until
+                logger.error(f"❌ Commit for post {label} failed (attempt {attempt}): {e}")
+                if out_of_time:
+                    break
+                await asyncio.sleep(delay)
+
+        # Leased posts stay 'processing'; once their lease expires they are
+        # marked for review (sending had started), never returned to 'pending'
+        self.dropped += 1
+        logger.error(f"❌ Dropped completion writes for post {label}")
+
+    async def _commit_batch(self, groups: List[WriteGroup]):
+        batch = self.db.batch()
+        for _, ops, _ in groups:
+            for op in ops:
+                op(batch)
+        op_count = sum(len(ops) for _, ops, _ in groups)
+        await asyncio.to_thread(batch.commit)
+        self.commits += 1
+        self.writes += op_count
+        logger.info(f"   💾 Committed {op_count} writes for {len(groups)} posts in one batch")
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.max_delay)
+            if self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay:
+                await self.flush()
+
+    def stats(self) -> dict:
+        return {"pending_writes": self._op_count, "commits": self.commits, "writes": self.writes, "dropped": self.dropped}
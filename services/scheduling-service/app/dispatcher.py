@@ -0,0 +1,186 @@
+"""
+Concurrent post dispatcher for the Scheduling Service
+Sends due posts to the Integration Service in parallel over one pooled client,
+bounded by a global limit that backs off when the Integration Service slows down
+and by a fixed limit per platform
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("scheduling-service")
+
+# Integration Service responses that mean "overloaded, try again later"
+OVERLOAD_STATUS_CODES = {429, 502, 503, 504}
+
+# Checked once a call holds its slots, right before the request goes out;
+# returning False cancels the call
+BeforeSend = Callable[[], Awaitable[bool]]
+
+
+class SendCancelled(Exception):
+    """The before-send check refused the call (e.g. the post's lease was lost)"""
+
+
+class DispatchConfig:
+    """Dispatcher limits, read from the environment"""
+    def __init__(self):
+        self.max_concurrency: int = int(os.getenv("SCHEDULING_MAX_CONCURRENCY", "32"))
+        self.min_concurrency: int = int(os.getenv("SCHEDULING_MIN_CONCURRENCY", "2"))
+        self.per_platform_concurrency: int = int(os.getenv("SCHEDULING_PER_PLATFORM_CONCURRENCY", "8"))
+        self.timeout: float = float(os.getenv("SCHEDULING_POST_TIMEOUT", "30"))
+        # Calls slower than this count as a slowdown signal for the adaptive limit
+        self.latency_target: float = float(os.getenv("SCHEDULING_LATENCY_TARGET", "10"))
+        self.max_retry_after: float = float(os.getenv("SCHEDULING_MAX_RETRY_AFTER", "30"))
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit with additive increase / multiplicative decrease.
+
+    The limit grows by one after each fast, successful call and halves when a
+    call is slow or the upstream reports overload, so a struggling Integration
+    Service sees fewer requests in flight instead of a growing backlog.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self, overloaded: bool):
+        async with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.minimum, self.limit // 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1)
+            self._condition.notify_all()
+
+
+class PostDispatcher:
+    """
+    Posts content to platforms via the Integration Service.
+
+    One keep-alive AsyncClient is shared by every call. Each call holds a slot
+    of its platform's semaphore and of the adaptive global limiter; an
+    overloaded response is retried once after the Retry-After delay.
+    """
+
+    def __init__(self, integration_url: str, config: Optional[DispatchConfig] = None):
+        self.integration_url = integration_url
+        self.config = config or DispatchConfig()
+        self.limiter = AdaptiveLimiter(
+            initial=self.config.max_concurrency,
+            minimum=self.config.min_concurrency,
+            maximum=self.config.max_concurrency,
+        )
+        self._platform_limits: Dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Create the pooled client (called from the app lifespan)"""
+        self._client = httpx.AsyncClient(
+            base_url=self.integration_url,
+            timeout=self.config.timeout,
+            limits=httpx.Limits(
+                max_connections=self.config.max_concurrency,
+                max_keepalive_connections=self.config.max_concurrency,
+            ),
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _platform_limit(self, platform: str) -> asyncio.Semaphore:
+        if platform not in self._platform_limits:
+            self._platform_limits[platform] = asyncio.Semaphore(self.config.per_platform_concurrency)
+        return self._platform_limits[platform]
+
+    def _retry_after(self, response: Optional[httpx.Response]) -> float:
+        try:
+            delay = float(response.headers.get("retry-after", "1")) if response is not None else 1.0
+        except ValueError:
+            delay = 1.0
+        return min(max(delay, 0.0), self.config.max_retry_after)
+
+    async def _send(self, platform: str, content: str, user_id: str, before_send: Optional[BeforeSend] = None):
+        """One rate-limited call; returns (response or None, error or None, overloaded)"""
+        async with self._platform_limit(platform):
+            await self.limiter.acquire()
+            started = time.monotonic()
+            response, error, overloaded = None, None, False
+            try:
+                if before_send is not None:
+                    if not await before_send():
+                        raise SendCancelled(f"{platform} post cancelled before sending")
+                    started = time.monotonic()
+                response = await self._client.post(
+                    f"/api/integrations/{platform}/post",
+                    json={
+                        "content": content,
+                        "user_id": user_id
+                    },
+                    headers={
+                        "Content-Type": "application/json",
+                        "X-User-ID": user_id
+                    }
+                )
+                overloaded = response.status_code in OVERLOAD_STATUS_CODES
+            except httpx.TimeoutException as e:
+                error, overloaded = e, True
+            except Exception as e:
+                error = e
+            finally:
+                slow = time.monotonic() - started > self.config.latency_target
+                await self.limiter.release(overloaded or slow)
+        return response, error, overloaded
+
+    async def post(self, platform: str, content: str, user_id: str,
+                   before_send: Optional[BeforeSend] = None) -> dict:
+        """
+        Call Integration Service to post content to a platform.
+        `before_send` is awaited after the call gets its slots and before each
+        attempt; if it returns False nothing is sent.
+        """
+        if self._client is None:
+            raise RuntimeError("PostDispatcher is not started")
+
+        response, error, overloaded = await self._send(platform, content, user_id, before_send)
+        if overloaded and response is not None:
+            # Nothing was posted - back off and try once more
+            delay = self._retry_after(response)
+            logger.warning(f"   ⏳ Integration Service overloaded ({response.status_code}) for {platform}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            response, error, overloaded = await self._send(platform, content, user_id, before_send)
+
+        if isinstance(error, SendCancelled):
+            logger.warning(f"   ⏭️ {error}")
+            return {"success": False, "platform": platform, "error": str(error), "cancelled": True}
+        if error is not None:
+            logger.error(f"❌ Error posting to {platform}: {error}")
+            return {"success": False, "platform": platform, "error": str(error)}
+        if response.status_code == 200:
+            return {"success": True, "platform": platform, "response": response.json()}
+        return {"success": False, "platform": platform, "error": response.text}
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": self.limiter.limit,
+            "in_flight": self.limiter.in_flight,
+            "max_concurrency": self.config.max_concurrency,
+            "per_platform_concurrency": self.config.per_platform_concurrency,
+        }
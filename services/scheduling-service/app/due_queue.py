@@ -0,0 +1,60 @@
+"""
+In-memory due-time queue for the Scheduling Service
+Holds the posts that become due before the next poll so they fire on their
+scheduled second instead of waiting for the next POLLING_INTERVAL tick
+"""
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+
+class DueQueue:
+    """
+    Min-heap of (due_epoch, document_path) for upcoming scheduled posts.
+
+    Each poll replaces the contents with the posts scheduled inside the
+    look-ahead window. Entries are keyed by document path, so re-adding a post
+    whose time changed supersedes the old heap entry (stale entries are skipped
+    lazily on pop).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+        self._due_at: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    def push(self, path: str, due_epoch: float):
+        """Add or reschedule the post at `path`"""
+        self._due_at[path] = due_epoch
+        heapq.heappush(self._heap, (due_epoch, path))
+
+    def discard(self, path: str):
+        """Forget a post (e.g. it was already executed by the poll)"""
+        self._due_at.pop(path, None)
+
+    def reset(self, entries: List[Tuple[str, float]]):
+        """Replace the queue with a fresh look-ahead window of (path, due_epoch)"""
+        self._due_at = dict(entries)
+        self._heap = [(due_epoch, path) for path, due_epoch in self._due_at.items()]
+        heapq.heapify(self._heap)
+
+    def _drop_stale(self):
+        while self._heap and self._due_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        """Epoch seconds of the earliest queued post, or None when empty"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now_epoch: float) -> List[str]:
+        """Remove and return the paths of every post due at or before `now_epoch`"""
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now_epoch:
+            _, path = heapq.heappop(self._heap)
+            del self._due_at[path]
+            due.append(path)
+            self._drop_stale()
+        return due
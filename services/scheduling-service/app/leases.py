@@ -0,0 +1,289 @@
+"""
+Lease-based claiming of scheduled posts for multi-replica scheduling
+A replica may only post a scheduled post after transactionally moving it from
+`pending` to `processing` with itself as lease owner, and records
+`sendStartedAt` before the first platform call. Leases left behind by crashed
+replicas are returned to `pending` once they expire, unless sending had
+started - those posts are marked failed for review instead of being posted twice
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from firebase_admin import firestore
+
+logger = logging.getLogger("scheduling-service")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class ShardConfig:
+    """
+    Splits users across scheduler replicas by a stable hash of the user ID.
+    With the default single shard every replica considers every user and the
+    leases alone prevent duplicate posts.
+    """
+    def __init__(self, shard_count: Optional[int] = None, shard_index: Optional[int] = None):
+        self.shard_count: int = shard_count or int(os.getenv("SCHEDULER_SHARD_COUNT", "1"))
+        self.shard_index: int = shard_index if shard_index is not None else int(os.getenv("SCHEDULER_SHARD_INDEX", "0"))
+        if not 0 <= self.shard_index < self.shard_count:
+            raise ValueError(f"SCHEDULER_SHARD_INDEX must be in [0, {self.shard_count})")
+
+    def shard_of(self, user_id: str) -> int:
+        # crc32 rather than hash(), which is salted per process
+        return zlib.crc32(user_id.encode("utf-8")) % self.shard_count
+
+    def owns(self, user_id: str) -> bool:
+        return self.shard_of(user_id) == self.shard_index
+
+
+class LeaseManager:
+    """Claims, releases and reclaims leases on `scheduled_posts` documents"""
+
+    def __init__(self, db, worker_id: Optional[str] = None, lease_seconds: Optional[int] = None):
+        self.db = db
+        self.worker_id = worker_id or os.getenv("SCHEDULER_WORKER_ID") or default_worker_id()
+        self.lease_seconds = lease_seconds or int(os.getenv("SCHEDULER_LEASE_SECONDS", "300"))
+
+    def claim(self, post_ref) -> Optional[dict]:
+        """
+        Atomically take the lease on a pending post (or one whose lease expired).
+        Returns the post data on success, or None if another replica holds it
+        or it is no longer pending.
+        """
+        now = datetime.now(timezone.utc)
+        lease = {
+            'status': 'processing',
+            'leaseOwner': self.worker_id,
+            'leaseExpiresAt': now + timedelta(seconds=self.lease_seconds),
+            'sendStartedAt': firestore.DELETE_FIELD,
+        }
+
+        @firestore.transactional
+        def _claim(transaction):
+            snapshot = post_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            data = snapshot.to_dict()
+            status = data.get('status')
+            lease_expires_at = data.get('leaseExpiresAt')
+            expired = status == 'processing' and lease_expires_at is not None and lease_expires_at <= now
+            if status != 'pending' and not expired:
+                return None
+            if expired and data.get('sendStartedAt') is not None:
+                return None  # May already be live on some platforms - left for reclaim_expired
+            transaction.update(post_ref, lease)
+            return data
+
+        return _claim(self.db.transaction())
+
+    def renew(self, post_ref) -> bool:
+        """
+        Extend the lease on a post this worker still holds. Returns False if
+        the lease was lost (reclaimed by another replica, or the post is gone).
+        """
+        now = datetime.now(timezone.utc)
+
+        @firestore.transactional
+        def _renew(transaction):
+            snapshot = post_ref.get(transaction=transaction)
+            if not snapshot.exists or not self._owns(snapshot.to_dict()):
+                return False
+            transaction.update(post_ref, {'leaseExpiresAt': now + timedelta(seconds=self.lease_seconds)})
+            return True
+
+        return _renew(self.db.transaction())
+
+    def mark_sending(self, post_ref) -> bool:
+        """
+        Record `sendStartedAt` on a post this worker holds, before anything is
+        sent. Returns False if the lease was lost.
+        """
+        @firestore.transactional
+        def _mark(transaction):
+            snapshot = post_ref.get(transaction=transaction)
+            if not snapshot.exists or not self._owns(snapshot.to_dict()):
+                return False
+            transaction.update(post_ref, {'sendStartedAt': firestore.SERVER_TIMESTAMP})
+            return True
+
+        return _mark(self.db.transaction())
+
+    def verify(self, post_ref):
+        """
+        Re-read a post and return its snapshot if this worker still holds the
+        lease, else None. The snapshot's `update_time` is the precondition for
+        the completion writes.
+        """
+        snapshot = post_ref.get()
+        if not snapshot.exists or not self._owns(snapshot.to_dict()):
+            return None
+        return snapshot
+
+    def _owns(self, data: dict) -> bool:
+        return data.get('status') == 'processing' and data.get('leaseOwner') == self.worker_id
+
+    def reclaim_expired(self) -> Tuple[int, int]:
+        """
+        Return posts whose lease expired (their worker crashed mid-post) to
+        `pending` so the next due query picks them up. Posts that had started
+        sending may already be published, so they are marked `failed` with
+        `needsReview` instead. Returns (reclaimed, needs_review) counts.
+        """
+        now = datetime.now(timezone.utc)
+        expired_query = self.db.collection_group('scheduled_posts').where(
+            filter=firestore.FieldFilter('status', '==', 'processing')
+        ).where(
+            filter=firestore.FieldFilter('leaseExpiresAt', '<=', now)
+        )
+
+        @firestore.transactional
+        def _reclaim(transaction, post_ref):
+            snapshot = post_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            data = snapshot.to_dict()
+            lease_expires_at = data.get('leaseExpiresAt')
+            if data.get('status') != 'processing' or lease_expires_at is None or lease_expires_at > now:
+                return None
+            released = {
+                'leaseOwner': firestore.DELETE_FIELD,
+                'leaseExpiresAt': firestore.DELETE_FIELD,
+                'leaseReclaims': firestore.Increment(1),
+            }
+            if data.get('sendStartedAt') is not None:
+                transaction.update(post_ref, {
+                    **released,
+                    'status': 'failed',
+                    'needsReview': True,
+                    'error': "Worker stopped after sending started - check the platforms before retrying",
+                })
+                return 'failed'
+            transaction.update(post_ref, {**released, 'status': 'pending'})
+            return 'pending'
+
+        reclaimed = needs_review = 0
+        for post_doc in expired_query.stream():
+            path = post_doc.reference.path
+            owner = post_doc.to_dict().get('leaseOwner')
+            try:
+                outcome = _reclaim(self.db.transaction(), post_doc.reference)
+            except Exception as e:
+                logger.error(f"❌ Error reclaiming lease on {path}: {e}")
+                continue
+            if outcome == 'pending':
+                reclaimed += 1
+                logger.warning(f"   ♻️ Reclaimed expired lease on {path} (owner: {owner})")
+            elif outcome == 'failed':
+                needs_review += 1
+                logger.error(f"   ⚠️ Expired lease on {path} after sending started (owner: {owner}), marked for review")
+        return reclaimed, needs_review
+
+    def stats(self) -> dict:
+        return {"worker_id": self.worker_id, "lease_seconds": self.lease_seconds}
+
+
+class LeaseHeartbeat:
+    """
+    Renews one post's lease every third of the lease period while the post
+    waits for dispatcher slots and is being sent, so a slow or backed-off
+    dispatch never outlives its lease and gets reclaimed mid-post.
+
+    `expires_at` is this worker's (monotonic) view of when the lease runs
+    out; work that must finish under the lease retries until `retry_until`.
+    """
+
+    def __init__(self, manager: LeaseManager, post_ref, interval: Optional[float] = None):
+        self.manager = manager
+        self.post_ref = post_ref
+        self.interval = interval or manager.lease_seconds / 3
+        self.lost = False
+        # The claim was taken just before the heartbeat was created
+        self.expires_at = time.monotonic() + manager.lease_seconds
+        self._send_marked = False
+        self._send_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def retry_until(self) -> float:
+        """Stop retrying a little before the lease expires, leaving room for the last attempt"""
+        return self.expires_at - self.manager.lease_seconds / 10
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            renewed_at = time.monotonic()
+            try:
+                if not await asyncio.to_thread(self.manager.renew, self.post_ref):
+                    self.lost = True
+                    logger.warning(f"   ⚠️ Lost lease on {self.post_ref.path}")
+                    return
+                self.expires_at = renewed_at + self.manager.lease_seconds
+            except Exception as e:
+                # Keep trying - the lease is still valid until it expires
+                logger.error(f"❌ Error renewing lease on {self.post_ref.path}: {e}")
+
+    async def still_owned(self):
+        """Snapshot of the post if this worker still holds its lease, else None"""
+        if self.lost:
+            return None
+        snapshot = await asyncio.to_thread(self.manager.verify, self.post_ref)
+        if snapshot is None:
+            self.lost = True
+        return snapshot
+
+    async def begin_send(self) -> bool:
+        """
+        Check before each platform call that the lease is still held. The first
+        call also records `sendStartedAt`, so an expired lease from here on is
+        never handed back to `pending`.
+        """
+        async with self._send_lock:
+            if self.lost:
+                return False
+            if not self._send_marked:
+                if not await asyncio.to_thread(self.manager.mark_sending, self.post_ref):
+                    self.lost = True
+                    return False
+                self._send_marked = True
+                return True
+        return await self.still_owned() is not None
+
+    async def confirm_owned(self):
+        """
+        `still_owned()` for after the post was sent: read errors are retried
+        until `retry_until`, since giving up leaves the post for review.
+        Returns None if the lease was lost or could not be confirmed in time.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self.still_owned()
+            except Exception as e:
+                delay = min(0.5 * 2 ** attempt, 5.0)
+                if time.monotonic() + delay >= self.retry_until:
+                    logger.error(f"❌ Could not confirm lease on {self.post_ref.path} before it expires: {e}")
+                    return None
+                logger.warning(f"   ⚠️ Lease check on {self.post_ref.path} failed (attempt {attempt + 1}), retrying: {e}")
+                await asyncio.sleep(delay)
+                attempt += 1
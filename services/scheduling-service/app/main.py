@@ -1,17 +1,24 @@
 """
 Scheduling Service - Auto-executes scheduled posts
-Polls Firestore every 60 seconds and calls Integration Service to post
+Polls Firestore every 60 seconds for due posts, fires posts due between polls
+from an in-memory queue, and calls Integration Service to post
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
-import httpx
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 import logging
 
+from .due_queue import DueQueue
+from .dispatcher import PostDispatcher
+from .leases import LeaseHeartbeat, LeaseManager, ShardConfig
+from .completions import CompletionBatcher
+from .stats import SchedulerStats, count_by_status
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv(override=True)
@@ -31,6 +38,17 @@ logger = logging.getLogger("scheduling-service")
 APP_ID = "default-app-id"  # Must match frontend's appId (line 40 in App.jsx)
 INTEGRATION_SERVICE_URL = os.getenv("INTEGRATION_SERVICE_URL", "http://localhost:8002")
 POLLING_INTERVAL = int(os.getenv("SCHEDULING_POLL_INTERVAL", "60"))  # seconds
+# Posts due within this many seconds of a poll are queued in memory and fired on time
+LOOKAHEAD_SECONDS = int(os.getenv("SCHEDULING_LOOKAHEAD_SECONDS", str(POLLING_INTERVAL)))
+
+due_queue = DueQueue()
+due_queue_changed = asyncio.Event()  # Set when a poll replaces the due queue
+dispatch_tasks: set = set()  # Poll and queued-post dispatches still running
+dispatcher = PostDispatcher(INTEGRATION_SERVICE_URL)
+shard_config = ShardConfig()
+lease_manager: Optional[LeaseManager] = None  # Created once Firebase is initialized
+completions: Optional[CompletionBatcher] = None  # Created once Firebase is initialized
+scheduler_stats: Optional[SchedulerStats] = None  # Created once Firebase is initialized
 
 # Firebase initialization
 db = None
@@ -70,88 +88,240 @@ def init_firebase():
         except Exception as e:
             logger.error(f"❌ Firebase initialization failed: {e}")
 
-async def post_to_platform(platform: str, content: str, user_id: str) -> dict:
+async def post_to_platform(platform: str, content: str, user_id: str, before_send=None) -> dict:
     """
     Call Integration Service to post content to a platform
     """
-    url = f"{INTEGRATION_SERVICE_URL}/api/integrations/{platform}/post"
+    return await dispatcher.post(platform, content, user_id, before_send=before_send)
+
+def to_utc_datetime(scheduled_time) -> Optional[datetime]:
+    """Convert a Firestore timestamp or datetime to a naive UTC datetime"""
+    if isinstance(scheduled_time, datetime):
+        # Firestore returns tz-aware UTC datetimes; normalize to naive UTC
+        if scheduled_time.tzinfo:
+            return scheduled_time.astimezone(timezone.utc).replace(tzinfo=None)
+        return scheduled_time
+    if hasattr(scheduled_time, 'seconds'):
+        # Firestore timestamp seconds are Unix epoch (UTC)
+        return datetime.utcfromtimestamp(scheduled_time.seconds)
+    return None
+
+def parse_post_doc(post_doc):
+    """
+    Return (post_doc, post_data, scheduled_datetime, user_id) for a scheduled post
+    snapshot, or None if it has no valid timestamp or owner
+    """
+    post_data = post_doc.to_dict()
+    scheduled_datetime = to_utc_datetime(post_data.get('scheduledTime'))
+    if scheduled_datetime is None:
+        return None  # Skip if no valid timestamp
+
+    # Extract user_id from document path: users/{userId}/scheduled_posts/{postId}
+    path_parts = post_doc.reference.path.split('/')
+    user_id = path_parts[1] if len(path_parts) >= 4 else None
+
+    if not user_id:
+        logger.warning(f"   ⚠️ Could not extract user_id from path: {post_doc.reference.path}")
+        return None
+
+    return (post_doc, post_data, scheduled_datetime, user_id)
+
+def pending_posts_query():
+    """Pending scheduled posts across all users (collection group)"""
+    return db.collection_group('scheduled_posts').where(
+        filter=firestore.FieldFilter('status', '==', 'pending')
+    )
+
+def owned_posts(query):
+    """
+    Parsed posts from a scheduled-posts query that belong to this replica's
+    shard. Streams the query, so call it from a worker thread.
+    """
+    return [
+        parsed for parsed in map(parse_post_doc, query.stream())
+        if parsed and shard_config.owns(parsed[3])
+    ]
+
+def spawn_dispatch(posts_list):
+    """
+    Dispatch posts as a tracked background task, so the loop that found them
+    keeps its own schedule however long the posts take to send
+    """
+    task = asyncio.create_task(dispatch_posts(posts_list))
+    dispatch_tasks.add(task)
+    task.add_done_callback(dispatch_tasks.discard)
+    return task
+
+async def execute_scheduled_post(post_doc, post_data, scheduled_datetime, user_id):
+    """
+    Post one scheduled post to all its platforms and move it to `posts`
+    (or mark it failed)
+    """
+    post_id = post_doc.id
+    post_ref = post_doc.reference
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(
-                url,
-                json={
-                    "content": content,
-                    "user_id": user_id
-                },
-                headers={
-                    "Content-Type": "application/json",
-                    "X-User-ID": user_id
-                }
+    # Take the lease first so no other replica can post the same document
+    claimed_data = await asyncio.to_thread(lease_manager.claim, post_ref)
+    if claimed_data is None:
+        logger.info(f"⏭️ Post {post_id} is no longer pending or is claimed by another worker, skipping")
+        return
+    post_data = claimed_data
+    if post_data.get('status') != 'processing':  # Not a takeover of an expired lease
+        scheduler_stats.record(pending=-1, processing=1)
+
+    # Keep the lease alive while the post waits for dispatcher slots and is sent
+    heartbeat = LeaseHeartbeat(lease_manager, post_ref)
+    heartbeat.start()
+    try:
+        await _post_leased(post_doc, post_data, user_id, heartbeat)
+    finally:
+        await heartbeat.stop()
+
+async def _post_leased(post_doc, post_data, user_id, heartbeat: LeaseHeartbeat):
+    """Post a claimed post and queue its completion writes, as long as this worker holds the lease"""
+    post_id = post_doc.id
+    post_ref = post_doc.reference
+
+    content = post_data.get('content', '')
+    platforms = post_data.get('platforms', [])
+    
+    logger.info(f"📤 Processing post {post_id} for user {user_id}")
+    logger.info(f"   Content: {content[:50]}..." if len(content) > 50 else f"   Content: {content}")
+    logger.info(f"   Platforms: {platforms}")
+    
+    # Track results
+    results = {"success": [], "failed": []}
+    platform_post_ids = {}  # Store platform post IDs for deletion feature
+    
+    # Post to all platforms concurrently (the dispatcher enforces the limits)
+    platform_results = await asyncio.gather(
+        *(post_to_platform(platform, content, user_id, before_send=heartbeat.begin_send) for platform in platforms)
+    )
+    for platform, result in zip(platforms, platform_results):
+        if result["success"]:
+            results["success"].append(platform)
+            logger.info(f"   ✅ Posted to {platform}")
+            
+            # Extract and store post_id from platform response
+            # Response structure: {success: bool, result: {post_id/id/urn...}, error: str}
+            response_data = result.get("response", {})
+            
+            # Check top-level first, then nested in 'result'
+            post_id_key = (
+                response_data.get("post_id") or 
+                response_data.get("id") or 
+                response_data.get("postId") or
+                response_data.get("urn") or
+                # Check nested in result object 
+                (response_data.get("result", {}) or {}).get("post_id") or
+                (response_data.get("result", {}) or {}).get("id") or
+                (response_data.get("result", {}) or {}).get("urn")
             )
             
-            if response.status_code == 200:
-                return {"success": True, "platform": platform, "response": response.json()}
+            if post_id_key:
+                platform_post_ids[platform] = post_id_key
+                logger.info(f"   📌 Saved {platform} post_id: {post_id_key}")
             else:
-                return {"success": False, "platform": platform, "error": response.text}
-                
-        except Exception as e:
-            logger.error(f"❌ Error posting to {platform}: {e}")
-            return {"success": False, "platform": platform, "error": str(e)}
+                logger.warning(f"   ⚠️ No post_id found in response for {platform}: {response_data}")
+        else:
+            results["failed"].append({"platform": platform, "error": result.get("error", "Unknown error")})
+            logger.error(f"   ❌ Failed to post to {platform}: {result.get('error')}")
+    
+    # Only the lease holder may finish the post, and only if the document is
+    # unchanged since this check: the completion writes are conditional on its
+    # update time, so a replica that reclaimed the post in between wins. Both
+    # the check and the writes are retried until the lease runs out; a post
+    # that is still 'processing' after that is marked for review, not resent
+    await heartbeat.stop()
+    snapshot = await heartbeat.confirm_owned()
+    if snapshot is None:
+        logger.warning(f"   ⚠️ Lease on post {post_id} was lost or could not be confirmed, not recording its results")
+        return
+    unchanged = db.write_option(last_update_time=snapshot.update_time)
+
+    # Update Firestore document
+    if results["success"] and not results["failed"]:
+        # All platforms succeeded - MOVE to posts collection
+        posted_data = {
+            **post_data,
+            'status': 'posted',
+            'postedAt': firestore.SERVER_TIMESTAMP,
+            'postResults': results,
+            'originalScheduledTime': post_data.get('scheduledTime')
+        }
+        # Add platform post IDs if captured
+        if platform_post_ids:
+            posted_data['platformPostIds'] = platform_post_ids
+        
+        # Create in posts collection and delete from scheduled_posts in the same
+        # batch, so the move is atomic (the ID is allocated client-side, which
+        # also makes a retried commit idempotent)
+        new_post_ref = db.collection('users').document(user_id).collection('posts').document()
+        await completions.add(post_ref.path, [
+            lambda batch: batch.set(new_post_ref, posted_data),
+            lambda batch: batch.delete(post_ref, option=unchanged),
+        ], retry_until=heartbeat.retry_until)
+        scheduler_stats.record(processing=-1)
+        logger.info(f"   ✅ Post {post_id} queued for move to 'posts' collection with ID: {new_post_ref.id}")
+    elif results["failed"]:
+        # Some or all platforms failed
+        failed_update = {
+            'status': 'failed',
+            'error': f"Failed platforms: {[f['platform'] for f in results['failed']]}",
+            'postResults': results,
+            'leaseOwner': firestore.DELETE_FIELD,
+            'leaseExpiresAt': firestore.DELETE_FIELD
+        }
+        await completions.add(post_ref.path, [
+            lambda batch: batch.update(post_ref, failed_update, option=unchanged),
+        ], retry_until=heartbeat.retry_until)
+        scheduler_stats.record(processing=-1, failed=1)
+        logger.error(f"   ❌ Post {post_id} marked as 'failed'")
 
 async def process_scheduled_posts():
     """
-    Poll Firestore for due posts and execute them
+    Poll Firestore for due posts and start executing them in the background,
+    then load the posts due before the next poll into the in-memory due queue
     """
-    if not firebase_initialized or not db:
+    if not firebase_initialized or not db or not lease_manager:
         logger.warning("⚠️ Firebase not initialized, skipping poll")
         return
     
     # Use UTC for consistent timezone handling
-    now = datetime.utcnow()
-    logger.info(f"🔍 Checking for scheduled posts due before {now.isoformat()} UTC")
+    now = datetime.now(timezone.utc)
+    window_end = now + timedelta(seconds=LOOKAHEAD_SECONDS)
+    logger.info(f"🔍 Checking for scheduled posts due before {now.isoformat()}")
     
     try:
-        # OPTIMIZED: Use collection_group to query ALL scheduled_posts at once
-        # This is much faster than looping through each user
-        logger.info("   📂 Using collection_group query for scheduled_posts")
-        
-        # Query all scheduled_posts with status='pending' across all users
-        posts_query = db.collection_group('scheduled_posts').where('status', '==', 'pending')
-        posts = list(posts_query.stream())
-        
-        logger.info(f"   📝 Found {len(posts)} pending posts across all users")
+        # Return posts abandoned by crashed workers to 'pending' before querying
+        # (or mark them for review if they had started sending)
+        reclaimed, needs_review = await asyncio.to_thread(lease_manager.reclaim_expired)
+        if reclaimed or needs_review:
+            scheduler_stats.record(processing=-(reclaimed + needs_review), pending=reclaimed, failed=needs_review)
+            logger.warning(f"   ♻️ Reclaimed {reclaimed} posts with expired leases, {needs_review} marked for review")
         
-        posts_list = []
-        
-        for post_doc in posts:
-            post_data = post_doc.to_dict()
-            scheduled_time = post_data.get('scheduledTime')
-            
-            # Handle Firestore timestamp - convert to UTC datetime
-            if hasattr(scheduled_time, 'seconds'):
-                # Firestore timestamp seconds are Unix epoch (UTC)
-                scheduled_datetime = datetime.utcfromtimestamp(scheduled_time.seconds)
-            elif isinstance(scheduled_time, datetime):
-                # Remove timezone info and assume it's already UTC
-                scheduled_datetime = scheduled_time.replace(tzinfo=None) if scheduled_time.tzinfo else scheduled_time
-            else:
-                continue  # Skip if no valid timestamp
-            
-            # Extract user_id from document path: users/{userId}/scheduled_posts/{postId}
-            path_parts = post_doc.reference.path.split('/')
-            user_id = path_parts[1] if len(path_parts) >= 4 else None
-            
-            if not user_id:
-                logger.warning(f"   ⚠️ Could not extract user_id from path: {post_doc.reference.path}")
-                continue
-            
-            # Debug logging
-            logger.info(f"   ⏰ Post {post_doc.id} (user: {user_id}): scheduled={scheduled_datetime.isoformat()} UTC, now={now.isoformat()} UTC, due={scheduled_datetime <= now}")
-            
-            # Check if due (both are now UTC)
-            if scheduled_datetime <= now:
-                posts_list.append((post_doc, post_data, scheduled_datetime, user_id))
+        # Range query on scheduledTime so Firestore only returns due posts
+        # (needs the status+scheduledTime collection-group index in firestore.indexes.json)
+        due_query = pending_posts_query().where(
+            filter=firestore.FieldFilter('scheduledTime', '<=', now)
+        )
+        # Each replica only handles the users in its shard
+        posts_list = await asyncio.to_thread(owned_posts, due_query)
+
+        # Queue posts that become due before the next poll so they fire on time
+        upcoming_query = pending_posts_query().where(
+            filter=firestore.FieldFilter('scheduledTime', '>', now)
+        ).where(
+            filter=firestore.FieldFilter('scheduledTime', '<=', window_end)
+        )
+        upcoming = [
+            (parsed[0].reference.path, parsed[2].replace(tzinfo=timezone.utc).timestamp())
+            for parsed in await asyncio.to_thread(owned_posts, upcoming_query)
+        ]
+        due_queue.reset(upcoming)
+        due_queue_changed.set()
+        if upcoming:
+            logger.info(f"   ⏳ Queued {len(upcoming)} posts due in the next {LOOKAHEAD_SECONDS}s")
         
         if not posts_list:
             logger.info("📭 No pending posts due for execution")
@@ -159,103 +329,96 @@ async def process_scheduled_posts():
         
         logger.info(f"📬 Found {len(posts_list)} posts to process")
         
-        for post_doc, post_data, scheduled_datetime, user_id in posts_list:
-            post_id = post_doc.id
-            post_ref = post_doc.reference
-            
-            content = post_data.get('content', '')
-            platforms = post_data.get('platforms', [])
-            
-            logger.info(f"📤 Processing post {post_id} for user {user_id}")
-            logger.info(f"   Content: {content[:50]}..." if len(content) > 50 else f"   Content: {content}")
-            logger.info(f"   Platforms: {platforms}")
-            
-            # Track results
-            results = {"success": [], "failed": []}
-            platform_post_ids = {}  # Store platform post IDs for deletion feature
-            
-            # Post to each platform
-            for platform in platforms:
-                result = await post_to_platform(platform, content, user_id)
-                
-                if result["success"]:
-                    results["success"].append(platform)
-                    logger.info(f"   ✅ Posted to {platform}")
-                    
-                    # Extract and store post_id from platform response
-                    # Response structure: {success: bool, result: {post_id/id/urn...}, error: str}
-                    response_data = result.get("response", {})
-                    
-                    # Check top-level first, then nested in 'result'
-                    post_id_key = (
-                        response_data.get("post_id") or 
-                        response_data.get("id") or 
-                        response_data.get("postId") or
-                        response_data.get("urn") or
-                        # Check nested in result object 
-                        (response_data.get("result", {}) or {}).get("post_id") or
-                        (response_data.get("result", {}) or {}).get("id") or
-                        (response_data.get("result", {}) or {}).get("urn")
-                    )
-                    
-                    if post_id_key:
-                        platform_post_ids[platform] = post_id_key
-                        logger.info(f"   📌 Saved {platform} post_id: {post_id_key}")
-                    else:
-                        logger.warning(f"   ⚠️ No post_id found in response for {platform}: {response_data}")
-                else:
-                    results["failed"].append({"platform": platform, "error": result.get("error", "Unknown error")})
-                    logger.error(f"   ❌ Failed to post to {platform}: {result.get('error')}")
-            
-            # Update Firestore document
-            if results["success"] and not results["failed"]:
-                # All platforms succeeded - MOVE to posts collection
-                posted_data = {
-                    **post_data,
-                    'status': 'posted',
-                    'postedAt': firestore.SERVER_TIMESTAMP,
-                    'postResults': results,
-                    'originalScheduledTime': post_data.get('scheduledTime')
-                }
-                # Add platform post IDs if captured
-                if platform_post_ids:
-                    posted_data['platformPostIds'] = platform_post_ids
-                
-                # Create in posts collection
-                posts_ref = db.collection('users').document(user_id).collection('posts')
-                new_post_ref = posts_ref.add(posted_data)
-                logger.info(f"   ✅ Post moved to 'posts' collection with ID: {new_post_ref[1].id}")
-                
-                # Delete from scheduled_posts
-                post_ref.delete()
-                logger.info(f"   🗑️ Deleted from scheduled_posts: {post_id}")
-            elif results["failed"]:
-                # Some or all platforms failed
-                post_ref.update({
-                    'status': 'failed',
-                    'error': f"Failed platforms: {[f['platform'] for f in results['failed']]}",
-                    'postResults': results
-                })
-                logger.error(f"   ❌ Post {post_id} marked as 'failed'")
+        # Not awaited: a large burst must not delay the next poll, or posts due
+        # just after this poll's look-ahead window would fire late
+        spawn_dispatch(posts_list)
     
     except Exception as e:
         logger.error(f"❌ Error processing scheduled posts: {e}")
         import traceback
         traceback.print_exc()
 
-async def scheduler_loop():
+async def dispatch_posts(posts_list):
+    """Execute due posts concurrently; one failing post does not affect the others"""
+    results = await asyncio.gather(
+        *(execute_scheduled_post(*post) for post in posts_list),
+        return_exceptions=True
+    )
+    for post, result in zip(posts_list, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ Error executing post {post[0].id}: {result}")
+    await completions.flush()
+    if scheduler_stats:
+        await scheduler_stats.flush()
+
+async def process_queued_posts(paths):
     """
-    Background task that runs the scheduler
+    Execute queued posts whose scheduled second has arrived. Each document is
+    re-read first so posts edited, cancelled or already sent since the poll are skipped.
     """
+    if not firebase_initialized or not db or not lease_manager:
+        return
+
+    snapshots = await asyncio.gather(
+        *(asyncio.to_thread(db.document(path).get) for path in paths),
+        return_exceptions=True
+    )
+    posts_list = []
+    for path, post_doc in zip(paths, snapshots):
+        if isinstance(post_doc, Exception):
+            logger.error(f"❌ Error processing queued post {path}: {post_doc}")
+            continue
+        if not post_doc.exists:
+            continue
+        parsed = parse_post_doc(post_doc)
+        if not parsed or parsed[1].get('status') != 'pending':
+            continue
+        if parsed[2] > datetime.utcnow():
+            # Rescheduled later since the poll - the next poll will pick it up
+            continue
+        posts_list.append(parsed)
+
+    if posts_list:
+        await dispatch_posts(posts_list)
+
+async def poll_loop():
+    """Background task that polls Firestore every POLLING_INTERVAL seconds"""
     logger.info(f"🚀 Scheduler started - polling every {POLLING_INTERVAL} seconds")
     
     while True:
+        started = time.time()
         try:
             await process_scheduled_posts()
+            if scheduler_stats:
+                await scheduler_stats.flush()
+                await scheduler_stats.maybe_reconcile(time.monotonic())
         except Exception as e:
             logger.error(f"❌ Scheduler error: {e}")
         
-        await asyncio.sleep(POLLING_INTERVAL)
+        await asyncio.sleep(max(0.0, started + POLLING_INTERVAL - time.time()))
+
+async def due_queue_loop():
+    """
+    Background task that fires queued posts on their due second. It runs
+    independently of the poll loop, and each batch of due posts is dispatched
+    as its own task, so neither a long poll round nor a slow dispatch delays
+    the next queued post.
+    """
+    while True:
+        due_queue_changed.clear()
+        next_due = due_queue.next_due()
+        timeout = None if next_due is None else max(0.0, next_due - time.time())
+        try:
+            await asyncio.wait_for(due_queue_changed.wait(), timeout)
+            continue  # A poll replaced the queue - recompute the next due time
+        except asyncio.TimeoutError:
+            pass
+
+        paths = due_queue.pop_due(time.time())
+        if paths:
+            task = asyncio.create_task(process_queued_posts(paths))
+            dispatch_tasks.add(task)
+            task.add_done_callback(dispatch_tasks.discard)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -263,20 +426,33 @@ async def lifespan(app: FastAPI):
     Lifecycle manager - starts scheduler on startup
     """
     # Startup
+    global lease_manager, completions, scheduler_stats
     init_firebase()
+    if db:
+        lease_manager = LeaseManager(db)
+        completions = CompletionBatcher(db)
+        scheduler_stats = SchedulerStats(db, shard_config.shard_index)
+        await completions.start()
+        logger.info(f"🔒 Worker {lease_manager.worker_id} handling shard "
+                    f"{shard_config.shard_index + 1}/{shard_config.shard_count}")
+    await dispatcher.start()
     
-    # Start background scheduler task
-    scheduler_task = asyncio.create_task(scheduler_loop())
+    # Start background scheduler tasks
+    scheduler_tasks = [asyncio.create_task(poll_loop()), asyncio.create_task(due_queue_loop())]
     logger.info("✅ Scheduling Service started")
     
     yield
     
     # Shutdown
-    scheduler_task.cancel()
-    try:
-        await scheduler_task
-    except asyncio.CancelledError:
-        pass
+    running = scheduler_tasks + list(dispatch_tasks)
+    for task in running:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+    if completions:
+        await completions.close()
+    if scheduler_stats:
+        await scheduler_stats.flush()
+    await dispatcher.close()
     logger.info("👋 Scheduling Service stopped")
 
 # Create FastAPI app
@@ -303,7 +479,8 @@ async def root():
         "service": "Scheduling Service",
         "status": "running",
         "firebase_connected": firebase_initialized,
-        "polling_interval": POLLING_INTERVAL
+        "polling_interval": POLLING_INTERVAL,
+        "queued_posts": len(due_queue)
     }
 
 @app.get("/health")
@@ -312,7 +489,11 @@ async def health_check():
     return {
         "status": "healthy",
         "firebase": "connected" if firebase_initialized else "disconnected",
-        "integration_service_url": INTEGRATION_SERVICE_URL
+        "integration_service_url": INTEGRATION_SERVICE_URL,
+        "dispatcher": dispatcher.stats(),
+        "worker": lease_manager.stats() if lease_manager else None,
+        "completions": completions.stats() if completions else None,
+        "shard": {"index": shard_config.shard_index, "count": shard_config.shard_count}
     }
 
 @app.post("/trigger")
@@ -322,46 +503,33 @@ async def trigger_now():
     """
     logger.info("🔧 Manual trigger received")
     await process_scheduled_posts()
+    if scheduler_stats:
+        await scheduler_stats.flush()
     return {"message": "Scheduler triggered successfully"}
 
 @app.get("/stats")
-async def get_stats():
+async def get_stats(source: str = "counters"):
     """
-    Get scheduler statistics
+    Get scheduler statistics from the maintained per-shard counters.
+    Posts created or deleted outside the scheduler are folded in by the
+    periodic reconcile, so counter totals can lag by up to `max_lag_seconds`
+    (SCHEDULER_STATS_RECONCILE_SECONDS, 5 minutes by default).
+    `?source=count` (or missing counters) falls back to Firestore count aggregation.
     """
     if not firebase_initialized or not db:
         return {"error": "Firebase not connected"}
     
     try:
-        # Count posts by iterating through users (avoids index requirement)
-        pending_count = 0
-        posted_count = 0
-        failed_count = 0
-        
-        users_ref = db.collection('users')
-        users = users_ref.stream()
-        
-        for user_doc in users:
-            user_id = user_doc.id
-            posts_ref = db.collection(f'users/{user_id}/scheduled_posts')
-            posts = posts_ref.stream()
-            
-            for post_doc in posts:
-                post_data = post_doc.to_dict()
-                status = post_data.get('status', '')
-                
-                if status == 'pending':
-                    pending_count += 1
-                elif status == 'posted':
-                    posted_count += 1
-                elif status == 'failed':
-                    failed_count += 1
+        if source != "count" and scheduler_stats:
+            stats = await asyncio.to_thread(scheduler_stats.read)
+            if stats is not None:
+                return stats
         
+        counts = await asyncio.to_thread(count_by_status, db)
         return {
-            "pending": pending_count,
-            "posted": posted_count,
-            "failed": failed_count,
-            "total": pending_count + posted_count + failed_count
+            **counts,
+            "total": sum(counts.values()),
+            "source": "aggregation"
         }
     except Exception as e:
         return {"error": str(e)}
@@ -0,0 +1,172 @@
+"""
+Scheduler statistics backed by maintained counters
+Per-status counts of `scheduled_posts` documents live in one aggregate document
+per scheduler shard (`scheduler_stats/shard-{n}`), so `/stats` reads a handful
+of small documents instead of scanning every user's posts
+"""
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from firebase_admin import firestore
+
+logger = logging.getLogger("scheduling-service")
+
+STATS_COLLECTION = "scheduler_stats"
+STATUSES = ("pending", "processing", "posted", "failed")
+
+
+def count_by_status(db) -> Dict[str, int]:
+    """Count `scheduled_posts` per status with Firestore count aggregation queries"""
+    counts = {}
+    for status in STATUSES:
+        query = db.collection_group('scheduled_posts').where(
+            filter=firestore.FieldFilter('status', '==', status)
+        )
+        result = query.count(alias="total").get()
+        counts[status] = int(result[0][0].value)
+    return counts
+
+
+class SchedulerStats:
+    """
+    Status counters for scheduled posts.
+
+    The scheduler records each transition it performs (claim, failure,
+    reclaim, completion) as timestamped in-memory deltas and flushes them as
+    one Increment write to its shard document per dispatch round. Posts
+    created or deleted by other writers (frontend, agent service) are folded
+    in by `reconcile()`, which shard 0 runs periodically: it counts with
+    aggregation queries and sets shard 0 so that the shards sum to the counts.
+
+    The counts already include every transition recorded before the
+    reconcile started, so a flush drops deltas older than shard 0's
+    `reconciledAt` instead of counting them twice. Changes made by other
+    writers only show up at the next reconcile, so the totals can lag by up
+    to `reconcile_interval` seconds.
+    """
+
+    def __init__(self, db, shard_index: int = 0, reconcile_interval: Optional[float] = None):
+        self.db = db
+        self.shard_index = shard_index
+        self.reconcile_interval = reconcile_interval or float(os.getenv("SCHEDULER_STATS_RECONCILE_SECONDS", "300"))
+        self._deltas: List[Tuple[datetime, Dict[str, int]]] = []
+        self._last_reconcile = 0.0
+        self._lock = asyncio.Lock()
+        self.discarded = 0
+
+    def _shard(self, index: int):
+        return self.db.collection(STATS_COLLECTION).document(f"shard-{index}")
+
+    @property
+    def shard_ref(self):
+        return self._shard(self.shard_index)
+
+    def record(self, **deltas: int):
+        """Accumulate status deltas, e.g. record(pending=-1, processing=1)"""
+        self._deltas.append((datetime.now(timezone.utc), deltas))
+
+    async def flush(self):
+        """Write accumulated deltas to this replica's shard document"""
+        async with self._lock:
+            pending, self._deltas = self._deltas, []
+            if not pending:
+                return
+            try:
+                await asyncio.to_thread(self._write_deltas, pending)
+            except Exception as e:
+                # Keep the deltas for the next flush
+                self._deltas[:0] = pending
+                logger.error(f"❌ Failed to update scheduler stats: {e}")
+
+    def _write_deltas(self, pending: List[Tuple[datetime, Dict[str, int]]]):
+        @firestore.transactional
+        def _flush(transaction):
+            # Read inside the transaction so a concurrent reconcile can't slip in between
+            reconciled = self._shard(0).get(transaction=transaction)
+            reconciled_at = (reconciled.to_dict() or {}).get('reconciledAt') if reconciled.exists else None
+            totals: Counter = Counter()
+            discarded = 0
+            for recorded_at, deltas in pending:
+                if reconciled_at is not None and recorded_at <= reconciled_at:
+                    discarded += 1  # Already part of the reconciled counts
+                    continue
+                totals.update(deltas)
+            update = {status: firestore.Increment(delta) for status, delta in totals.items() if delta}
+            if update:
+                update['updatedAt'] = firestore.SERVER_TIMESTAMP
+                transaction.set(self.shard_ref, update, merge=True)
+            return discarded
+
+        self.discarded += _flush(self.db.transaction())
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Recount with aggregation queries and set shard 0 so that all shards
+        add up to the counts. Other shards keep their values, so deltas they
+        flush while the counts run are not lost.
+        """
+        started = datetime.now(timezone.utc)
+        counts = count_by_status(self.db)
+        other_refs = [
+            doc.reference for doc in self.db.collection(STATS_COLLECTION).stream()
+            if doc.id != "shard-0"
+        ]
+
+        @firestore.transactional
+        def _reconcile(transaction):
+            others: Counter = Counter()
+            for ref in other_refs:
+                data = ref.get(transaction=transaction).to_dict() or {}
+                for status in STATUSES:
+                    others[status] += int(data.get(status, 0))
+            transaction.set(self._shard(0), {
+                **{status: counts[status] - others[status] for status in STATUSES},
+                'updatedAt': started,
+                'reconciledAt': started,
+            })
+
+        _reconcile(self.db.transaction())
+        logger.info(f"   📊 Reconciled scheduler stats: {counts}")
+        return counts
+
+    async def maybe_reconcile(self, now_monotonic: float):
+        """Run `reconcile()` on shard 0 once every reconcile interval"""
+        if self.shard_index != 0 or now_monotonic - self._last_reconcile < self.reconcile_interval:
+            return
+        self._last_reconcile = now_monotonic
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self.reconcile)
+            except Exception as e:
+                logger.error(f"❌ Error reconciling scheduler stats: {e}")
+
+    def read(self) -> Optional[dict]:
+        """Sum the shard documents; returns None when no counters exist yet"""
+        totals = {status: 0 for status in STATUSES}
+        reconciled_at = None
+        shards = 0
+        for doc in self.db.collection(STATS_COLLECTION).stream():
+            data = doc.to_dict() or {}
+            shards += 1
+            for status in STATUSES:
+                totals[status] += int(data.get(status, 0))
+            if data.get('reconciledAt'):
+                reconciled_at = data['reconciledAt']
+        if not shards:
+            return None
+        # Between reconciles a shard may have recorded transitions for posts
+        # the totals don't include yet
+        totals = {status: max(0, count) for status, count in totals.items()}
+        return {
+            **totals,
+            "total": sum(totals.values()),
+            "source": "counters",
+            "shards": shards,
+            "reconciled_at": reconciled_at.isoformat() if reconciled_at else None,
+            # Posts created or deleted outside the scheduler are counted at the next reconcile
+            "max_lag_seconds": self.reconcile_interval,
+        }
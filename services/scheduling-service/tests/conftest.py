@@ -0,0 +1,215 @@
+"""
+Test Configuration and Fixtures for Scheduling Service Tests
+
+Provides an in-memory stand-in for the parts of the Firestore client the
+scheduler uses (documents, collection-group queries, write batches with
+preconditions, transactions and count aggregation), so leases, completion
+batches and stats counters can be exercised without a Firestore emulator.
+"""
+
+import itertools
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from firebase_admin import firestore
+from google.api_core import exceptions as gcp_exceptions
+from google.cloud.firestore_v1 import _helpers
+
+# Configure detailed test logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
+)
+
+# Test logger for monitoring
+test_logger = logging.getLogger("scheduling_service_tests")
+
+_EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+_OPERATORS = {
+    '==': lambda a, b: a == b,
+    '<': lambda a, b: a is not None and a < b,
+    '<=': lambda a, b: a is not None and a <= b,
+    '>': lambda a, b: a is not None and a > b,
+    '>=': lambda a, b: a is not None and a >= b,
+}
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data, update_time):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocumentReference:
+    def __init__(self, db, path: str):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def collection(self, name: str):
+        return FakeCollection(self._db, f"{self.path}/{name}")
+
+    def get(self, transaction=None):
+        data, update_time = self._db.docs.get(self.path, (None, None))
+        return FakeSnapshot(self, data, update_time)
+
+    def set(self, data, merge=False):
+        self._db.apply([('set', self, data, merge, None)])
+
+
+class FakeQuery:
+    def __init__(self, db, matches, filters=()):
+        self._db = db
+        self._matches = matches
+        self._filters = tuple(filters)
+
+    def where(self, filter):
+        return FakeQuery(self._db, self._matches, self._filters + (filter,))
+
+    def stream(self):
+        for path in sorted(self._db.docs):
+            data, update_time = self._db.docs[path]
+            if self._matches(path) and all(
+                _OPERATORS[f.op_string](data.get(f.field_path), f.value) for f in self._filters
+            ):
+                yield FakeSnapshot(FakeDocumentReference(self._db, path), data, update_time)
+
+    def count(self, alias=None):
+        total = sum(1 for _ in self.stream())
+        return SimpleNamespace(get=lambda: [[SimpleNamespace(alias=alias, value=total)]])
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db, path: str):
+        depth = path.count('/')
+        super().__init__(db, lambda doc: doc.startswith(path + '/') and doc.count('/') == depth + 1)
+        self.path = path
+
+    def document(self, doc_id=None):
+        return FakeDocumentReference(self._db, f"{self.path}/{doc_id or uuid.uuid4().hex[:20]}")
+
+
+class FakeWriteBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(('set', reference, data, merge, None))
+
+    def update(self, reference, field_updates, option=None):
+        self._writes.append(('update', reference, field_updates, True, option))
+
+    def delete(self, reference, option=None):
+        self._writes.append(('delete', reference, None, False, option))
+
+    def commit(self):
+        self._db.commit_calls += 1
+        self._db.apply(self._writes)
+        return []
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Enough of Transaction for `firestore.transactional` to drive it"""
+    _read_only = False
+    _max_attempts = 5
+
+    def __init__(self, db):
+        super().__init__(db)
+        self._id = None
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+
+    def _begin(self, retry_id=None):
+        self._id = b"txn"
+
+    def _commit(self):
+        self._db.apply(self._writes)
+        self._clean_up()
+        return []
+
+    def _rollback(self):
+        self._clean_up()
+
+
+class FakeFirestore:
+    """Documents keyed by path, each stored as (data, update_time)"""
+
+    write_option = staticmethod(firestore.Client.write_option)
+
+    def __init__(self):
+        self.docs = {}
+        self.commit_calls = 0
+        self._clock = itertools.count(1)
+
+    def collection(self, name: str):
+        return FakeCollection(self, name)
+
+    def collection_group(self, name: str):
+        return FakeQuery(self, lambda path: path.split('/')[-2] == name)
+
+    def document(self, path: str):
+        return FakeDocumentReference(self, path)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def seed(self, path: str, data: dict):
+        self.docs[path] = (dict(data), self._tick())
+        return FakeDocumentReference(self, path)
+
+    def data(self, path: str):
+        entry = self.docs.get(path)
+        return dict(entry[0]) if entry else None
+
+    def _tick(self):
+        return _EPOCH + timedelta(microseconds=next(self._clock))
+
+    def apply(self, writes):
+        """Apply writes atomically, enforcing update/precondition semantics like Firestore"""
+        for kind, ref, _, _, option in writes:
+            current = self.docs.get(ref.path)
+            if kind == 'update' and current is None:
+                raise gcp_exceptions.NotFound(f"No document to update: {ref.path}")
+            if isinstance(option, _helpers.LastUpdateOption):
+                if current is None or current[1] != option._last_update_time:
+                    raise gcp_exceptions.FailedPrecondition(f"Document changed: {ref.path}")
+
+        for kind, ref, data, merge, _ in writes:
+            if kind == 'delete':
+                self.docs.pop(ref.path, None)
+                continue
+            current = dict(self.docs[ref.path][0]) if merge and ref.path in self.docs else {}
+            for key, value in data.items():
+                if value is firestore.DELETE_FIELD:
+                    current.pop(key, None)
+                elif value is firestore.SERVER_TIMESTAMP:
+                    current[key] = datetime.now(timezone.utc)
+                elif isinstance(value, firestore.Increment):
+                    current[key] = current.get(key, 0) + value.value
+                else:
+                    current[key] = value
+            self.docs[ref.path] = (current, self._tick())
+
+
+@pytest.fixture
+def fake_db():
+    return FakeFirestore()
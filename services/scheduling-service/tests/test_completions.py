@@ -0,0 +1,193 @@
+"""
+Completion Batcher Tests
+
+Tests for the batched Firestore writes that finish scheduled posts.
+
+Test Coverage:
+1. Buffered groups are split into batches of at most 500 writes
+2. A post's writes are never split across batches
+3. A missing document only drops that post's writes
+4. A failed update-time precondition only drops that post's writes
+5. Transient commit errors are retried until the group's deadline
+"""
+
+import time
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from app import completions as completions_module
+from app.completions import CompletionBatcher, MAX_BATCH_OPS
+
+from .conftest import test_logger
+
+
+def move_ops(db, path):
+    """The posted-post move: add to `posts`, delete from `scheduled_posts`"""
+    user_id = path.split('/')[1]
+    scheduled_ref = db.document(path)
+    new_ref = db.collection('users').document(user_id).collection('posts').document()
+    return [
+        lambda batch: batch.set(new_ref, {'status': 'posted', 'from': path}),
+        lambda batch: batch.delete(scheduled_ref),
+    ]
+
+
+def fail_commits(db, monkeypatch, failures):
+    """Make the next `failures` commits raise a transient error"""
+    apply = db.apply
+    remaining = [failures]
+
+    def flaky_apply(writes):
+        if remaining[0] > 0:
+            remaining[0] -= 1
+            raise gcp_exceptions.ServiceUnavailable("firestore unavailable")
+        apply(writes)
+
+    monkeypatch.setattr(db, "apply", flaky_apply)
+
+
+async def no_sleep(delay):
+    return None
+
+
+def seed_posts(db, count):
+    paths = [f"users/u{i}/scheduled_posts/p{i}" for i in range(count)]
+    for path in paths:
+        db.seed(path, {'status': 'processing'})
+    return paths
+
+
+class TestCompletionBatcher:
+    """Test chunking and failure isolation of completion commits"""
+
+    async def test_flush_chunks_at_500_writes(self, fake_db):
+        """Test that 300 two-write groups commit as two batches of <= 500 writes"""
+        batcher = CompletionBatcher(fake_db, max_ops=MAX_BATCH_OPS, max_delay=60)
+        paths = seed_posts(fake_db, 300)
+
+        # Bypass add()'s early flush to simulate concurrent adds overfilling the buffer
+        batcher._groups = [(path, move_ops(fake_db, path), None) for path in paths]
+        await batcher.flush()
+
+        assert batcher.commits == 2
+        assert batcher.writes == 600
+        assert fake_db.commit_calls == 2
+        assert not any('/scheduled_posts/' in path for path in fake_db.docs)
+        assert len(fake_db.docs) == 300
+
+        test_logger.info("✓ 600 writes committed in two batches")
+
+    async def test_add_flushes_before_exceeding_max_ops(self, fake_db):
+        """Test that add() commits the buffer instead of splitting a group"""
+        batcher = CompletionBatcher(fake_db, max_ops=5, max_delay=60)
+        paths = seed_posts(fake_db, 3)
+
+        await batcher.add(paths[0], move_ops(fake_db, paths[0]))
+        await batcher.add(paths[1], move_ops(fake_db, paths[1]))
+        assert fake_db.commit_calls == 0
+
+        await batcher.add(paths[2], move_ops(fake_db, paths[2]))
+        assert fake_db.commit_calls == 1
+        assert batcher.stats()["pending_writes"] == 2
+
+        await batcher.flush()
+        assert batcher.writes == 6
+
+        test_logger.info("✓ Groups kept whole across batches")
+
+    async def test_rejects_group_larger_than_a_batch(self, fake_db):
+        """Test that a single group over max_ops is refused"""
+        batcher = CompletionBatcher(fake_db, max_ops=2, max_delay=60)
+
+        with pytest.raises(ValueError):
+            await batcher.add("big", [lambda batch: None] * 3)
+
+        test_logger.info("✓ Oversized group rejected")
+
+    async def test_missing_document_only_drops_its_post(self, fake_db):
+        """Test that an update on a deleted post doesn't lose the rest of the batch"""
+        batcher = CompletionBatcher(fake_db, max_delay=60)
+        paths = seed_posts(fake_db, 3)
+        missing = fake_db.document("users/gone/scheduled_posts/deleted")
+
+        await batcher.add(paths[0], move_ops(fake_db, paths[0]))
+        await batcher.add(missing.path, [lambda batch: batch.update(missing, {'status': 'failed'})])
+        await batcher.add(paths[1], move_ops(fake_db, paths[1]))
+        await batcher.add(paths[2], [
+            lambda batch: batch.update(fake_db.document(paths[2]), {'status': 'failed'}),
+        ])
+        await batcher.flush()
+
+        assert fake_db.data(paths[2]) == {'status': 'failed'}
+        assert fake_db.data(paths[0]) is None
+        assert fake_db.data(paths[1]) is None
+        assert missing.path not in fake_db.docs
+        assert batcher.writes == 5
+
+        test_logger.info("✓ Only the missing post's writes were dropped")
+
+    async def test_failed_precondition_only_drops_its_post(self, fake_db):
+        """Test that a post changed since its ownership check is skipped alone"""
+        batcher = CompletionBatcher(fake_db, max_delay=60)
+        paths = seed_posts(fake_db, 2)
+        stale = fake_db.write_option(last_update_time=fake_db.document(paths[0]).get().update_time)
+        fresh = fake_db.write_option(last_update_time=fake_db.document(paths[1]).get().update_time)
+
+        # Another replica reclaims the first post before the batch commits
+        fake_db.document(paths[0]).set({'status': 'pending'})
+
+        for path, option in ((paths[0], stale), (paths[1], fresh)):
+            ref = fake_db.document(path)
+            await batcher.add(path, [lambda batch, ref=ref, option=option: batch.delete(ref, option=option)])
+        await batcher.flush()
+
+        assert fake_db.data(paths[0]) == {'status': 'pending'}
+        assert fake_db.data(paths[1]) is None
+
+        test_logger.info("✓ Reclaimed post left to its new owner")
+
+    async def test_retries_until_deadline(self, fake_db, monkeypatch):
+        """Test that a group with a deadline outlasts more failures than MAX_ATTEMPTS"""
+        monkeypatch.setattr(completions_module.asyncio, "sleep", no_sleep)
+        batcher = CompletionBatcher(fake_db, max_delay=60)
+        paths = seed_posts(fake_db, 1)
+        fail_commits(fake_db, monkeypatch, completions_module.MAX_ATTEMPTS + 3)
+
+        await batcher.add(paths[0], move_ops(fake_db, paths[0]), retry_until=time.monotonic() + 60)
+        await batcher.flush()
+
+        assert fake_db.data(paths[0]) is None
+        assert batcher.stats()["dropped"] == 0
+
+        test_logger.info("✓ Completion retried until it committed")
+
+    async def test_gives_up_without_deadline(self, fake_db, monkeypatch):
+        """Test that a group without a deadline is dropped after MAX_ATTEMPTS"""
+        monkeypatch.setattr(completions_module.asyncio, "sleep", no_sleep)
+        batcher = CompletionBatcher(fake_db, max_delay=60)
+        paths = seed_posts(fake_db, 1)
+        fail_commits(fake_db, monkeypatch, completions_module.MAX_ATTEMPTS)
+
+        await batcher.add(paths[0], move_ops(fake_db, paths[0]))
+        await batcher.flush()
+
+        assert fake_db.data(paths[0]) == {'status': 'processing'}
+        assert batcher.stats()["dropped"] == 1
+
+        test_logger.info("✓ Completion dropped after MAX_ATTEMPTS")
+
+    async def test_gives_up_at_deadline(self, fake_db, monkeypatch):
+        """Test that retries stop once the deadline has passed"""
+        monkeypatch.setattr(completions_module.asyncio, "sleep", no_sleep)
+        batcher = CompletionBatcher(fake_db, max_delay=60)
+        paths = seed_posts(fake_db, 1)
+        fail_commits(fake_db, monkeypatch, 1)
+
+        await batcher.add(paths[0], move_ops(fake_db, paths[0]), retry_until=time.monotonic())
+        await batcher.flush()
+
+        assert fake_db.data(paths[0]) == {'status': 'processing'}
+        assert batcher.stats()["dropped"] == 1
+
+        test_logger.info("✓ Completion dropped at its deadline")
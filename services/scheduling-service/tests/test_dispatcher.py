@@ -0,0 +1,121 @@
+"""
+Dispatcher Tests
+
+Tests for the concurrent post dispatcher and its adaptive concurrency limit.
+
+Test Coverage:
+1. AIMD: the limit halves on overload and recovers one step per good call
+2. The limit stays within its bounds
+3. Overloaded responses are retried once after Retry-After
+4. The before-send check cancels a call without sending it
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.dispatcher import AdaptiveLimiter, DispatchConfig, PostDispatcher
+
+from .conftest import test_logger
+
+
+@pytest.fixture
+def dispatch_config(monkeypatch):
+    monkeypatch.setenv("SCHEDULING_MAX_CONCURRENCY", "8")
+    monkeypatch.setenv("SCHEDULING_MIN_CONCURRENCY", "2")
+    monkeypatch.setenv("SCHEDULING_MAX_RETRY_AFTER", "0")
+    return DispatchConfig()
+
+
+def make_dispatcher(config, handler):
+    dispatcher = PostDispatcher("http://integration", config)
+    dispatcher._client = httpx.AsyncClient(base_url="http://integration", transport=httpx.MockTransport(handler))
+    return dispatcher
+
+
+class TestAdaptiveLimiter:
+    """Test additive increase / multiplicative decrease"""
+
+    async def test_backoff_and_recovery(self):
+        """Test that overload halves the limit and successes add one back at a time"""
+        limiter = AdaptiveLimiter(initial=16, minimum=2, maximum=16)
+
+        for expected in (8, 4, 2, 2):
+            await limiter.acquire()
+            await limiter.release(overloaded=True)
+            assert limiter.limit == expected
+
+        for expected in (3, 4, 5):
+            await limiter.acquire()
+            await limiter.release(overloaded=False)
+            assert limiter.limit == expected
+
+        for _ in range(20):
+            await limiter.acquire()
+            await limiter.release(overloaded=False)
+        assert limiter.limit == 16
+        assert limiter.in_flight == 0
+
+        test_logger.info("✓ Limit halved on overload and recovered additively")
+
+    async def test_acquire_waits_for_a_slot(self):
+        """Test that callers beyond the limit wait until a slot is released"""
+        limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=4)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await limiter.release(overloaded=False)
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.in_flight == 1
+
+        test_logger.info("✓ Acquire blocked at the limit")
+
+
+class TestPostDispatcher:
+    """Test posting through the Integration Service"""
+
+    async def test_overloaded_response_is_retried_once(self, dispatch_config):
+        """Test that a 503 is retried and the limit backs off"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if len(calls) == 1:
+                return httpx.Response(503, headers={"Retry-After": "0"})
+            return httpx.Response(200, json={"post_id": "abc"})
+
+        dispatcher = make_dispatcher(dispatch_config, handler)
+        result = await dispatcher.post("linkedin", "hello", "u1")
+        await dispatcher.close()
+
+        assert result == {"success": True, "platform": "linkedin", "response": {"post_id": "abc"}}
+        assert calls == ["/api/integrations/linkedin/post"] * 2
+        assert dispatcher.limiter.limit == 5  # 8 -> 4 on overload, +1 on success
+
+        test_logger.info("✓ Overloaded call retried once")
+
+    async def test_before_send_cancels_call(self, dispatch_config):
+        """Test that a failed ownership check stops the request from going out"""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={})
+
+        async def lease_lost():
+            return False
+
+        dispatcher = make_dispatcher(dispatch_config, handler)
+        result = await dispatcher.post("twitter", "hello", "u1", before_send=lease_lost)
+        await dispatcher.close()
+
+        assert result["success"] is False
+        assert result["cancelled"] is True
+        assert calls == []
+        assert dispatcher.limiter.in_flight == 0
+
+        test_logger.info("✓ Call cancelled before sending")
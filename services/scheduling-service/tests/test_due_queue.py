@@ -0,0 +1,151 @@
+"""
+Due Queue Tests
+
+Tests for the in-memory due-time queue and the loop that fires it.
+
+Test Coverage:
+1. Heap ordering by due time
+2. Rescheduled and discarded entries are skipped
+3. Reset replaces the look-ahead window
+4. Queued posts fire on time without waiting for a poll
+5. A poll reads Firestore off the event loop and doesn't wait for its dispatch
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from app import main
+from app.due_queue import DueQueue
+from app.leases import LeaseManager
+
+from .conftest import test_logger
+
+
+class TestDueQueue:
+    """Test heap ordering and lazy stale-entry removal"""
+
+    def test_pops_in_due_order(self):
+        """Test that posts come out earliest first, regardless of push order"""
+        queue = DueQueue()
+        queue.push("c", 30.0)
+        queue.push("a", 10.0)
+        queue.push("b", 20.0)
+
+        assert queue.next_due() == 10.0
+        assert queue.pop_due(25.0) == ["a", "b"]
+        assert queue.next_due() == 30.0
+        assert len(queue) == 1
+
+        test_logger.info("✓ Heap pops in due order")
+
+    def test_reschedule_supersedes_old_entry(self):
+        """Test that re-pushing a path moves it and the old entry is ignored"""
+        queue = DueQueue()
+        queue.push("a", 10.0)
+        queue.push("b", 15.0)
+        queue.push("a", 40.0)
+
+        assert queue.next_due() == 15.0
+        assert queue.pop_due(20.0) == ["b"]
+        assert queue.pop_due(50.0) == ["a"]
+        assert queue.next_due() is None
+
+        test_logger.info("✓ Rescheduled entry fires once at its new time")
+
+    def test_discard_and_reset(self):
+        """Test that discarded posts never fire and reset replaces the window"""
+        queue = DueQueue()
+        queue.push("a", 10.0)
+        queue.push("b", 20.0)
+        queue.discard("a")
+
+        assert queue.next_due() == 20.0
+
+        queue.reset([("x", 5.0), ("y", 1.0)])
+        assert len(queue) == 2
+        assert queue.pop_due(100.0) == ["y", "x"]
+
+        test_logger.info("✓ Discard and reset honoured")
+
+
+class TestDueQueueLoop:
+    """Test that queued posts are dispatched independently of the poll loop"""
+
+    async def test_queued_post_fires_when_due(self, fake_db):
+        """Test that the due-queue loop dispatches a post at its due time"""
+        path = "users/u1/scheduled_posts/p1"
+        fake_db.seed(path, {'status': 'pending', 'scheduledTime': datetime.now(timezone.utc)})
+        dispatched = asyncio.Event()
+        dispatch = AsyncMock(side_effect=lambda posts: dispatched.set())
+
+        with patch.multiple(main, db=fake_db, firebase_initialized=True, lease_manager=object(),
+                            due_queue=DueQueue(), dispatch_posts=dispatch):
+            loop = asyncio.create_task(main.due_queue_loop())
+            try:
+                main.due_queue.push(path, time.time() + 0.05)
+                main.due_queue_changed.set()
+                await asyncio.wait_for(dispatched.wait(), timeout=2)
+            finally:
+                loop.cancel()
+                await asyncio.gather(loop, *main.dispatch_tasks, return_exceptions=True)
+
+        posts = dispatch.call_args.args[0]
+        assert [post[0].reference.path for post in posts] == [path]
+        assert posts[0][3] == "u1"
+
+        test_logger.info("✓ Queued post dispatched on time")
+
+    async def test_skips_posts_no_longer_pending(self, fake_db):
+        """Test that posts edited or sent since the poll are not dispatched"""
+        fake_db.seed("users/u1/scheduled_posts/sent", {
+            'status': 'processing', 'scheduledTime': datetime.now(timezone.utc),
+        })
+        dispatch = AsyncMock()
+
+        with patch.multiple(main, db=fake_db, firebase_initialized=True, lease_manager=object(),
+                            dispatch_posts=dispatch):
+            await main.process_queued_posts([
+                "users/u1/scheduled_posts/sent",
+                "users/u1/scheduled_posts/deleted",
+            ])
+
+        dispatch.assert_not_called()
+
+        test_logger.info("✓ Stale queued posts skipped")
+
+    async def test_poll_does_not_wait_for_dispatch(self, fake_db):
+        """Test that a poll returns while its due posts are still sending"""
+        now = datetime.now(timezone.utc)
+        fake_db.seed("users/u1/scheduled_posts/due", {'status': 'pending', 'scheduledTime': now - timedelta(seconds=1)})
+        fake_db.seed("users/u1/scheduled_posts/soon", {'status': 'pending', 'scheduledTime': now + timedelta(seconds=30)})
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_dispatch(posts):
+            started.set()
+            await release.wait()
+
+        stream_threads = []
+        real_owned_posts = main.owned_posts
+
+        def owned_posts(query):
+            stream_threads.append(threading.get_ident())
+            return real_owned_posts(query)
+
+        with patch.multiple(main, db=fake_db, firebase_initialized=True,
+                            lease_manager=LeaseManager(fake_db, worker_id="a", lease_seconds=60),
+                            due_queue=DueQueue(), dispatch_posts=slow_dispatch, owned_posts=owned_posts):
+            await asyncio.wait_for(main.process_scheduled_posts(), timeout=2)
+            await asyncio.wait_for(started.wait(), timeout=2)
+            assert len(main.dispatch_tasks) == 1
+            assert len(main.due_queue) == 1
+
+            release.set()
+            await asyncio.gather(*main.dispatch_tasks)
+
+        assert len(stream_threads) == 2
+        assert threading.get_ident() not in stream_threads
+
+        test_logger.info("✓ Poll finished before its dispatch and streamed off the loop")
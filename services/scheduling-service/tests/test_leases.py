@@ -0,0 +1,248 @@
+"""
+Lease Tests
+
+Tests for lease-based claiming of scheduled posts across replicas.
+
+Test Coverage:
+1. Claiming a pending post, and refusing a post another worker holds
+2. Taking over a post whose lease expired
+3. Reclaiming expired leases back to pending
+4. Posts that started sending are marked for review, never reclaimed or taken over
+5. Renewal and ownership checks once the lease is lost
+6. Shard ownership by user ID
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import leases as leases_module
+from app.leases import LeaseHeartbeat, LeaseManager, ShardConfig
+
+from .conftest import test_logger
+
+POST_PATH = "users/u1/scheduled_posts/p1"
+
+
+def seed_post(db, **fields):
+    return db.seed(POST_PATH, {'status': 'pending', 'content': 'hello', **fields})
+
+
+class TestLeaseManager:
+    """Test claim, renew, verify and reclaim against a fake transaction"""
+
+    def test_claim_pending_post(self, fake_db):
+        """Test that the first worker takes the lease and a second is refused"""
+        ref = seed_post(fake_db)
+        worker_a = LeaseManager(fake_db, worker_id="a", lease_seconds=60)
+        worker_b = LeaseManager(fake_db, worker_id="b", lease_seconds=60)
+
+        claimed = worker_a.claim(ref)
+        assert claimed['status'] == 'pending'
+        assert claimed['content'] == 'hello'
+
+        data = fake_db.data(POST_PATH)
+        assert data['status'] == 'processing'
+        assert data['leaseOwner'] == "a"
+        assert data['leaseExpiresAt'] > datetime.now(timezone.utc)
+
+        assert worker_b.claim(ref) is None
+        assert fake_db.data(POST_PATH)['leaseOwner'] == "a"
+
+        test_logger.info("✓ Lease held by exactly one worker")
+
+    def test_claim_takes_over_expired_lease(self, fake_db):
+        """Test that a post left processing past its lease can be claimed"""
+        expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+        ref = seed_post(fake_db, status='processing', leaseOwner="crashed", leaseExpiresAt=expired)
+
+        claimed = LeaseManager(fake_db, worker_id="b", lease_seconds=60).claim(ref)
+
+        assert claimed['status'] == 'processing'  # Caller skips the pending -> processing stat
+        assert fake_db.data(POST_PATH)['leaseOwner'] == "b"
+
+        test_logger.info("✓ Expired lease taken over")
+
+    def test_claim_missing_post(self, fake_db):
+        """Test that a deleted post cannot be claimed"""
+        manager = LeaseManager(fake_db, worker_id="a", lease_seconds=60)
+
+        assert manager.claim(fake_db.document(POST_PATH)) is None
+
+        test_logger.info("✓ Missing post not claimed")
+
+    def test_reclaim_expired_only(self, fake_db):
+        """Test that only expired processing posts return to pending"""
+        now = datetime.now(timezone.utc)
+        fake_db.seed("users/u1/scheduled_posts/expired", {
+            'status': 'processing', 'leaseOwner': "crashed", 'leaseExpiresAt': now - timedelta(seconds=5),
+        })
+        fake_db.seed("users/u2/scheduled_posts/live", {
+            'status': 'processing', 'leaseOwner': "busy", 'leaseExpiresAt': now + timedelta(seconds=60),
+        })
+
+        reclaimed = LeaseManager(fake_db, worker_id="a", lease_seconds=60).reclaim_expired()
+
+        assert reclaimed == (1, 0)
+        expired = fake_db.data("users/u1/scheduled_posts/expired")
+        assert expired['status'] == 'pending'
+        assert 'leaseOwner' not in expired and 'leaseExpiresAt' not in expired
+        assert expired['leaseReclaims'] == 1
+        assert fake_db.data("users/u2/scheduled_posts/live")['leaseOwner'] == "busy"
+
+        test_logger.info("✓ Only the expired lease was reclaimed")
+
+    def test_expired_after_send_started_needs_review(self, fake_db):
+        """Test that a post whose worker died mid-send is failed for review, not resent"""
+        expired = datetime.now(timezone.utc) - timedelta(seconds=5)
+        ref = seed_post(fake_db, status='processing', leaseOwner="crashed",
+                        leaseExpiresAt=expired, sendStartedAt=expired)
+
+        assert LeaseManager(fake_db, worker_id="b", lease_seconds=60).claim(ref) is None
+        assert fake_db.data(POST_PATH)['leaseOwner'] == "crashed"
+
+        reclaimed = LeaseManager(fake_db, worker_id="b", lease_seconds=60).reclaim_expired()
+
+        assert reclaimed == (0, 1)
+        data = fake_db.data(POST_PATH)
+        assert data['status'] == 'failed'
+        assert data['needsReview'] is True
+        assert 'leaseOwner' not in data
+
+        test_logger.info("✓ Post that started sending left for review")
+
+    def test_mark_sending_requires_lease(self, fake_db):
+        """Test that sendStartedAt is only written by the lease holder and cleared by a new claim"""
+        ref = seed_post(fake_db)
+        manager = LeaseManager(fake_db, worker_id="a", lease_seconds=60)
+
+        assert manager.mark_sending(ref) is False
+        manager.claim(ref)
+        assert manager.mark_sending(ref) is True
+        assert fake_db.data(POST_PATH)['sendStartedAt'] is not None
+
+        # Retried by the user after review
+        fake_db.document(POST_PATH).set({'status': 'pending'}, merge=True)
+        manager.claim(ref)
+        assert 'sendStartedAt' not in fake_db.data(POST_PATH)
+
+        test_logger.info("✓ Send marker written under the lease only")
+
+    def test_renew_and_verify_until_lease_lost(self, fake_db):
+        """Test that renewal extends the lease and stops once another worker owns it"""
+        ref = seed_post(fake_db)
+        manager = LeaseManager(fake_db, worker_id="a", lease_seconds=60)
+        manager.claim(ref)
+        first_expiry = fake_db.data(POST_PATH)['leaseExpiresAt']
+
+        assert manager.renew(ref) is True
+        assert fake_db.data(POST_PATH)['leaseExpiresAt'] >= first_expiry
+        snapshot = manager.verify(ref)
+        assert snapshot is not None
+        assert snapshot.update_time == fake_db.docs[POST_PATH][1]
+
+        # Reclaimed and claimed by another replica
+        fake_db.document(POST_PATH).set({'leaseOwner': "b"}, merge=True)
+
+        assert manager.renew(ref) is False
+        assert manager.verify(ref) is None
+
+        test_logger.info("✓ Lost lease detected by renew and verify")
+
+
+class TestLeaseHeartbeat:
+    """Test the background lease renewal"""
+
+    async def test_heartbeat_renews_and_detects_loss(self, fake_db):
+        """Test that the heartbeat keeps renewing and flags a lost lease"""
+        ref = seed_post(fake_db)
+        manager = LeaseManager(fake_db, worker_id="a", lease_seconds=60)
+        manager.claim(ref)
+        heartbeat = LeaseHeartbeat(manager, ref, interval=0.01)
+        heartbeat.start()
+
+        renewed_at = fake_db.docs[POST_PATH][1]
+        await asyncio.sleep(0.05)
+        assert fake_db.docs[POST_PATH][1] > renewed_at
+        assert await heartbeat.still_owned() is not None
+
+        fake_db.document(POST_PATH).set({'leaseOwner': "b"}, merge=True)
+        await asyncio.sleep(0.05)
+        await heartbeat.stop()
+
+        assert heartbeat.lost is True
+        assert await heartbeat.still_owned() is None
+
+        test_logger.info("✓ Heartbeat renewed the lease and stopped when it was lost")
+
+
+class TestShardConfig:
+    """Test user -> shard assignment"""
+
+    def test_every_user_owned_by_exactly_one_shard(self):
+        """Test that shards partition users"""
+        shards = [ShardConfig(shard_count=3, shard_index=i) for i in range(3)]
+
+        for user_id in (f"user-{n}" for n in range(50)):
+            assert sum(shard.owns(user_id) for shard in shards) == 1
+
+        test_logger.info("✓ Users partitioned across shards")
+
+    def test_rejects_index_outside_count(self):
+        """Test that a shard index >= count is a configuration error"""
+        with pytest.raises(ValueError):
+            ShardConfig(shard_count=2, shard_index=2)
+
+        test_logger.info("✓ Invalid shard index rejected")
+
+    async def test_begin_send_marks_once(self, fake_db):
+        """Test that the first send records sendStartedAt and later sends only check the lease"""
+        ref = seed_post(fake_db)
+        manager = LeaseManager(fake_db, worker_id="a", lease_seconds=60)
+        manager.claim(ref)
+        heartbeat = LeaseHeartbeat(manager, ref)
+
+        results = await asyncio.gather(heartbeat.begin_send(), heartbeat.begin_send())
+
+        assert results == [True, True]
+        marked_at = fake_db.data(POST_PATH)['sendStartedAt']
+        assert await heartbeat.begin_send() is True
+        assert fake_db.data(POST_PATH)['sendStartedAt'] == marked_at
+
+        fake_db.document(POST_PATH).set({'leaseOwner': "b"}, merge=True)
+        assert await heartbeat.begin_send() is False
+
+        test_logger.info("✓ Send marker written once, lease checked per send")
+
+    async def test_confirm_owned_retries_read_errors(self, fake_db, monkeypatch):
+        """Test that a transient read error after sending is retried, not raised"""
+        ref = seed_post(fake_db)
+        manager = LeaseManager(fake_db, worker_id="a", lease_seconds=60)
+        manager.claim(ref)
+        heartbeat = LeaseHeartbeat(manager, ref)
+
+        verify = manager.verify
+        failures = [2]
+
+        def flaky_verify(post_ref):
+            if failures[0] > 0:
+                failures[0] -= 1
+                raise RuntimeError("firestore unavailable")
+            return verify(post_ref)
+
+        async def no_sleep(delay):
+            return None
+
+        monkeypatch.setattr(manager, "verify", flaky_verify)
+        monkeypatch.setattr(leases_module.asyncio, "sleep", no_sleep)
+
+        assert await heartbeat.confirm_owned() is not None
+        assert failures[0] == 0
+
+        # Out of lease time: give up rather than retry forever
+        failures[0] = 1
+        heartbeat.expires_at = 0
+        assert await heartbeat.confirm_owned() is None
+
+        test_logger.info("✓ Lease check retried until the lease deadline")
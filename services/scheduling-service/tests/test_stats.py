@@ -0,0 +1,129 @@
+"""
+Scheduler Stats Tests
+
+Tests for the maintained per-shard status counters.
+
+Test Coverage:
+1. Flushed deltas are summed across shards
+2. Deltas recorded before a reconcile are not counted twice
+3. Deltas recorded after a reconcile are kept
+4. Reconcile keeps other shards' flushed deltas
+5. Failed flushes keep their deltas
+"""
+
+from unittest.mock import patch
+
+from app.stats import SchedulerStats
+
+from .conftest import test_logger
+
+
+def seed_scheduled(db, statuses):
+    for i, status in enumerate(statuses):
+        db.seed(f"users/u{i}/scheduled_posts/p{i}", {'status': status})
+
+
+class TestSchedulerStats:
+    """Test flush and reconcile ordering"""
+
+    async def test_flush_sums_shards(self, fake_db):
+        """Test that each replica increments its own shard document"""
+        shard0 = SchedulerStats(fake_db, shard_index=0, reconcile_interval=300)
+        shard1 = SchedulerStats(fake_db, shard_index=1, reconcile_interval=300)
+
+        shard0.record(pending=3)
+        shard1.record(pending=2)
+        shard1.record(pending=-1, processing=1)
+        await shard0.flush()
+        await shard1.flush()
+
+        stats = shard0.read()
+        assert stats["pending"] == 4
+        assert stats["processing"] == 1
+        assert stats["shards"] == 2
+        assert stats["max_lag_seconds"] == 300
+
+        test_logger.info("✓ Shard counters summed")
+
+    async def test_delta_flushed_after_reconcile_is_not_double_counted(self, fake_db):
+        """Test that a transition already seen by the reconcile counts is dropped"""
+        seed_scheduled(fake_db, ['pending', 'processing'])
+        shard0 = SchedulerStats(fake_db, shard_index=0, reconcile_interval=300)
+        shard1 = SchedulerStats(fake_db, shard_index=1, reconcile_interval=300)
+
+        # Shard 1 claimed the post before the reconcile but flushes after it
+        shard1.record(pending=-1, processing=1)
+        shard0.reconcile()
+        await shard1.flush()
+
+        stats = shard0.read()
+        assert stats["pending"] == 1
+        assert stats["processing"] == 1
+        assert shard1.discarded == 1
+
+        test_logger.info("✓ Pre-reconcile delta discarded")
+
+    async def test_delta_recorded_after_reconcile_is_kept(self, fake_db):
+        """Test that transitions after the reconcile are applied"""
+        seed_scheduled(fake_db, ['pending'])
+        shard0 = SchedulerStats(fake_db, shard_index=0, reconcile_interval=300)
+        shard1 = SchedulerStats(fake_db, shard_index=1, reconcile_interval=300)
+
+        shard0.reconcile()
+        fake_db.document("users/u0/scheduled_posts/p0").set({'status': 'processing'})
+        shard1.record(pending=-1, processing=1)
+        await shard1.flush()
+
+        stats = shard0.read()
+        assert stats["pending"] == 0
+        assert stats["processing"] == 1
+        assert shard1.discarded == 0
+
+        test_logger.info("✓ Post-reconcile delta applied")
+
+    async def test_reconcile_keeps_other_shards(self, fake_db):
+        """Test that reconcile offsets shard 0 instead of wiping other shards"""
+        seed_scheduled(fake_db, ['processing', 'failed', 'pending'])
+        shard0 = SchedulerStats(fake_db, shard_index=0, reconcile_interval=300)
+        shard1 = SchedulerStats(fake_db, shard_index=1, reconcile_interval=300)
+
+        shard1.record(processing=1, failed=1)
+        await shard1.flush()
+        flushed = fake_db.data("scheduler_stats/shard-1")
+
+        counts = shard0.reconcile()
+
+        assert fake_db.data("scheduler_stats/shard-1")["failed"] == flushed["failed"]
+        stats = shard0.read()
+        assert {status: stats[status] for status in counts} == counts
+        assert stats["reconciled_at"] is not None
+
+        test_logger.info("✓ Shards add up to the reconciled counts")
+
+    async def test_failed_flush_keeps_deltas(self, fake_db):
+        """Test that deltas survive a failed write"""
+        stats = SchedulerStats(fake_db, shard_index=0, reconcile_interval=300)
+        stats.record(pending=2)
+
+        with patch.object(stats, "_write_deltas", side_effect=RuntimeError("unavailable")):
+            await stats.flush()
+        await stats.flush()
+
+        assert stats.read()["pending"] == 2
+
+        test_logger.info("✓ Deltas retried on the next flush")
+
+    async def test_only_shard_zero_reconciles(self, fake_db):
+        """Test that maybe_reconcile is a no-op on other shards and between intervals"""
+        shard0 = SchedulerStats(fake_db, shard_index=0, reconcile_interval=300)
+        shard1 = SchedulerStats(fake_db, shard_index=1, reconcile_interval=300)
+
+        await shard1.maybe_reconcile(1000.0)
+        assert shard1.read() is None
+
+        await shard0.maybe_reconcile(1000.0)
+        reconciled_at = fake_db.data("scheduler_stats/shard-0")["reconciledAt"]
+        await shard0.maybe_reconcile(1100.0)
+        assert fake_db.data("scheduler_stats/shard-0")["reconciledAt"] == reconciled_at
+
+        test_logger.info("✓ Reconcile runs on shard 0 once per interval")
@@ -0,0 +1,97 @@
+"""
+Per-User Integration Token Cache
+Bounded LRU + TTL cache of each user's `integrations` map from `users/{uid}`,
+shared by the services that read OAuth tokens on every post and status check
+"""
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+
+class TokenCache:
+    """
+    In-process cache of `users/{uid}.integrations`, keyed by user ID.
+
+    Entries expire after `ttl_seconds` and the least recently used entry is
+    evicted once `max_entries` is reached. Writers must call `invalidate()`
+    after changing a user's tokens (save, disconnect) so the next read goes
+    back to Firestore. Each service process holds its own instance, so the TTL
+    bounds how long another service may see a token after it changes.
+
+    Maps are copied on `set()` and `get()`, so a caller that modifies the map
+    it was given cannot change what other requests read.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 120.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached integrations map for a user, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, integrations = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+        return copy.deepcopy(integrations)
+
+    def set(self, user_id: str, integrations: Dict[str, Any]):
+        """Cache a user's integrations map, evicting the LRU entry when full"""
+        integrations = copy.deepcopy(integrations)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, integrations)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str):
+        """Drop a user's cached tokens after they were written or disconnected"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop all cached entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Process-wide instance
+token_cache = TokenCache(
+    max_entries=int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000")),
+    ttl_seconds=float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "120")),
+)